@@ -0,0 +1,89 @@
+"""
+Compare le temps de résolution d'un clic (point -> carte) entre le parcours
+linéaire de la liste des cartes (ancien on_click) et l'index spatial.
+
+Usage : python benchmarks/bench_index_spatial.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jeu.index_spatial import construire_index
+
+TAILLES = [24, 1_000, 100_000]
+NB_CLICS = 2_000
+
+
+def plateau_regulier(n):
+    """Cartes 2x3 disposées en grille, comme dans config.txt."""
+    colonnes = max(1, int(n ** 0.5))
+    return [((i % colonnes) * 2, (i // colonnes) * 3, 2, 3) for i in range(n)]
+
+
+def plateau_irregulier(n, rng):
+    """Cartes de tailles très variées placées aléatoirement (index R-tree)."""
+    cote = (n ** 0.5) * 4
+    rects = []
+    for _ in range(n):
+        largeur = rng.choice([0.5, 1, 8])
+        hauteur = rng.choice([0.5, 1, 8])
+        rects.append((rng.uniform(0, cote), rng.uniform(0, cote), largeur, hauteur))
+    return rects
+
+
+def parcours_lineaire(cards, x, y):
+    for card in cards:
+        if (card['x'] <= x <= card['x'] + card['width'] and
+                card['y'] <= y <= card['y'] + card['height']):
+            return card
+    return None
+
+
+def mesurer(rects, rng):
+    cards = [{'x': x, 'y': y, 'width': l, 'height': h} for (x, y, l, h) in rects]
+    xmax = max(r[0] + r[2] for r in rects)
+    ymax = max(r[1] + r[3] for r in rects)
+    clics = [(rng.uniform(0, xmax), rng.uniform(0, ymax)) for _ in range(NB_CLICS)]
+
+    debut = time.perf_counter()
+    index = construire_index(rects)
+    t_construction = time.perf_counter() - debut
+
+    # Le parcours linéaire est limité à quelques clics sur les grands plateaux
+    clics_lineaires = clics[:max(20, NB_CLICS * 1000 // len(rects))]
+    debut = time.perf_counter()
+    for x, y in clics_lineaires:
+        parcours_lineaire(cards, x, y)
+    t_lineaire = (time.perf_counter() - debut) / len(clics_lineaires)
+
+    debut = time.perf_counter()
+    for x, y in clics:
+        index.trouver(x, y)
+    t_index = (time.perf_counter() - debut) / len(clics)
+
+    # Vérification : l'index renvoie la même carte que le parcours linéaire
+    for x, y in clics_lineaires:
+        attendu = parcours_lineaire(cards, x, y)
+        indice = index.trouver(x, y)
+        assert (attendu is None and indice is None) or cards[indice] is attendu
+
+    return type(index).__name__, t_construction, t_lineaire, t_index
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'disposition':<12}{'cartes':>9}  {'index':<16}{'construction':>14}"
+          f"{'linéaire/clic':>16}{'index/clic':>14}{'gain':>10}")
+    for nom, generer in (("régulière", lambda n: plateau_regulier(n)),
+                         ("irrégulière", lambda n: plateau_irregulier(n, rng))):
+        for n in TAILLES:
+            type_index, t_c, t_l, t_i = mesurer(generer(n), rng)
+            print(f"{nom:<12}{n:>9}  {type_index:<16}{t_c * 1e3:>11.2f} ms"
+                  f"{t_l * 1e6:>13.2f} µs{t_i * 1e6:>11.2f} µs{t_l / t_i:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Mesures de performance du jeu, sans affichage (backend Agg), pour les deux
+scripts ('classique' et 'formes', ainsi que 'atlas' : le mode formes rendu
+en une seule image, jeu/rendu_atlas.py) et des plateaux de 24 à 100 000 cartes :
+
+  - lire_fichier_config (analyse du texte, puis relecture par le cache) ;
+  - create_shape_files (écriture des géométries, puis relance sans changement) ;
+  - setup_board et le premier rendu complet de la figure ;
+  - on_click, piloté par des MouseEvent synthétiques (médiane et 95e centile),
+    suivi du rafraîchissement qu'il a programmé : latence totale, et à part le
+    temps du gestionnaire du clic seul (on_click_gestionnaire) et celui du
+    rafraîchissement différé (on_click_affichage) ;
+  - reveal_card / hide_card suivis du rafraîchissement de l'affichage ;
+  - generate_shapes_config (mode formes).
+
+Avec --latence, seule la latence de on_click est mesurée, pour des plateaux de
+1 000 à 10 000 cartes : elle doit rester constante (le rafraîchissement ne
+redessine que les cartes retournées) ; un écart au-delà de ECART_LATENCE
+entre la plus petite et la plus grande taille est signalé.
+
+Les résultats (en secondes) sont écrits en JSON et comparés à une référence
+enregistrée : une mesure plus lente que la référence au-delà de la tolérance
+est signalée comme régression, et le code de sortie vaut alors 1.
+
+Usage : python benchmarks/bench_jeu.py
+        python benchmarks/bench_jeu.py --tailles 24 1000 --modes classique
+        python benchmarks/bench_jeu.py --enregistrer-reference
+        python benchmarks/bench_jeu.py --latence
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+
+from jeu.cartes import Cartes
+from jeu.configuration import COULEURS_FORMES, FORMES
+from jeu.fichier_geometrie import ecrire_geometries
+
+TAILLES = [24, 1_000, 10_000, 100_000]
+TAILLES_LATENCE = [1_000, 2_000, 5_000, 10_000]
+# Latence de on_click : rapport maximal toléré entre la plus grande et la plus petite taille
+ECART_LATENCE = 1.5
+SCRIPTS = {'classique': "script classique.py", 'formes': "script formes.py",
+           'atlas': "script formes.py"}
+# Rendu imposé (game_state['mode_collection']) ; par défaut, choisi par le script
+RENDUS = {'atlas': 'atlas'}
+NB_CLICS = 200
+NB_RETOURNEMENTS = 200
+REPETITIONS = 5
+# Durée maximale (s) d'une série de clics ou de retournements, au-delà de MINIMUM mesures
+BUDGET = 2.0
+MINIMUM = 5
+TAILLE_FIGURE = (12, 8)
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference.json")
+SORTIE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultats.json")
+# Une mesure est une régression si elle dépasse la référence de plus de TOLERANCE
+# (en proportion) et de plus de PLANCHER secondes (bruit des mesures très courtes)
+TOLERANCE = 0.25
+PLANCHER = 50e-6
+
+COULEURS_CLASSIQUE = ["tomato", "palegreen", "gold", "skyblue", "orchid", "orange",
+                      "turquoise", "salmon", "khaki", "plum", "lightgrey", "peru"]
+
+
+def charger_script(mode):
+    """Importe le script du mode (son nom contient une espace) comme un module."""
+    spec = importlib.util.spec_from_file_location(f"script_{mode}", os.path.join(RACINE, SCRIPTS[mode]))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def ecrire_config(chemin, mode, n, rng):
+    """
+    Fichier de configuration de n cartes (n pair) disposées en grille,
+    les paires étant mélangées sur le plateau.
+    """
+    colonnes = max(1, round(n ** 0.5))
+    paires = [k // 2 for k in range(n)]
+    rng.shuffle(paires)
+    with open(chemin, "w") as f:
+        for i, k in enumerate(paires):
+            if mode == 'classique':
+                x, y = (i % colonnes) * 2, (i // colonnes) * 3
+                f.write(f"{i + 1};[{x},{y}];2;3;{COULEURS_CLASSIQUE[k % len(COULEURS_CLASSIQUE)]}\n")
+            else:
+                x, y = (i % colonnes) * 3, (i // colonnes) * 3
+                couleur = COULEURS_FORMES[k % len(COULEURS_FORMES)]
+                forme = FORMES[(k // len(COULEURS_FORMES)) % len(FORMES)]
+                f.write(f"shape_{i + 1};[{x},{y}];3;3;{couleur};{forme}\n")
+
+
+def chronometrer(fonction, preparer=None, repetitions=REPETITIONS):
+    """
+    Meilleure durée de `fonction()` sur `repetitions` appels (la moins perturbée par
+    le reste du système), `preparer()` étant appelée, non chronométrée, avant chaque appel.
+    """
+    durees = []
+    for _ in range(repetitions):
+        if preparer is not None:
+            preparer()
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees)
+
+
+def nouvelle_partie(module, mode, formes):
+    game_state = module.init_game_state()
+    game_state['formes'] = formes
+    game_state['mode_collection'] = RENDUS.get(mode)
+    game_state['namep1'], game_state['namep2'] = "A", "B"
+    fig, ax = plt.subplots(figsize=TAILLE_FIGURE)
+    game_state['fig'], game_state['ax'] = fig, ax
+    game_state['start_time'] = time.time()
+    return game_state
+
+
+def clics_paires(game_state, nb_paires):
+    """Indices des cartes de `nb_paires` paires, dans l'ordre où les cliquer."""
+    par_cle = {}
+    for i, cle in enumerate(game_state['moteur'].cles):
+        par_cle.setdefault(cle, []).append(i)
+    clics = []
+    for indices in par_cle.values():
+        for k in range(0, len(indices) - 1, 2):
+            if len(clics) == 2 * nb_paires:
+                return clics
+            clics += indices[k:k + 2]
+    return clics
+
+
+def latences_clics(module, game_state):
+    """
+    Durées de on_click, piloté par des MouseEvent synthétiques, sur une figure déjà
+    dessinée : des paires complètes (pas de masquage en attente), en laissant
+    quelques paires pour ne pas déclencher la fin de partie. Le timer du
+    rafraîchissement différé ne se déclenche pas sans boucle d'événements :
+    flush_refresh est appelée ici, juste après le clic.
+    Renvoie les durées du gestionnaire et celles du rafraîchissement.
+    """
+    fig, ax, cards = game_state['fig'], game_state['ax'], game_state['cards']
+    reserve = getattr(module, 'PAIRES_AVANT_GIF', 0) + 1
+    nb_paires = max(0, min(NB_CLICS // 2, len(cards) // 2 - reserve))
+    indices = clics_paires(game_state, nb_paires)
+    centres = ax.transData.transform(
+        [(cards.x[i] + cards.largeur[i] / 2, cards.y[i] + cards.hauteur[i] / 2) for i in indices])
+    gestionnaire, affichage = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, (px, py) in zip(indices, centres):
+            total = sum(gestionnaire) + sum(affichage)
+            if len(gestionnaire) >= MINIMUM and total > BUDGET and len(gestionnaire) % 2 == 0:
+                break
+            event = MouseEvent('button_press_event', fig.canvas, px, py, button=1)
+            debut = time.perf_counter()
+            module.on_click(event, game_state)
+            milieu = time.perf_counter()
+            module.flush_refresh(game_state)
+            fin = time.perf_counter()
+            gestionnaire.append(milieu - debut)
+            affichage.append(fin - milieu)
+            assert cards[i].revelee, "le clic n'a pas atteint la carte visée"
+    return gestionnaire, affichage
+
+
+def resumer_clics(gestionnaire, affichage):
+    """Médianes et 95e centile des clics : { nom : secondes }."""
+    latences = np.add(gestionnaire, affichage)
+    return {'on_click': float(np.median(latences)),
+            'on_click_p95': float(np.percentile(latences, 95)),
+            'on_click_gestionnaire': float(np.median(gestionnaire)),
+            'on_click_affichage': float(np.median(affichage))}
+
+
+def mesurer_latence(module, mode, n, graine):
+    """Latence de on_click seule (voir resumer_clics) pour un plateau de n cartes."""
+    rng = random.Random(f"{graine}:{mode}:{n}")
+    config = f"config_{mode}_{n}.txt"
+    ecrire_config(config, mode, n, rng)
+    formes = module.lire_fichier_config(config)
+    game_state = nouvelle_partie(module, mode, formes)
+    module.setup_board(game_state)
+    game_state['fig'].canvas.draw()
+    clics = latences_clics(module, game_state)
+    plt.close(game_state['fig'])
+    return resumer_clics(*clics)
+
+
+def mesurer(module, mode, n, graine):
+    """Mesures d'un mode pour un plateau de n cartes : { nom : secondes }."""
+    # Même plateau pour une taille donnée, quelles que soient les autres tailles mesurées
+    rng = random.Random(f"{graine}:{mode}:{n}")
+    resultats = {}
+    repetitions = max(1, min(REPETITIONS, 20_000 // n))
+    config = f"config_{mode}_{n}.txt"
+    ecrire_config(config, mode, n, rng)
+
+    def sans_cache():
+        if os.path.exists(config + ".plateau"):
+            os.remove(config + ".plateau")
+
+    resultats['lire_fichier_config'] = chronometrer(
+        lambda: module.lire_fichier_config(config), sans_cache, repetitions)
+    formes = module.lire_fichier_config(config)
+    resultats['lire_fichier_config_cache'] = chronometrer(
+        lambda: module.lire_fichier_config(config), None, repetitions)
+
+    # Géométries : le script formes les écrit dans son main, comme ci-dessous
+    if hasattr(module, 'create_shape_files'):
+        ecrire = lambda: module.create_shape_files(formes)
+    else:
+        ecrire = lambda: ecrire_geometries(module.FICHIER_GEOMETRIES, Cartes.depuis_formes(formes))
+    os.makedirs(os.path.dirname(module.FICHIER_GEOMETRIES), exist_ok=True)
+    resultats['create_shape_files'] = chronometrer(
+        ecrire, lambda: os.path.exists(module.FICHIER_GEOMETRIES) and os.remove(module.FICHIER_GEOMETRIES),
+        repetitions)
+    resultats['create_shape_files_inchange'] = chronometrer(ecrire, None, repetitions)
+
+    # Mise en place du plateau (une figure neuve par mesure)
+    parties = []
+    resultats['setup_board'] = chronometrer(
+        lambda: module.setup_board(parties[-1]),
+        lambda: parties.append(nouvelle_partie(module, mode, formes)), repetitions)
+    for game_state in parties[:-1]:
+        plt.close(game_state['fig'])
+    game_state = parties[-1]
+    fig, cards = game_state['fig'], game_state['cards']
+    resultats['premier_rendu'] = chronometrer(fig.canvas.draw, None, 1)
+    resultats['rendu_complet'] = chronometrer(fig.canvas.draw, None, repetitions)
+
+    gestionnaire, affichage = latences_clics(module, game_state)
+    if gestionnaire:
+        resultats.update(resumer_clics(gestionnaire, affichage))
+
+    # Retournements isolés (carte + rafraîchissement de l'affichage)
+    restantes = [i for i in range(len(cards)) if not cards[i].revelee][:NB_RETOURNEMENTS]
+    reveler, cacher = [], []
+    for i in restantes:
+        if len(reveler) >= MINIMUM and sum(reveler) + sum(cacher) > BUDGET:
+            break
+        card = cards[i]
+        debut = time.perf_counter()
+        module.reveal_card(card)
+        module.refresh_display(game_state, [card])
+        reveler.append(time.perf_counter() - debut)
+        debut = time.perf_counter()
+        module.hide_card(card)
+        module.refresh_display(game_state, [card])
+        cacher.append(time.perf_counter() - debut)
+    if restantes:
+        resultats['reveal_card'] = float(np.median(reveler))
+        resultats['hide_card'] = float(np.median(cacher))
+
+    plt.close(fig)
+    return resultats
+
+
+def environnement():
+    return {
+        'python': platform.python_version(),
+        'matplotlib': matplotlib.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processeur': platform.processor(),
+        'systeme': platform.platform(),
+        'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def comparer(resultats, reference, tolerance):
+    """Affiche la comparaison avec la référence ; renvoie la liste des régressions."""
+    regressions = []
+    print(f"\n{'mesure':<46}{'référence':>12}{'actuel':>12}{'ratio':>8}")
+    for cle, valeur in resultats.items():
+        if cle not in reference:
+            continue
+        avant = reference[cle]
+        ratio = valeur / avant if avant > 0 else float('inf')
+        regression = valeur > avant * (1 + tolerance) and valeur - avant > PLANCHER
+        if regression:
+            regressions.append(cle)
+        print(f"{cle:<46}{avant * 1e3:>9.3f} ms{valeur * 1e3:>9.3f} ms{ratio:>7.2f}x"
+              f"{'  RÉGRESSION' if regression else ''}")
+    return regressions
+
+
+def latence_variable(resultats, modes, tailles):
+    """
+    Affiche, par mode, le rapport des latences de on_click entre la plus grande et
+    la plus petite taille ; renvoie les modes dont la latence dépasse ECART_LATENCE.
+    """
+    variables = []
+    petite, grande = min(tailles), max(tailles)
+    print(f"\n{'mode':<10}{'rapport ' + str(grande) + ' / ' + str(petite) + ' cartes':>30}")
+    for mode in modes:
+        rapport = resultats[f"{mode}/{grande}/on_click"] / resultats[f"{mode}/{petite}/on_click"]
+        if rapport > ECART_LATENCE:
+            variables.append(mode)
+        print(f"{mode:<10}{rapport:>29.2f}x{'  LATENCE NON CONSTANTE' if rapport > ECART_LATENCE else ''}")
+    return variables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance du jeu (backend Agg).")
+    parser.add_argument('--tailles', type=int, nargs='+', help="nombres de cartes (pairs)")
+    parser.add_argument('--latence', action='store_true',
+                        help=f"latence de on_click seule, de {TAILLES_LATENCE[0]} à {TAILLES_LATENCE[-1]} cartes")
+    parser.add_argument('--modes', nargs='+', choices=list(SCRIPTS), default=list(SCRIPTS))
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--sortie', default=SORTIE, help="fichier JSON des résultats")
+    parser.add_argument('--reference', default=REFERENCE, help="résultats de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="ralentissement toléré avant de signaler une régression (0.25 = +25 %%)")
+    parser.add_argument('--enregistrer-reference', action='store_true',
+                        help="enregistre ces résultats comme nouvelle référence")
+    args = parser.parse_args()
+    if args.tailles is None:
+        args.tailles = TAILLES_LATENCE if args.latence else TAILLES
+    if any(n < 2 or n % 2 for n in args.tailles):
+        parser.error("les tailles doivent être des nombres pairs de cartes")
+
+    resultats = {}
+    modules = {mode: charger_script(mode) for mode in args.modes}
+    repertoire = os.getcwd()
+    with tempfile.TemporaryDirectory() as dossier:
+        # Les scripts écrivent leurs fichiers (figures/...) dans le dossier courant
+        os.chdir(dossier)
+        try:
+            for mode, module in modules.items():
+                for n in args.tailles:
+                    mesure = mesurer_latence if args.latence else mesurer
+                    for nom, duree in mesure(module, mode, n, args.graine).items():
+                        resultats[f"{mode}/{n}/{nom}"] = duree
+                        print(f"{mode:<10}{n:>8}  {nom:<28}{duree * 1e3:>11.3f} ms")
+                if mode == 'formes' and not args.latence:
+                    duree = chronometrer(lambda: module.generate_shapes_config(
+                        "config_shapes.txt", random.Random(args.graine)))
+                    resultats["formes/36/generate_shapes_config"] = duree
+                    print(f"{mode:<10}{36:>8}  {'generate_shapes_config':<28}{duree * 1e3:>11.3f} ms")
+        finally:
+            os.chdir(repertoire)
+
+    if args.latence:
+        return 1 if latence_variable(resultats, args.modes, args.tailles) else 0
+
+    document = {'environnement': environnement(), 'resultats': resultats}
+    with open(args.sortie, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"\nRésultats écrits dans {args.sortie}")
+
+    if args.enregistrer_reference:
+        with open(args.reference, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Référence enregistrée dans {args.reference}")
+        return 0
+
+    if not os.path.exists(args.reference):
+        print(f"Pas de référence ({args.reference}) : relancer avec --enregistrer-reference pour en créer une.")
+        return 0
+    with open(args.reference) as f:
+        reference = json.load(f)
+    if reference['environnement'].get('machine') != document['environnement']['machine']:
+        print("Attention : la référence a été mesurée sur une autre machine.")
+    regressions = comparer(resultats, reference['resultats'], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}.")
+        return 1
+    print("\nAucune régression.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
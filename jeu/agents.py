@@ -0,0 +1,235 @@
+"""
+Joueurs automatiques (IA) pour le moteur du jeu.
+
+Un agent suit la partie à travers les événements du moteur (il ne voit une carte
+que lorsqu'elle est retournée) et choisit, à chaque demande, l'indice de la carte
+à retourner pour le joueur dont il occupe la place.
+
+Le choix d'un coup est en O(1), quelle que soit la taille du plateau : les
+cartes encore à explorer sont gardées dans une Reserve (tirage au hasard en
+temps constant), et les cartes vues sont indexées par leur clé de paire.
+Seul debut_partie est en O(n).
+"""
+import argparse
+from collections import OrderedDict
+
+from jeu.moteur import REVELEE, PAIRE
+
+
+class Reserve:
+    """
+    Ensemble d'indices de cartes avec ajout, retrait et tirage au hasard en O(1)
+    (liste + position de chaque élément ; un retrait échange l'élément avec le dernier).
+    """
+
+    __slots__ = ('elements', 'positions')
+
+    def __init__(self, indices=()):
+        self.elements = list(indices)
+        self.positions = {i: k for k, i in enumerate(self.elements)}
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __contains__(self, i):
+        return i in self.positions
+
+    def ajouter(self, i):
+        if i not in self.positions:
+            self.positions[i] = len(self.elements)
+            self.elements.append(i)
+
+    def retirer(self, i):
+        k = self.positions.pop(i, None)
+        if k is None:
+            return
+        dernier = self.elements.pop()
+        if dernier != i:
+            self.elements[k] = dernier
+            self.positions[dernier] = k
+
+    def tirer(self, rng, revelee):
+        """
+        Élément au hasard parmi ceux dont la carte est face cachée, ou None.
+        Au plus une carte de la réserve est visible au moment d'un choix
+        (la première carte du tour) : le rejet ne coûte que quelques tirages.
+        """
+        elements = self.elements
+        n = len(elements)
+        if n == 0 or (n == 1 and revelee[elements[0]]):
+            return None
+        while True:
+            i = elements[rng.randrange(n)]
+            if not revelee[i]:
+                return i
+
+
+class Agent:
+    """
+    Agent de base : s'abonne aux événements du moteur au début de chaque partie.
+    """
+
+    nom = 'agent'
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.moteur = None
+
+    def debut_partie(self, moteur):
+        self.moteur = moteur
+        moteur.abonner(self.observer)
+
+    def observer(self, evenements):
+        pass
+
+    def choisir(self):
+        """
+        Indice de la prochaine carte à retourner (carte face cachée).
+        """
+        raise NotImplementedError
+
+
+class AgentAleatoire(Agent):
+    """
+    Retourne des cartes face cachée au hasard, sans rien retenir.
+    """
+
+    nom = 'aleatoire'
+
+    def debut_partie(self, moteur):
+        super().debut_partie(moteur)
+        # Cartes pas encore appariées
+        self.en_jeu = Reserve(i for i, r in enumerate(moteur.revelee) if not r)
+
+    def observer(self, evenements):
+        for ev in evenements:
+            if ev.type == PAIRE:
+                for i in ev.cartes:
+                    self.en_jeu.retirer(i)
+
+    def choisir(self):
+        return self.en_jeu.tirer(self.rng, self.moteur.revelee)
+
+
+class AgentMemoire(Agent):
+    """
+    Retient les cartes vues : joue une paire connue s'il en a une, complète la
+    paire de sa première carte si la partenaire est connue, et sinon explore une
+    carte jamais vue (ou oubliée).
+
+    `capacite` borne la mémoire (nombre de cartes retenues) : au-delà, la carte
+    vue le moins récemment est oubliée (LRU) et redevient à explorer.
+    None : mémoire parfaite.
+    """
+
+    nom = 'memoire'
+
+    def __init__(self, rng, capacite=None, nom=None):
+        super().__init__(rng)
+        self.capacite = capacite
+        if nom is not None:
+            self.nom = nom
+
+    def debut_partie(self, moteur):
+        super().debut_partie(moteur)
+        self.memoire = OrderedDict()   # indice -> clé, de la moins à la plus récemment vue
+        self.vues = {}                 # clé de paire -> indices retenus (1 ou 2)
+        self.paires_connues = {}       # clés dont les deux cartes sont retenues (ensemble ordonné)
+        self.inconnues = Reserve(i for i, r in enumerate(moteur.revelee) if not r)
+        # Partie reprise (jeu/sauvegarde.py) : la carte déjà retournée du tour a été vue
+        for i in moteur.selection:
+            self._retenir(i, moteur.cles[i])
+
+    def _retenir(self, i, cle):
+        if i in self.memoire:
+            self.memoire.move_to_end(i)
+            return
+        self.memoire[i] = cle
+        self.inconnues.retirer(i)
+        indices = self.vues.setdefault(cle, [])
+        indices.append(i)
+        if len(indices) == 2:
+            self.paires_connues[cle] = None
+        if self.capacite is not None and len(self.memoire) > self.capacite:
+            j, cle_j = self.memoire.popitem(last=False)
+            self._oublier(j, cle_j)
+            self.inconnues.ajouter(j)
+
+    def _oublier(self, i, cle):
+        indices = self.vues.get(cle)
+        if indices is None or i not in indices:
+            return
+        indices.remove(i)
+        self.paires_connues.pop(cle, None)
+        if not indices:
+            del self.vues[cle]
+
+    def observer(self, evenements):
+        cles = self.moteur.cles
+        for ev in evenements:
+            if ev.type == REVELEE:
+                i = ev.cartes[0]
+                self._retenir(i, cles[i])
+            elif ev.type == PAIRE:
+                for i in ev.cartes:
+                    if i in self.memoire:
+                        del self.memoire[i]
+                        self._oublier(i, cles[i])
+                    self.inconnues.retirer(i)
+
+    def choisir(self):
+        moteur = self.moteur
+        if moteur.selection:
+            premiere = moteur.selection[0]
+            for i in self.vues.get(moteur.cles[premiere], ()):
+                if i != premiere:
+                    return i
+            return self._carte_inconnue()
+
+        if self.paires_connues:
+            return self.vues[next(iter(self.paires_connues))][0]
+        return self._carte_inconnue()
+
+    def _carte_inconnue(self):
+        i = self.inconnues.tirer(self.rng, self.moteur.revelee)
+        if i is not None:
+            return i
+        # Plus rien à explorer : toutes les cartes cachées sont en mémoire
+        revelee = self.moteur.revelee
+        return next(j for j in self.memoire if not revelee[j])
+
+
+# Niveaux de difficulté : nombre de cartes retenues ('memoire' : mémoire parfaite)
+NIVEAUX = {
+    'facile': 4,
+    'moyen': 12,
+    'difficile': 40,
+}
+
+
+def _agent_niveau(nom, capacite):
+    def creer(rng):
+        return AgentMemoire(rng, capacite=capacite, nom=nom)
+    creer.nom = nom
+    return creer
+
+
+# Agents disponibles, par nom (tournoi, adversaires des scripts) : nom -> fabrique(rng)
+AGENTS = {cls.nom: cls for cls in (AgentAleatoire, AgentMemoire)}
+AGENTS.update((nom, _agent_niveau(nom, capacite)) for nom, capacite in NIVEAUX.items())
+
+# Adversaire proposé quand aucun niveau n'est précisé
+NIVEAU_DEFAUT = 'moyen'
+
+
+def adversaires_demandes(arguments=None):
+    """
+    Places tenues par un agent, lues dans la ligne de commande
+    (--ia1 [NOM] / --ia2 [NOM], NOM parmi AGENTS) : {joueur: nom de l'agent}.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    for joueur in (1, 2):
+        parser.add_argument(f'--ia{joueur}', nargs='?', const=NIVEAU_DEFAUT,
+                            default=None, choices=list(AGENTS))
+    args, _ = parser.parse_known_args(arguments)
+    return {joueur: nom for joueur, nom in ((1, args.ia1), (2, args.ia2)) if nom}
@@ -0,0 +1,231 @@
+"""
+Stockage compact des cartes du plateau : une colonne NumPy par attribut
+(structure de tableaux) au lieu d'un dictionnaire par carte.
+
+Les couleurs et les formes sont « internées » : chaque carte ne stocke qu'un
+petit entier, indice dans la table des noms. Une carte isolée se manipule à
+travers une vue légère (Carte) qui lit et écrit directement dans les colonnes.
+"""
+import numpy as np
+
+
+def interner(valeurs):
+    """
+    Renvoie (table des valeurs distinctes, tableau des indices dans cette table).
+    """
+    valeurs = list(valeurs)
+    table = {v: k for k, v in enumerate(dict.fromkeys(valeurs))}
+    indices = np.fromiter(map(table.__getitem__, valeurs), dtype=np.int32, count=len(valeurs))
+    return list(table), indices.astype(np.min_scalar_type(max(len(table) - 1, 0)))
+
+
+class Cartes:
+    """
+    Ensemble des cartes d'un plateau, désignées par leur indice (0..n-1).
+    """
+
+    def __init__(self, ids, x, y, largeur, hauteur, couleurs, formes=None):
+        try:
+            self.ids = np.array(ids, dtype=np.bytes_)
+        except UnicodeEncodeError:
+            self.ids = np.array([i.encode() for i in ids], dtype=np.bytes_)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.largeur = np.asarray(largeur, dtype=np.float64)
+        self.hauteur = np.asarray(hauteur, dtype=np.float64)
+        self.noms_couleurs, self.couleur = interner(couleurs)
+        if formes is None:
+            formes = ["rectangle"] * len(self.x)
+        self.noms_formes, self.forme = interner(formes)
+
+        n = len(self.x)
+        self.revelee = np.zeros(n, dtype=bool)
+        self.trouvee = np.zeros(n, dtype=bool)
+
+        # Affichage : artistes Matplotlib par carte (tuples), ou collection du plateau
+        self.artistes = None
+        self.collection = None
+
+    @classmethod
+    def depuis_formes(cls, formes):
+        """
+        Construit le stockage à partir du dictionnaire lu par lire_fichier_config :
+        { 'ID': [(x,y), L, H, couleur] } ou { 'ID': [(x,y), L, H, couleur, forme] }.
+        """
+        donnees = list(formes.values())
+        return cls(
+            list(formes.keys()),
+            [d[0][0] for d in donnees], [d[0][1] for d in donnees],
+            [d[1] for d in donnees], [d[2] for d in donnees],
+            [d[3] for d in donnees],
+            [d[4] for d in donnees] if donnees and len(donnees[0]) > 4 else None
+        )
+
+    @classmethod
+    def depuis_colonnes(cls, ids, x, y, largeur, hauteur, noms_couleurs, couleur,
+                        noms_formes, forme):
+        """
+        Construit le stockage directement à partir de colonnes déjà prêtes
+        (ids en octets, couleurs et formes déjà internées), sans les recopier :
+        les colonnes peuvent être des projections en mémoire (memmap).
+        """
+        cartes = cls.__new__(cls)
+        cartes.ids = ids
+        cartes.x, cartes.y = x, y
+        cartes.largeur, cartes.hauteur = largeur, hauteur
+        cartes.noms_couleurs, cartes.couleur = list(noms_couleurs), couleur
+        cartes.noms_formes, cartes.forme = list(noms_formes), forme
+        n = len(x)
+        cartes.revelee = np.zeros(n, dtype=bool)
+        cartes.trouvee = np.zeros(n, dtype=bool)
+        cartes.artistes = None
+        cartes.collection = None
+        return cartes
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, i):
+        return Carte(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.x)):
+            yield Carte(self, i)
+
+    def rects(self):
+        """
+        Liste des rectangles [(x, y, largeur, hauteur), ...] (pour l'index spatial).
+        """
+        return list(zip(self.x.tolist(), self.y.tolist(),
+                        self.largeur.tolist(), self.hauteur.tolist()))
+
+    def couleurs(self):
+        """
+        Nom de la couleur de chaque carte.
+        """
+        return np.array(self.noms_couleurs, dtype=object)[self.couleur].tolist()
+
+    def formes(self):
+        """
+        Nom de la forme de chaque carte.
+        """
+        return np.array(self.noms_formes, dtype=object)[self.forme].tolist()
+
+    def cles_paires(self):
+        """
+        Identifiant entier de paire de chaque carte : deux cartes de même
+        couleur et de même forme ont le même identifiant.
+        """
+        return self.couleur.astype(np.int64) * len(self.noms_formes) + self.forme
+
+    # ---------------------------------------
+    # Requêtes vectorisées
+    # ---------------------------------------
+    def revelees(self):
+        """
+        Indices des cartes face visible.
+        """
+        return np.flatnonzero(self.revelee)
+
+    def non_revelees(self):
+        """
+        Indices des cartes face cachée.
+        """
+        return np.flatnonzero(~self.revelee)
+
+    def restantes(self):
+        """
+        Indices des cartes dont la paire n'a pas encore été trouvée.
+        """
+        return np.flatnonzero(~self.trouvee)
+
+    def dans_zone(self, xmin, ymin, xmax, ymax):
+        """
+        Indices des cartes dont le rectangle intersecte la zone donnée.
+        """
+        return np.flatnonzero(
+            (self.x <= xmax) & (self.x + self.largeur >= xmin) &
+            (self.y <= ymax) & (self.y + self.hauteur >= ymin)
+        )
+
+    def octets(self):
+        """
+        Mémoire occupée par les colonnes (hors artistes Matplotlib).
+        """
+        return sum(colonne.nbytes for colonne in (
+            self.ids, self.x, self.y, self.largeur, self.hauteur,
+            self.couleur, self.forme, self.revelee, self.trouvee))
+
+
+class Carte:
+    """
+    Vue sur la carte d'indice `indice` : lit et écrit dans les colonnes de `cartes`.
+    """
+
+    __slots__ = ('cartes', 'indice')
+
+    def __init__(self, cartes, indice):
+        self.cartes = cartes
+        self.indice = indice
+
+    @property
+    def id(self):
+        return self.cartes.ids[self.indice].decode()
+
+    @property
+    def x(self):
+        return self.cartes.x[self.indice]
+
+    @property
+    def y(self):
+        return self.cartes.y[self.indice]
+
+    @property
+    def largeur(self):
+        return self.cartes.largeur[self.indice]
+
+    @property
+    def hauteur(self):
+        return self.cartes.hauteur[self.indice]
+
+    @property
+    def couleur(self):
+        return self.cartes.noms_couleurs[self.cartes.couleur[self.indice]]
+
+    @property
+    def forme(self):
+        return self.cartes.noms_formes[self.cartes.forme[self.indice]]
+
+    @property
+    def revelee(self):
+        return bool(self.cartes.revelee[self.indice])
+
+    @revelee.setter
+    def revelee(self, valeur):
+        self.cartes.revelee[self.indice] = valeur
+
+    @property
+    def trouvee(self):
+        return bool(self.cartes.trouvee[self.indice])
+
+    @trouvee.setter
+    def trouvee(self, valeur):
+        self.cartes.trouvee[self.indice] = valeur
+
+    @property
+    def artistes(self):
+        return self.cartes.artistes[self.indice]
+
+    @property
+    def collection(self):
+        return self.cartes.collection
+
+    def __eq__(self, autre):
+        return (isinstance(autre, Carte) and autre.cartes is self.cartes
+                and autre.indice == self.indice)
+
+    def __hash__(self):
+        return hash((id(self.cartes), self.indice))
+
+    def __repr__(self):
+        return f"Carte({self.id!r}, {self.couleur!r}, {self.forme!r})"
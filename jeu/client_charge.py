@@ -0,0 +1,251 @@
+"""
+Test de charge du serveur de parties (jeu/serveur.py).
+
+Ouvre `--parties` parties inactives (deux places sur une même connexion, aucune
+carte retournée : ce qu'un serveur garde pour chaque partie ouverte), puis joue
+jusqu'au bout `--actives` parties simultanées entre deux connexions, avec des
+joueurs à mémoire parfaite qui réfléchissent `--reflexion` ms avant chaque carte.
+Mesure la latence d'un coup (envoi de « retourner » -> réception de « revelee »)
+et le débit de parties terminées, puis relève les statistiques du serveur.
+
+Usage : python -m jeu.client_charge --lancer-serveur --parties 10000 --actives 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+from jeu.agents import Reserve
+from jeu.instrumentation import Histogramme
+from jeu.serveur import HOTE, PORT, encoder, augmenter_limite_fichiers
+
+# Connexions ouvertes en même temps pendant la mise en place des parties inactives
+OUVERTURES_SIMULTANEES = 256
+
+
+class Statistiques:
+    __slots__ = ('latence', 'parties', 'erreurs')
+
+    def __init__(self):
+        self.latence = Histogramme()
+        self.parties = 0
+        self.erreurs = 0
+
+
+class Joueur:
+    """
+    Joueur distant à mémoire parfaite : retient toutes les cartes révélées
+    (les siennes et celles de l'adversaire) et joue pour les places qu'il occupe.
+    """
+
+    def __init__(self, rng, statistiques, reflexion):
+        self.rng = rng
+        self.statistiques = statistiques
+        self.reflexion = reflexion
+        self.places = ()
+        self.envoi = None  # (carte, instant) du coup en attente de réponse
+
+    async def jouer(self, reader, writer, premier_message=None):
+        """
+        Joue la partie jusqu'à sa fin, après avoir envoyé `premier_message` (creer/rejoindre).
+        """
+        if premier_message is not None:
+            writer.write(encoder(premier_message))
+        while True:
+            ligne = await reader.readline()
+            if not ligne:
+                return
+            message = json.loads(ligne)
+            type_ = message['type']
+            if type_ == 'partie':
+                self.places = tuple(message['places'])
+            elif type_ == 'debut':
+                self._debut(len(message['cartes']))
+            elif type_ == 'revelee':
+                self._revelee(message['carte'], message['cle'])
+            elif type_ == 'paire':
+                self._paire(message['cartes'])
+            elif type_ == 'masquees':
+                for i in message['cartes']:
+                    self.revelee[i] = 0
+                self.selection = []
+            elif type_ in ('fin', 'abandon'):
+                self.statistiques.parties += type_ == 'fin' and 1 in self.places
+                return
+            elif type_ == 'erreur':
+                self.statistiques.erreurs += 1
+                return
+            if type_ in ('debut', 'revelee', 'paire', 'joueur_suivant'):
+                await self._peut_jouer(writer, message['joueur'])
+
+    def _debut(self, n):
+        self.revelee = bytearray(n)
+        self.restantes = n // 2
+        self.inconnues = Reserve(range(n))
+        self.cles = {}            # indice -> clé des cartes vues
+        self.vues = {}            # clé -> indices vus encore en jeu
+        self.paires_connues = {}  # clés dont les deux cartes sont vues (ensemble ordonné)
+        self.selection = []
+
+    def _revelee(self, i, cle):
+        if self.envoi is not None and self.envoi[0] == i:
+            self.statistiques.latence.ajouter(time.perf_counter() - self.envoi[1])
+            self.envoi = None
+        cle = tuple(cle) if isinstance(cle, list) else cle
+        self.revelee[i] = 1
+        self.selection.append(i)
+        if i not in self.cles:
+            self.cles[i] = cle
+            self.inconnues.retirer(i)
+            indices = self.vues.setdefault(cle, [])
+            indices.append(i)
+            if len(indices) == 2:
+                self.paires_connues[cle] = None
+
+    def _paire(self, cartes):
+        cle = self.cles[cartes[0]]
+        self.vues.pop(cle, None)
+        self.paires_connues.pop(cle, None)
+        self.selection = []
+        self.restantes -= 1
+
+    async def _peut_jouer(self, writer, joueur):
+        # Une paire complète une partie terminée : le message « fin » suit
+        if joueur not in self.places or len(self.selection) == 2 or self.restantes == 0:
+            return
+        if self.reflexion:
+            await asyncio.sleep(self.reflexion)
+        carte = self._choisir()
+        self.envoi = (carte, time.perf_counter())
+        writer.write(encoder({'action': 'retourner', 'carte': carte}))
+
+    def _choisir(self):
+        if self.selection:
+            premiere = self.selection[0]
+            for i in self.vues.get(self.cles[premiere], ()):
+                if i != premiere:
+                    return i
+        elif self.paires_connues:
+            return self.vues[next(iter(self.paires_connues))][0]
+        i = self.inconnues.tirer(self.rng, self.revelee)
+        if i is None:
+            i = next(j for j in self.cles if not self.revelee[j] and self.cles[j] in self.vues)
+        return i
+
+
+async def _connecter(hote, port):
+    return await asyncio.open_connection(hote, port, limit=1 << 20)
+
+
+async def _requete(hote, port, message):
+    reader, writer = await _connecter(hote, port)
+    writer.write(encoder(message))
+    reponse = json.loads(await reader.readline())
+    writer.close()
+    return reponse
+
+
+async def ouvrir_inactives(hote, port, nombre, regle):
+    """
+    Ouvre `nombre` parties sans les jouer ; renvoie leurs connexions (à fermer).
+    """
+    limite = asyncio.Semaphore(OUVERTURES_SIMULTANEES)
+
+    async def ouvrir():
+        async with limite:
+            reader, writer = await _connecter(hote, port)
+            writer.write(encoder({'action': 'creer', 'regle': regle, 'joueurs': 2, 'nom': 'inactif'}))
+            while json.loads(await reader.readline())['type'] != 'debut':
+                pass
+            return writer
+
+    return await asyncio.gather(*(ouvrir() for _ in range(nombre)))
+
+
+async def jouer_actives(hote, port, nombre, regle, reflexion, duree, rng, statistiques):
+    """
+    `nombre` parties simultanées entre deux connexions, relancées pendant `duree` secondes.
+    """
+    fin = time.perf_counter() + duree
+
+    async def table(k):
+        while True:
+            r1, w1 = await _connecter(hote, port)
+            r2, w2 = await _connecter(hote, port)
+            j1 = Joueur(random.Random(rng.random()), statistiques, reflexion)
+            j2 = Joueur(random.Random(rng.random()), statistiques, reflexion)
+            # Le second joueur rejoint la partie du premier dès qu'il connaît son numéro
+            w1.write(encoder({'action': 'creer', 'regle': regle, 'joueurs': 1, 'nom': f"table {k}"}))
+            reponse = json.loads(await r1.readline())
+            j1.places = tuple(reponse['places'])
+            await asyncio.gather(
+                j1.jouer(r1, w1),
+                j2.jouer(r2, w2, {'action': 'rejoindre', 'partie': reponse['partie'], 'nom': 'adversaire'}))
+            for w in (w1, w2):
+                w.close()
+            if time.perf_counter() >= fin:
+                return
+
+    await asyncio.gather(*(table(k) for k in range(nombre)))
+
+
+async def charge(args):
+    rng = random.Random(args.graine)
+    statistiques = Statistiques()
+
+    debut = time.perf_counter()
+    inactives = await ouvrir_inactives(args.hote, args.port, args.parties, args.regle)
+    print(f"{len(inactives)} parties inactives ouvertes en {time.perf_counter() - debut:.1f} s")
+    print("serveur :", await _requete(args.hote, args.port, {'action': 'statistiques'}))
+
+    debut = time.perf_counter()
+    await jouer_actives(args.hote, args.port, args.actives, args.regle, args.reflexion / 1000,
+                        args.duree, rng, statistiques)
+    ecoule = time.perf_counter() - debut
+    resume = statistiques.latence.resume()
+    print(f"{statistiques.parties} parties jouées en {ecoule:.1f} s "
+          f"({statistiques.parties / ecoule:.1f} parties/s, {statistiques.erreurs} erreurs), "
+          f"{args.parties} parties inactives ouvertes")
+    if resume['nombre']:
+        print(f"latence d'un coup ({resume['nombre']} coups) : p50 {resume['p50_ms']:.2f} ms, "
+              f"p95 {resume['p95_ms']:.2f} ms, p99 {resume['p99_ms']:.2f} ms, max {resume['max_ms']:.2f} ms")
+    print("serveur :", await _requete(args.hote, args.port, {'action': 'statistiques'}))
+
+    for writer in inactives:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du serveur de parties.")
+    parser.add_argument('--hote', default=HOTE)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--parties', type=int, default=1000, help="parties inactives gardées ouvertes")
+    parser.add_argument('--actives', type=int, default=50, help="parties jouées simultanément")
+    parser.add_argument('--reflexion', type=float, default=50, help="temps de réflexion par carte (ms)")
+    parser.add_argument('--duree', type=float, default=10, help="durée de la phase de jeu (s)")
+    parser.add_argument('--regle', choices=['classique', 'formes'], default='classique')
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--lancer-serveur', action='store_true',
+                        help="lance le serveur dans un autre processus (arrêté à la fin)")
+    args = parser.parse_args()
+
+    augmenter_limite_fichiers()
+    serveur = None
+    if args.lancer_serveur:
+        serveur = subprocess.Popen([sys.executable, "-m", "jeu.serveur", "--hote", args.hote,
+                                    "--port", str(args.port),
+                                    "--parties-max", str(args.parties + 2 * args.actives + 10)])
+        time.sleep(1.0)
+    try:
+        asyncio.run(charge(args))
+    finally:
+        if serveur is not None:
+            serveur.terminate()
+            serveur.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Fichiers binaires « en colonnes » : un en-tête JSON suivi de tableaux NumPy bruts,
+relus par projection en mémoire (memmap) sans analyser ni copier les données.
+
+Format : signature (8 octets), longueur de l'en-tête (8 octets), en-tête JSON,
+puis les colonnes, chacune alignée sur ALIGNEMENT octets. L'en-tête donne, pour
+chaque colonne, son type, sa forme et sa position relative au début des données.
+"""
+import json
+import os
+
+import numpy as np
+
+ALIGNEMENT = 64
+
+
+def _aligner(position):
+    return -(-position // ALIGNEMENT) * ALIGNEMENT
+
+
+def ecrire_colonnes(chemin, signature, entete, colonnes):
+    """
+    Écrit `entete` (dictionnaire JSON) et les tableaux de `colonnes` dans `chemin`.
+    Le fichier est écrit à côté puis renommé : un lecteur ne voit jamais un fichier
+    à moitié écrit.
+    """
+    colonnes = {nom: np.ascontiguousarray(colonne) for nom, colonne in colonnes.items()}
+    entete = dict(entete, colonnes={})
+    position = 0
+    for nom, colonne in colonnes.items():
+        entete['colonnes'][nom] = [colonne.dtype.str, list(colonne.shape), position]
+        position = _aligner(position + colonne.nbytes)
+    texte = json.dumps(entete).encode()
+    debut = _aligner(len(signature) + 8 + len(texte))
+
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(signature)
+        f.write(len(texte).to_bytes(8, "little"))
+        f.write(texte)
+        for nom, colonne in colonnes.items():
+            f.seek(debut + entete['colonnes'][nom][2])
+            f.write(colonne.tobytes())
+        f.truncate(debut + position)
+    os.replace(temporaire, chemin)
+
+
+def lire_entete(chemin, signature):
+    """
+    (en-tête, début des données), ou (None, 0) si `chemin` n'a pas la bonne signature.
+    """
+    with open(chemin, "rb") as f:
+        if f.read(len(signature)) != signature:
+            return None, 0
+        taille = int.from_bytes(f.read(8), "little")
+        return json.loads(f.read(taille)), _aligner(len(signature) + 8 + taille)
+
+
+def projeter(chemin, entete, debut, nom):
+    """
+    Colonne `nom` projetée en mémoire (lecture seule).
+    """
+    dtype, forme, position = entete['colonnes'][nom]
+    if 0 in forme:
+        return np.empty(forme, dtype=np.dtype(dtype))
+    return np.memmap(chemin, dtype=np.dtype(dtype), mode='r',
+                     offset=debut + position, shape=tuple(forme))
+
+
+def lire_colonnes(chemin, signature):
+    """
+    (en-tête, { nom : colonne projetée }), ou (None, None) si la signature ne correspond pas.
+    """
+    entete, debut = lire_entete(chemin, signature)
+    if entete is None:
+        return None, None
+    return entete, {nom: projeter(chemin, entete, debut, nom) for nom in entete['colonnes']}
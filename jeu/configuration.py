@@ -0,0 +1,537 @@
+"""
+Fichiers de configuration des plateaux (lecture et génération), sans Matplotlib :
+utilisable aussi bien par les scripts de jeu que par les outils sans affichage
+(tournoi, simulation).
+
+Format d'une ligne : ID;[x,y];L;H;couleur        (mode classique)
+                     ID;[x,y];L;H;couleur;forme  (mode formes)
+
+Les fichiers sont lus ligne par ligne, sans eval, par un analyseur strict qui
+signale chaque erreur avec son numéro de ligne. charger_plateau garde en plus,
+à côté du fichier texte, une copie binaire en colonnes (cache) relue par
+projection en mémoire (memmap) tant que le fichier source n'a pas changé.
+
+generer_plateau tire des plateaux de n'importe quelle taille (formes, couleurs,
+exemplaires, grille), écrits au format texte ou binaire :
+
+Usage : python -m jeu.configuration --exemplaires 4 --couleurs red green blue --lignes 4
+        python -m jeu.configuration --couleurs 250000 --formes circle triangle \\
+            --graine 0 --sortie plateau.plateau   (1 million de cartes, fichier binaire)
+"""
+import argparse
+import hashlib
+import math
+import os
+import random
+import re
+
+import numpy as np
+
+from jeu.cartes import Cartes
+from jeu.colonnes import ecrire_colonnes, lire_entete, projeter
+
+FORMES = ["circle", "triangle", "rectangle"]
+COULEURS_FORMES = ["red", "green", "blue", "yellow", "purple", "orange"]
+
+
+# ---------------------------------------
+# 1) Analyse des lignes
+# ---------------------------------------
+class ErreurConfig(ValueError):
+    """
+    Fichier de configuration invalide ; `erreurs` : liste de (numéro de ligne, message).
+    """
+
+    # Nombre maximal d'erreurs rapportées pour un même fichier
+    MAX_ERREURS = 20
+
+    def __init__(self, fichier, erreurs):
+        self.fichier = fichier
+        self.erreurs = erreurs
+        lignes = [f"{fichier}:{numero}: {message}" for numero, message in erreurs]
+        super().__init__("\n".join(lignes))
+
+
+# Une ligne complète, appliquée à tout un bloc de lignes à la fois (re.MULTILINE).
+# Les nombres sont seulement délimités ici : leur syntaxe est vérifiée à la conversion.
+_MOT = r"([^;\s]+(?:[ \t]+[^;\s]+)*)"  # texte sans ';' ni espaces aux extrémités
+_LIGNE = re.compile(
+    rf"^[ \t]*{_MOT}[ \t]*;[ \t]*[\[(]([^,;\n]*),([^;\n\])]*)[\])][ \t]*;([^;\n]*);([^;\n]*);"
+    rf"[ \t]*{_MOT}[ \t]*(?:;[ \t]*([^;\s]*)[ \t]*)?;?[ \t\r]*$",
+    re.MULTILINE
+)
+
+# Taille (en octets) des blocs de lignes analysés d'un coup
+TAILLE_BLOC = 1 << 22
+
+_FORMES_OU_VIDE = set(FORMES) | {""}
+
+
+def _nombre(texte):
+    """
+    Nombre fini écrit dans `texte` (ValueError sinon).
+    """
+    valeur = float(texte)
+    if not math.isfinite(valeur):
+        raise ValueError(texte)
+    return valeur
+
+
+def _diagnostiquer(ligne):
+    """
+    Message d'erreur pour une ligne refusée par l'expression régulière.
+    """
+    ligne = ligne.strip()
+    champs = [c.strip() for c in (ligne[:-1] if ligne.endswith(";") else ligne).split(";")]
+    if len(champs) not in (5, 6):
+        return f"{len(champs)} champs au lieu de 5 ou 6 (ID;[x,y];L;H;couleur[;forme])"
+    if not champs[0]:
+        return "identifiant vide"
+    point = champs[1]
+    if point[:1] not in "[(" or point[-1:] not in "])" or point.count(",") != 1:
+        return f"coordonnées invalides {point!r} (attendu [x,y])"
+    if not champs[4]:
+        return "couleur vide"
+    return f"ligne invalide {ligne!r}"
+
+
+def _verifier(groupes, vus):
+    """
+    Convertit et contrôle une ligne bien formée : renvoie (carte, None) si elle est
+    valide, (None, message) sinon.
+    """
+    idx, x, y, L, H, couleur, forme = groupes
+    valeurs = []
+    for nom, texte in (("x", x), ("y", y), ("largeur", L), ("hauteur", H)):
+        try:
+            valeurs.append(_nombre(texte))
+        except ValueError:
+            return None, f"{nom} invalide {texte.strip()!r}"
+    if valeurs[2] <= 0 or valeurs[3] <= 0:
+        return None, f"dimensions {L.strip()}×{H.strip()} : largeur et hauteur doivent être positives"
+    if forme not in _FORMES_OU_VIDE:
+        return None, f"forme inconnue {forme!r} (formes possibles : {', '.join(FORMES)})"
+    if idx in vus:
+        return None, f"identifiant {idx!r} en double"
+    return (idx, *valeurs, couleur, forme), None
+
+
+def _analyser_bloc(numero, lignes, vus, erreurs):
+    """
+    Analyse un bloc de lignes (la première porte le numéro `numero`) et renvoie
+    ses cartes valides : (ids, couleurs, formes, nombres), `nombres` étant un
+    tableau (4, n) des x, y, L, H. Cas courant : une seule recherche sur tout le
+    bloc, conversion des nombres par NumPy et contrôles globaux ; si le bloc
+    contient une erreur, il est repris ligne par ligne pour la localiser.
+    """
+    cartes = _LIGNE.findall("".join(lignes))
+    non_vides = len(lignes) - sum(1 for ligne in lignes if ligne.isspace())
+    if non_vides == 0:
+        return None
+    if len(cartes) == non_vides:
+        ids, x, y, L, H, couleurs, formes = zip(*cartes)
+        try:
+            nombres = np.array([np.fromiter(map(float, c), dtype=np.float64, count=len(c))
+                                for c in (x, y, L, H)])
+        except ValueError:
+            nombres = None
+        if (nombres is not None and np.isfinite(nombres).all() and (nombres[2:] > 0).all()
+                and set(formes) <= _FORMES_OU_VIDE
+                and len(set(ids)) == len(ids) and vus.isdisjoint(ids)):
+            vus.update(ids)
+            return ids, couleurs, formes, nombres
+
+    cartes = []
+    for k, ligne in enumerate(lignes):
+        if ligne.isspace():
+            continue
+        m = _LIGNE.fullmatch(ligne.rstrip("\n"))
+        if m is None:
+            carte, message = None, _diagnostiquer(ligne)
+        else:
+            carte, message = _verifier(m.groups(""), vus)
+        if carte is not None:
+            vus.add(carte[0])
+            cartes.append(carte)
+        elif len(erreurs) < ErreurConfig.MAX_ERREURS:
+            erreurs.append((numero + k, message))
+    if not cartes:
+        return None
+    ids, x, y, L, H, couleurs, formes = zip(*cartes)
+    return ids, couleurs, formes, np.array([x, y, L, H], dtype=np.float64)
+
+
+def analyser_blocs(fichier):
+    """
+    Lit le fichier par blocs de lignes et produit, pour chaque bloc,
+    (ids, couleurs, formes, nombres) : voir _analyser_bloc ; la forme est vide si
+    elle est absente. Les lignes vides sont ignorées. Les erreurs (format, nombres
+    invalides, dimensions négatives ou nulles, forme inconnue, ID en double) sont
+    toutes relevées puis signalées ensemble par une ErreurConfig à la fin.
+    """
+    erreurs = []
+    vus = set()
+    numero = 1
+    with open(fichier, "r") as f:
+        while True:
+            lignes = f.readlines(TAILLE_BLOC)
+            if not lignes:
+                break
+            bloc = _analyser_bloc(numero, lignes, vus, erreurs)
+            numero += len(lignes)
+            if bloc and not erreurs:
+                yield bloc
+    if erreurs:
+        raise ErreurConfig(fichier, erreurs)
+
+
+# ---------------------------------------
+# 2) Lecture sous forme de dictionnaire (scripts de jeu)
+# ---------------------------------------
+def _valeur(v):
+    """
+    Les valeurs entières restent des entiers, comme avec l'ancienne lecture par int().
+    """
+    return int(v) if v.is_integer() else v
+
+
+def _valeurs(colonne):
+    """
+    Liste des valeurs d'une colonne, en entiers si elles le sont toutes.
+    """
+    entiers = colonne.astype(np.int64)
+    if np.array_equal(entiers, colonne):
+        return entiers.tolist()
+    return [_valeur(v) for v in colonne.tolist()]
+
+
+def dictionnaire_plateau(cartes, avec_forme):
+    """
+    Dictionnaire des scripts { 'ID': [(x,y), L, H, couleur(, forme)] } à partir des Cartes.
+    """
+    champs = [_valeurs(c) for c in (cartes.x, cartes.y, cartes.largeur, cartes.hauteur)]
+    champs += [cartes.couleurs()] + ([cartes.formes()] if avec_forme else [])
+    return {idx.decode(): [(cx, cy), *reste]
+            for idx, cx, cy, *reste in zip(cartes.ids.tolist(), *champs)}
+
+
+def lire_config_classique(fichier):
+    """
+    Lit le fichier de configuration (via le cache de charger_plateau) et retourne
+    un dictionnaire { 'indice': [(x,y), largeur, hauteur, couleur], ... }.
+    """
+    return dictionnaire_plateau(charger_plateau(fichier), avec_forme=False)
+
+
+def lire_config_formes(fichier):
+    """
+    Lit chaque ligne du fichier (ex: ID;[x,y];L;H;couleur;shape), via le cache de
+    charger_plateau, et renvoie un dict { 'ID': [(x,y), L, H, couleur, shape], ... }.
+    """
+    return dictionnaire_plateau(charger_plateau(fichier), avec_forme=True)
+
+
+# ---------------------------------------
+# 3) Lecture en colonnes, avec cache binaire (voir jeu/colonnes.py)
+# ---------------------------------------
+EXTENSION_CACHE = ".plateau"
+SIGNATURE_CACHE = b"MEMPLAT1"
+_COLONNES = ('ids', 'x', 'y', 'largeur', 'hauteur', 'couleur', 'forme')
+
+# En dessous de cette taille, le contenu du fichier source est toujours vérifié
+# (empreinte SHA-256, quelques microsecondes) : la date de modification n'a pas
+# toujours une résolution suffisante (deux écritures dans le même intervalle)
+TAILLE_VERIFIEE = 1 << 20
+
+
+def _empreinte(fichier):
+    h = hashlib.sha256()
+    with open(fichier, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def _source(fichier, empreinte=None):
+    etat = os.stat(fichier)
+    return {'mtime_ns': etat.st_mtime_ns, 'taille': etat.st_size,
+            'sha256': empreinte or _empreinte(fichier)}
+
+
+def _ecrire_cache(cartes, chemin, source):
+    entete = {'source': source,
+              'noms_couleurs': cartes.noms_couleurs, 'noms_formes': cartes.noms_formes}
+    ecrire_colonnes(chemin, SIGNATURE_CACHE, entete,
+                    {nom: getattr(cartes, nom) for nom in _COLONNES})
+
+
+def _lire_cache(chemin, entete, debut):
+    """
+    Cartes dont les colonnes sont projetées en mémoire depuis le fichier cache.
+    """
+    colonnes = {nom: projeter(chemin, entete, debut, nom) for nom in _COLONNES}
+    return Cartes.depuis_colonnes(noms_couleurs=entete['noms_couleurs'],
+                                  noms_formes=entete['noms_formes'], **colonnes)
+
+
+def charger_plateau(fichier, cache=True):
+    """
+    Lit le plateau de `fichier` sous forme de Cartes (colonnes NumPy). Un fichier
+    d'extension EXTENSION_CACHE est un plateau binaire (ecrire_plateau), relu tel quel.
+
+    Avec cache=True, les colonnes sont aussi écrites dans `fichier + EXTENSION_CACHE` ;
+    les lectures suivantes projettent ce fichier en mémoire au lieu de réanalyser le
+    texte. Le cache est valide si le fichier source a le même contenu (empreinte
+    SHA-256) ; au-delà de TAILLE_VERIFIEE octets, la même date de modification et
+    la même taille suffisent, sans relire le fichier.
+    """
+    if fichier.endswith(EXTENSION_CACHE):
+        # Plateau binaire écrit par ecrire_plateau : pas de fichier texte source
+        entete, debut = lire_entete(fichier, SIGNATURE_CACHE)
+        if entete is None:
+            raise ErreurConfig(fichier, [(1, "fichier de plateau binaire invalide")])
+        return _lire_cache(fichier, entete, debut)
+
+    chemin = fichier + EXTENSION_CACHE
+    empreinte = None
+    if cache and os.path.exists(chemin):
+        try:
+            entete, debut = lire_entete(chemin, SIGNATURE_CACHE)
+        except (OSError, ValueError):
+            entete = None
+        if entete is not None:
+            etat = os.stat(fichier)
+            source = entete['source']
+            inchange = (source['mtime_ns'], source['taille']) == (etat.st_mtime_ns, etat.st_size)
+            if inchange and etat.st_size > TAILLE_VERIFIEE:
+                return _lire_cache(chemin, entete, debut)
+            empreinte = _empreinte(fichier)
+            if empreinte == source['sha256']:
+                cartes = _lire_cache(chemin, entete, debut)
+                if not inchange:
+                    # Fichier touché mais inchangé : seule la date du cache est mise à jour
+                    try:
+                        _ecrire_cache(cartes, chemin, _source(fichier, empreinte))
+                    except OSError:
+                        pass
+                return cartes
+
+    blocs = list(analyser_blocs(fichier))
+    ids, couleurs, formes = ([v for bloc in blocs for v in bloc[k]] for k in range(3))
+    nombres = np.concatenate([bloc[3] for bloc in blocs], axis=1) if blocs else np.empty((4, 0))
+    cartes = Cartes(ids, *nombres, couleurs, [forme or "rectangle" for forme in formes])
+
+    if cache:
+        try:
+            _ecrire_cache(cartes, chemin, _source(fichier, empreinte))
+        except OSError:
+            pass  # dossier en lecture seule : on se passe du cache
+    return cartes
+
+
+# ---------------------------------------
+# 4) Génération de plateaux et écriture (texte ou binaire)
+# ---------------------------------------
+def _ids_numerotes(prefixe, n):
+    """
+    Identifiants prefixe1 .. prefixen (octets), sans passer par des chaînes Python :
+    les numéros de même nombre de chiffres forment des tranches consécutives.
+    """
+    prefixe = prefixe.encode()
+    chiffres = len(str(n))
+    ids = np.zeros((n, len(prefixe) + chiffres), dtype=np.uint8)
+    ids[:, :len(prefixe)] = np.frombuffer(prefixe, dtype=np.uint8)
+    for k in range(1, chiffres + 1):
+        debut, fin = 10 ** (k - 1), min(10 ** k, n + 1)
+        if debut > n:
+            break
+        numeros = np.arange(debut, fin, dtype=np.uint32)
+        for j in range(k):
+            ids[debut - 1:fin - 1, len(prefixe) + k - 1 - j] = numeros % 10 + 48
+            numeros //= 10
+    return ids.view(f"S{ids.shape[1]}").ravel()
+
+
+def _couleurs_distinctes(nombre):
+    """
+    `nombre` couleurs distinctes (#rrggbb) réparties sur tout le cube RVB.
+    """
+    if nombre > 0xFFFFFF:
+        raise ValueError(f"au plus {0xFFFFFF} couleurs distinctes")
+    valeurs = np.arange(nombre, dtype=np.int64) * (0xFFFFFF // max(nombre, 1))
+    hexa = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)[(valeurs[:, None] >> np.arange(20, -1, -4)) & 15]
+    octets = np.hstack([np.full((nombre, 1), ord("#"), dtype=np.uint8), hexa])
+    return octets.view("S7").ravel().astype("U7").tolist()
+
+
+def generer_plateau(formes=FORMES, couleurs=COULEURS_FORMES, exemplaires=2,
+                    colonnes=None, lignes=None, largeur=3, hauteur=3, espacement=0, graine=None):
+    """
+    Plateau aléatoire (Cartes) : chaque combinaison (forme, couleur) est présente en
+    `exemplaires` cartes (2 = paires ; les règles du jeu apparient les cartes deux à
+    deux, une partie ne se termine que si ce nombre est pair). Les cartes occupent des
+    cases tirées au hasard d'une grille colonnes × lignes (par défaut la plus carrée
+    possible), de pas largeur + espacement et hauteur + espacement.
+
+    `couleurs` : liste de noms, ou nombre de couleurs distinctes à générer (#rrggbb).
+    Tirage vectorisé (permutations NumPy) à partir de `graine` : un million de cartes
+    en une fraction de seconde. Les identifiants sont shape_1 .. shape_n.
+    """
+    if isinstance(couleurs, int):
+        couleurs = _couleurs_distinctes(couleurs)
+    formes, couleurs = list(formes), list(couleurs)
+    if exemplaires < 2:
+        raise ValueError("il faut au moins 2 exemplaires de chaque carte")
+    if not formes or not couleurs:
+        raise ValueError("il faut au moins une forme et une couleur")
+    inconnues = set(formes) - set(FORMES)
+    if inconnues:
+        raise ValueError(f"formes inconnues : {sorted(inconnues)} (possibles : {FORMES})")
+    combinaisons = len(formes) * len(couleurs)
+    n = combinaisons * exemplaires
+    if colonnes is None and lignes is None:
+        colonnes = math.ceil(math.sqrt(n))
+    if colonnes is None:
+        colonnes = -(-n // lignes)
+    if lignes is None:
+        lignes = -(-n // colonnes)
+    if colonnes * lignes < n:
+        raise ValueError(f"une grille {colonnes}×{lignes} ne peut pas contenir {n} cartes")
+
+    rng = np.random.default_rng(graine)
+    combinaison = rng.permutation(np.arange(n) % combinaisons)
+    cases = rng.permutation(colonnes * lignes)[:n]
+
+    return Cartes.depuis_colonnes(
+        _ids_numerotes("shape_", n),
+        (cases % colonnes) * float(largeur + espacement),
+        (cases // colonnes) * float(hauteur + espacement),
+        np.full(n, float(largeur)), np.full(n, float(hauteur)),
+        couleurs, (combinaison % len(couleurs)).astype(np.min_scalar_type(len(couleurs) - 1)),
+        formes, (combinaison // len(couleurs)).astype(np.min_scalar_type(len(formes) - 1)),
+    )
+
+
+def _table_textes(textes):
+    """
+    Textes (str) sous forme de tableau d'octets (nombre, largeur) complété par des zéros.
+    """
+    octets = np.array([t.encode() for t in textes] or [b""], dtype=np.bytes_)
+    return octets.view(np.uint8).reshape(len(octets), -1)
+
+
+def _colonne_texte(colonne):
+    """
+    (table des textes des valeurs distinctes, indice de chaque valeur dans la table).
+    """
+    colonne = np.asarray(colonne)
+    if len(colonne) and colonne.min() == colonne.max():
+        # Colonne constante (tailles des cartes, le plus souvent) : pas de tri
+        valeurs, indices = colonne[:1], np.zeros(len(colonne), dtype=np.intp)
+    else:
+        valeurs, indices = np.unique(colonne, return_inverse=True)
+    return _table_textes([str(_valeur(v)) for v in valeurs.tolist()]), indices
+
+
+def ecrire_config(cartes, fichier, avec_forme=True, taille_bloc=1 << 16):
+    """
+    Écrit les `cartes` au format texte (une ligne ID;[x,y];L;H;couleur[;forme] par
+    carte), par blocs de lignes assemblés directement en octets. Le cache de
+    charger_plateau associé à `fichier`, s'il existe, est supprimé. Renvoie `fichier`.
+    """
+    n = len(cartes)
+    # Chaque morceau de ligne : (table d'octets, indices des cartes) ou texte fixe.
+    # Les octets nuls de remplissage des tables sont retirés à l'écriture.
+    ids = np.asarray(cartes.ids)
+    morceaux = [(ids.view(np.uint8).reshape(n, -1) if n else np.zeros((0, 1), np.uint8), None), b";["]
+    morceaux += [_colonne_texte(cartes.x), b",", _colonne_texte(cartes.y), b"];",
+                 _colonne_texte(cartes.largeur), b";", _colonne_texte(cartes.hauteur), b";",
+                 (_table_textes(cartes.noms_couleurs), np.asarray(cartes.couleur))]
+    if avec_forme:
+        morceaux += [b";", (_table_textes(cartes.noms_formes), np.asarray(cartes.forme))]
+    morceaux.append(b"\n")
+    largeur = sum(len(m) if isinstance(m, bytes) else m[0].shape[1] for m in morceaux)
+
+    with open(fichier, "wb") as f:
+        for debut in range(0, n, taille_bloc):
+            fin = min(n, debut + taille_bloc)
+            bloc = np.empty((fin - debut, largeur), dtype=np.uint8)
+            k = 0
+            for morceau in morceaux:
+                if isinstance(morceau, bytes):
+                    bloc[:, k:k + len(morceau)] = np.frombuffer(morceau, dtype=np.uint8)
+                    k += len(morceau)
+                    continue
+                table, indices = morceau
+                w = table.shape[1]
+                bloc[:, k:k + w] = table[debut:fin] if indices is None else table[indices[debut:fin]]
+                k += w
+            f.write(bloc[bloc != 0].tobytes())
+    # Contenu remplacé : l'ancien cache ne doit pas être servi, même si la date de
+    # modification et la taille du fichier n'ont pas changé
+    try:
+        os.remove(fichier + EXTENSION_CACHE)
+    except OSError:
+        pass
+    return fichier
+
+
+def ecrire_plateau(cartes, fichier):
+    """
+    Écrit les `cartes` dans un fichier binaire en colonnes (même format que le cache
+    de charger_plateau), relu directement par charger_plateau / lire_config_*.
+    """
+    _ecrire_cache(cartes, fichier, None)
+    return fichier
+
+
+def plateau_formes_aleatoire(rng=random):
+    """
+    Tire un plateau du mode formes : 36 cartes = (3 formes × 6 couleurs) × 2 exemplaires,
+    positionnées aléatoirement dans une grille 6×6. `rng` : module random ou random.Random.
+    Renvoie le même dictionnaire que lire_config_formes.
+    """
+    cartes = generer_plateau(colonnes=6, lignes=6, graine=rng.getrandbits(64))
+    return dictionnaire_plateau(cartes, avec_forme=True)
+
+
+def generate_shapes_config(filename="config_shapes.txt", rng=random):
+    """
+    Génère un fichier config pour le mode formes (voir plateau_formes_aleatoire).
+    """
+    return ecrire_config(generer_plateau(colonnes=6, lignes=6, graine=rng.getrandbits(64)), filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un plateau aléatoire du mode formes.")
+    parser.add_argument('--formes', nargs='+', default=FORMES, choices=FORMES)
+    parser.add_argument('--couleurs', nargs='+', default=COULEURS_FORMES,
+                        help="noms des couleurs, ou nombre de couleurs distinctes à générer")
+    parser.add_argument('--exemplaires', type=int, default=2, help="cartes identiques par combinaison")
+    parser.add_argument('--colonnes', type=int, default=None)
+    parser.add_argument('--lignes', type=int, default=None)
+    parser.add_argument('--largeur', type=float, default=3)
+    parser.add_argument('--hauteur', type=float, default=3)
+    parser.add_argument('--espacement', type=float, default=0)
+    parser.add_argument('--graine', type=int, default=None)
+    parser.add_argument('--sortie', default="config_shapes.txt",
+                        help=f"fichier texte, ou binaire si l'extension est {EXTENSION_CACHE}")
+    args = parser.parse_args()
+    couleurs = args.couleurs
+    if len(couleurs) == 1 and couleurs[0].isdigit():
+        couleurs = int(couleurs[0])
+
+    try:
+        cartes = generer_plateau(args.formes, couleurs, args.exemplaires, args.colonnes,
+                                 args.lignes, args.largeur, args.hauteur, args.espacement, args.graine)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.sortie.endswith(EXTENSION_CACHE):
+        ecrire_plateau(cartes, args.sortie)
+    else:
+        ecrire_config(cartes, args.sortie)
+    print(f"{len(cartes)} cartes écrites dans {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
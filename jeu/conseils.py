@@ -0,0 +1,271 @@
+"""
+Analyse de la partie en cours pour le panneau de conseils : pour chaque carte
+cachée, probabilité qu'elle forme une paire avec la carte retournée ; nombre de
+paires connues pas encore prises ; meilleur coup suivant.
+
+L'analyste suit la partie par les événements du moteur, comme les agents
+(jeu/agents.py) : il ne connaît une carte qu'une fois retournée, et retient
+toutes les cartes vues par l'un ou l'autre joueur. Chaque événement est traité
+en O(1), avec des compteurs indexés par la clé de paire du moteur (la couleur en
+mode classique, le couple (couleur, forme) en mode formes) : aucune carte n'est
+parcourue après debut_partie.
+
+Toutes les cartes jamais vues ont la même probabilité de compléter la paire de la
+carte retournée : (cartes jamais vues de sa clé) / (cartes jamais vues). Une carte
+déjà vue la complète à coup sûr si elle a la même clé, jamais sinon.
+
+Le meilleur coup est celui de la stratégie à mémoire parfaite (AgentMemoire,
+jeu/solveur.py) : prendre une paire connue, compléter la carte retournée si sa
+partenaire est connue, sinon retourner une carte jamais vue.
+
+Panneau affiché par les scripts avec l'option --conseils (ou JEU_CONSEILS=1) :
+résumé des probabilités, et probabilité de la carte cachée sous le pointeur
+(Analyste.probabilite, en O(1) à chaque carte survolée).
+
+Usage : python -m jeu.conseils --cartes 100000   (débit de coups avec l'analyse)
+        python -m jeu.conseils --cartes 200 --verifier
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter, namedtuple
+
+from jeu.agents import AgentMemoire, Reserve
+from jeu.moteur import Moteur, REVELEE, PAIRE, ETAT_ATTENTE_MASQUAGE
+
+Conseil = namedtuple('Conseil', ['carte', 'partenaires', 'probabilite_inconnue',
+                                 'inconnues', 'paires_connues', 'coup'])
+Conseil.__doc__ = """
+carte                : carte retournée, première du tour (None s'il n'y en a pas)
+partenaires          : cartes cachées déjà vues qui complètent sa paire (probabilité 1)
+probabilite_inconnue : probabilité, pour chaque carte jamais vue, qu'elle complète la paire
+inconnues            : nombre de cartes jamais vues
+paires_connues       : paires dont les deux cartes ont été vues, pas encore prises
+coup                 : meilleur coup suivant (indice de carte), None si aucun coup n'est possible
+"""
+
+
+def conseils_demandes(arguments=None):
+    """
+    Panneau de conseils demandé : option --conseils, ou variable d'environnement JEU_CONSEILS=1.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--conseils', action='store_true')
+    args, _ = parser.parse_known_args(arguments)
+    return args.conseils or os.environ.get('JEU_CONSEILS', "") not in ("", "0")
+
+
+class Analyste:
+    """
+    Suit une partie (Moteur) et répond en O(1) aux questions du panneau de conseils.
+    """
+
+    def __init__(self):
+        self.moteur = None
+
+    def debut_partie(self, moteur):
+        """
+        S'abonne aux événements du moteur (à faire avant l'affichage, qui lit l'analyse).
+        Seule étape en O(n).
+        """
+        self.moteur = moteur
+        moteur.abonner(self.observer)
+        self.inconnues = Reserve(i for i, r in enumerate(moteur.revelee) if not r)
+        # Partie reprise (jeu/sauvegarde.py) : la carte déjà retournée du tour est vue ici
+        for i in moteur.selection:
+            self.inconnues.ajouter(i)
+        self.inconnues_par_cle = Counter(moteur.cles[i] for i in self.inconnues.elements)
+        self.vues = {}            # clé de paire -> cartes vues encore en jeu
+        self.paires_connues = {}  # clés dont au moins deux cartes sont vues (ensemble ordonné)
+        self.nombre_paires_connues = 0
+        for i in moteur.selection:
+            self._voir(i, moteur.cles[i])
+
+    def observer(self, evenements):
+        cles = self.moteur.cles
+        for ev in evenements:
+            if ev.type == REVELEE:
+                i = ev.cartes[0]
+                if i in self.inconnues:
+                    self._voir(i, cles[i])
+            elif ev.type == PAIRE:
+                self._prendre(ev.cartes, cles[ev.cartes[0]])
+
+    def _voir(self, i, cle):
+        self.inconnues.retirer(i)
+        self.inconnues_par_cle[cle] -= 1
+        indices = self.vues.setdefault(cle, [])
+        indices.append(i)
+        if len(indices) % 2 == 0:
+            self.nombre_paires_connues += 1
+            self.paires_connues[cle] = None
+
+    def _prendre(self, cartes, cle):
+        # Les deux cartes de la paire ont été retournées, donc vues
+        indices = self.vues[cle]
+        avant = len(indices) // 2
+        for i in cartes:
+            indices.remove(i)
+        self.nombre_paires_connues += len(indices) // 2 - avant
+        if len(indices) < 2:
+            self.paires_connues.pop(cle, None)
+        if not indices:
+            del self.vues[cle]
+
+    # -- Questions du panneau --
+
+    def carte(self):
+        """
+        Carte retournée dont on cherche la paire (première carte du tour), ou None.
+        """
+        selection = self.moteur.selection
+        return selection[0] if len(selection) == 1 else None
+
+    def probabilite(self, j):
+        """
+        Probabilité que la carte j forme une paire avec la carte retournée
+        (None si aucune carte n'est retournée ou si j est face visible).
+        """
+        carte = self.carte()
+        if carte is None or self.moteur.revelee[j]:
+            return None
+        cle = self.moteur.cles[carte]
+        if j in self.inconnues:
+            return self.inconnues_par_cle[cle] / len(self.inconnues)
+        return 1.0 if self.moteur.cles[j] == cle else 0.0
+
+    def coup(self):
+        """
+        Meilleur coup suivant selon la stratégie à mémoire parfaite, ou None.
+        """
+        moteur = self.moteur
+        if moteur.fini or moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            return None
+        carte = self.carte()
+        if carte is not None:
+            for i in self.vues.get(moteur.cles[carte], ()):
+                if i != carte:
+                    return i
+        elif self.paires_connues:
+            return self.vues[next(iter(self.paires_connues))][0]
+        elements = self.inconnues.elements
+        return elements[-1] if elements else None
+
+    def conseil(self):
+        carte = self.carte()
+        inconnues = len(self.inconnues)
+        partenaires, probabilite = 0, None
+        if carte is not None:
+            cle = self.moteur.cles[carte]
+            partenaires = len(self.vues.get(cle, ())) - 1
+            probabilite = self.inconnues_par_cle[cle] / inconnues if inconnues else 0.0
+        return Conseil(carte, partenaires, probabilite, inconnues,
+                       self.nombre_paires_connues, self.coup())
+
+
+def decrire(conseil, nom_carte=str, survol=None):
+    """
+    Texte du panneau de conseils ; `nom_carte(i)` désigne la carte d'indice i.
+    `survol` : (indice, probabilité) de la carte sous le pointeur, ou None ; sa
+    probabilité est affichée si une carte est retournée et qu'elle est cachée.
+    """
+    if conseil.carte is None:
+        ligne = f"{conseil.inconnues} carte(s) jamais vue(s)"
+    else:
+        ligne = (f"Paire de la carte {nom_carte(conseil.carte)} : "
+                 f"{conseil.partenaires} carte(s) vue(s) à 100 %, "
+                 f"{conseil.inconnues} jamais vue(s) à {conseil.probabilite_inconnue:.1%}, "
+                 f"autres à 0 %")
+    coup = "—" if conseil.coup is None else f"carte {nom_carte(conseil.coup)}"
+    texte = f"{ligne}\nPaires connues non prises : {conseil.paires_connues}   Meilleur coup : {coup}"
+    if survol is not None and survol[1] is not None:
+        texte += f"\nCarte {nom_carte(survol[0])} (sous le pointeur) : paire à {survol[1]:.1%}"
+    return texte
+
+
+# ---------------------------------------
+# Débit et vérification, sans affichage
+# ---------------------------------------
+def _recalculer(moteur, vues, carte, j):
+    """
+    Probabilité de la carte j recalculée en parcourant tout le plateau (vérification).
+    """
+    cle = moteur.cles[carte]
+    en_jeu = [i for i in range(len(moteur.cles)) if not moteur.revelee[i] or i in moteur.selection]
+    inconnues = [i for i in en_jeu if i not in vues]
+    if j in vues:
+        return 1.0 if moteur.cles[j] == cle else 0.0
+    return sum(moteur.cles[i] == cle for i in inconnues) / len(inconnues)
+
+
+def jouer(n, graine, analyse=True, verifier=False):
+    """
+    Partie entre deux agents à mémoire parfaite sur n cartes, l'analyse étant
+    consultée avant chaque coup. Renvoie (nombre de coups, durée, erreurs).
+    """
+    rng = random.Random(graine)
+    cles = [k // 2 for k in range(n)]
+    rng.shuffle(cles)
+    moteur = Moteur(cles)
+    agents = {}
+    for joueur in (1, 2):
+        agents[joueur] = AgentMemoire(random.Random(rng.random()))
+        agents[joueur].debut_partie(moteur)
+    analyste = None
+    if analyse:
+        analyste = Analyste()
+        analyste.debut_partie(moteur)
+    vues = set()
+    coups = erreurs = 0
+
+    debut = time.perf_counter()
+    while not moteur.fini:
+        if moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            moteur.masquer()
+            continue
+        if analyste is not None:
+            conseil = analyste.conseil()
+            if verifier:
+                erreurs += _verifier(moteur, analyste, conseil, vues)
+        i = agents[moteur.joueur].choisir()
+        vues.add(i)
+        moteur.flip(i)
+        coups += 1
+    return coups, time.perf_counter() - debut, erreurs
+
+
+def _verifier(moteur, analyste, conseil, vues):
+    erreurs = 0
+    en_jeu = Counter(moteur.cles[i] for i in vues if not moteur.revelee[i] or i in moteur.selection)
+    if conseil.paires_connues != sum(k // 2 for k in en_jeu.values()):
+        erreurs += 1
+    if conseil.carte is not None:
+        for j in range(len(moteur.cles)):
+            if not moteur.revelee[j] and abs(analyste.probabilite(j) - _recalculer(
+                    moteur, vues, conseil.carte, j)) > 1e-12:
+                erreurs += 1
+    return erreurs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de l'analyse incrémentale (panneau de conseils).")
+    parser.add_argument('--cartes', type=int, default=100_000, help="nombre de cartes (pair)")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--verifier', action='store_true',
+                        help="compare chaque réponse à un recalcul sur tout le plateau (lent)")
+    args = parser.parse_args()
+
+    coups, duree, _ = jouer(args.cartes, args.graine, analyse=False)
+    print(f"sans analyse : {coups} coups en {duree:.2f} s ({coups / duree:,.0f} coups/s)")
+    coups, duree, erreurs = jouer(args.cartes, args.graine, verifier=args.verifier)
+    print(f"avec analyse : {coups} coups en {duree:.2f} s ({coups / duree:,.0f} coups/s)")
+    if args.verifier:
+        print(f"vérification : {erreurs} erreur(s)")
+        return 1 if erreurs else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Géométries de toutes les cartes d'un plateau (couleur et sommets de la forme)
+dans un seul fichier en colonnes (voir jeu/colonnes.py), au lieu d'un fichier
+CSV par carte.
+
+Le fichier contient les sommets de toutes les cartes à la suite, la position et
+le nombre de sommets de chaque carte, et un index trié des identifiants : la
+géométrie d'une carte se lit par une recherche dichotomique dans l'index
+projeté en mémoire, sans parcourir le reste du fichier.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from jeu.colonnes import ecrire_colonnes, lire_colonnes, lire_entete
+from jeu.geometrie import SOMMETS_CERCLE, nombre_sommets, sommets_colonnes
+
+SIGNATURE = b"MEMGEOM1"
+_ENTREES = ('ids', 'x', 'y', 'largeur', 'hauteur', 'couleur', 'forme')
+
+
+def _empreinte(cartes):
+    """
+    Empreinte des données dont dépendent les géométries (positions, tailles,
+    couleurs, formes et finesse des cercles).
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([cartes.noms_couleurs, cartes.noms_formes, SOMMETS_CERCLE]).encode())
+    for nom in _ENTREES:
+        colonne = np.ascontiguousarray(getattr(cartes, nom))
+        h.update(colonne.dtype.str.encode())
+        h.update(colonne.tobytes())
+    return h.hexdigest()
+
+
+def colonnes_geometrie(cartes):
+    """
+    Colonnes du fichier : sommets (total, 2) de toutes les cartes à la suite,
+    debut/nombre (position et nombre de sommets de chaque carte), couleur
+    (indice dans noms_couleurs), et l'index ids_tries -> rang (indice de la carte).
+    """
+    n = len(cartes)
+    nombre = np.array([nombre_sommets(f) for f in cartes.noms_formes], dtype=np.int32)[cartes.forme] \
+        if n else np.zeros(0, dtype=np.int32)
+    debut = np.zeros(n, dtype=np.int64)
+    np.cumsum(nombre[:-1], out=debut[1:])
+    sommets = np.empty((int(nombre.sum()), 2), dtype=np.float64)
+
+    # Une passe vectorisée par forme
+    for k, forme in enumerate(cartes.noms_formes):
+        indices = np.flatnonzero(cartes.forme == k)
+        if len(indices) == 0:
+            continue
+        points = sommets_colonnes(forme, cartes.x[indices], cartes.y[indices],
+                                  cartes.largeur[indices], cartes.hauteur[indices])
+        lignes = debut[indices, None] + np.arange(points.shape[1])
+        sommets[lignes.ravel()] = points.reshape(-1, 2)
+
+    rang = np.argsort(cartes.ids, kind='stable')
+    return {'ids_tries': cartes.ids[rang], 'rang': rang.astype(np.int64), 'debut': debut,
+            'nombre': nombre, 'couleur': np.asarray(cartes.couleur), 'sommets': sommets}
+
+
+def ecrire_geometries(chemin, cartes):
+    """
+    Écrit en une fois les géométries de toutes les `cartes` dans `chemin`.
+    Rien n'est recalculé ni écrit si le fichier existant a été produit à partir
+    des mêmes cartes ; renvoie True si le fichier a été (ré)écrit.
+    """
+    empreinte = _empreinte(cartes)
+    if os.path.exists(chemin):
+        try:
+            entete, _ = lire_entete(chemin, SIGNATURE)
+        except (OSError, ValueError):
+            entete = None
+        if entete is not None and entete.get('empreinte') == empreinte:
+            return False
+
+    entete = {'empreinte': empreinte, 'noms_couleurs': cartes.noms_couleurs}
+    ecrire_colonnes(chemin, SIGNATURE, entete, colonnes_geometrie(cartes))
+    return True
+
+
+class FichierGeometrie:
+    """
+    Lecture d'un fichier de géométries : fichier[id] -> (couleur, sommets (k, 2)).
+    """
+
+    def __init__(self, chemin):
+        entete, self.colonnes = lire_colonnes(chemin, SIGNATURE)
+        if entete is None:
+            raise ValueError(f"{chemin} n'est pas un fichier de géométries.")
+        self.noms_couleurs = entete['noms_couleurs']
+
+    def __len__(self):
+        return len(self.colonnes['rang'])
+
+    def indice(self, id_carte):
+        """
+        Indice de la carte `id_carte` dans le plateau (KeyError si elle est absente).
+        """
+        ids = self.colonnes['ids_tries']
+        cle = id_carte.encode()
+        k = int(np.searchsorted(ids, cle))
+        if k == len(ids) or ids[k] != cle:
+            raise KeyError(id_carte)
+        return int(self.colonnes['rang'][k])
+
+    def __contains__(self, id_carte):
+        try:
+            self.indice(id_carte)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, id_carte):
+        i = self.indice(id_carte)
+        debut = int(self.colonnes['debut'][i])
+        fin = debut + int(self.colonnes['nombre'][i])
+        couleur = self.noms_couleurs[self.colonnes['couleur'][i]]
+        return couleur, np.array(self.colonnes['sommets'][debut:fin])
+
+
+def lire_geometrie(chemin, id_carte):
+    """
+    (couleur, sommets) de la carte `id_carte` lus dans le fichier `chemin`.
+    """
+    return FichierGeometrie(chemin)[id_carte]
@@ -0,0 +1,69 @@
+"""
+Géométrie des cartes : sommets des formes dessinées sur chaque carte
+(mêmes formes que patch_rectangle / patch_circle / patch_triangle du mode formes).
+"""
+import math
+
+import numpy as np
+
+FORMES = ("rectangle", "circle", "triangle")
+
+# Nombre de sommets utilisés pour approcher un cercle par un polygone
+SOMMETS_CERCLE = 64
+
+
+def sommets_rectangle(x, y, L, H):
+    return [(x, y), (x + L, y), (x + L, y + H), (x, y + H)]
+
+
+def sommets_cercle(x, y, L, H, n=SOMMETS_CERCLE):
+    cx, cy = x + L / 2, y + H / 2
+    r = min(L, H) / 2
+    return [(cx + r * math.cos(2 * math.pi * k / n), cy + r * math.sin(2 * math.pi * k / n))
+            for k in range(n)]
+
+
+def sommets_triangle(x, y, L, H):
+    return [(x + L / 2, y + H), (x, y), (x + L, y)]
+
+
+def sommets_forme(forme, x, y, L, H):
+    """
+    Renvoie la liste des sommets de la forme dans la boîte (x, y, L, H).
+    Une forme inconnue est dessinée comme un rectangle (comme create_card_patches).
+    """
+    if forme == "circle":
+        return sommets_cercle(x, y, L, H)
+    if forme == "triangle":
+        return sommets_triangle(x, y, L, H)
+    return sommets_rectangle(x, y, L, H)
+
+
+def nombre_sommets(forme):
+    """
+    Nombre de sommets du polygone de la forme (voir sommets_forme).
+    """
+    if forme == "circle":
+        return SOMMETS_CERCLE
+    if forme == "triangle":
+        return 3
+    return 4
+
+
+def sommets_colonnes(forme, x, y, L, H):
+    """
+    Version vectorisée de sommets_forme pour n cartes de même forme :
+    x, y, L, H sont des tableaux (n,), le résultat un tableau (n, k, 2).
+    """
+    x, y, L, H = (np.asarray(v, dtype=np.float64)[:, None] for v in (x, y, L, H))
+    if forme == "circle":
+        angles = 2 * np.pi * np.arange(SOMMETS_CERCLE) / SOMMETS_CERCLE
+        r = np.minimum(L, H) / 2
+        return np.stack([x + L / 2 + r * np.cos(angles), y + H / 2 + r * np.sin(angles)], axis=-1)
+    if forme == "triangle":
+        px = np.hstack([x + L / 2, x, x + L])
+        py = np.hstack([y + H, y, y])
+    else:
+        px = np.hstack([x, x + L, x + L, x])
+        py = np.hstack([y, y, y + H, y + H])
+    return np.stack([px, py], axis=-1)
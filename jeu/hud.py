@@ -0,0 +1,80 @@
+"""
+Couche d'affichage tête haute (HUD : score, joueur courant, temps) dessinée
+par-dessus la figure, indépendamment du plateau.
+
+Les textes du HUD sont marqués 'animated' : un rendu complet de la figure les
+ignore. Après chaque rendu complet, la couche mémorise le fond sous le HUD ;
+ensuite, changer un texte ne redessine que la bande du HUD (fond mémorisé +
+textes), sans toucher aux cartes. Si le texte affiché n'a pas changé, rien
+n'est redessiné : le timer d'une seconde ne coûte presque rien.
+"""
+from matplotlib.transforms import Bbox
+
+
+class CoucheHud:
+    """
+    HUD composé des artistes `textes`, rafraîchi par blit.
+    Si le backend ne sait pas faire de blit, un changement de texte
+    provoque un rendu complet (draw_idle).
+    """
+
+    # Marge (en pixels) autour de la bande du HUD
+    MARGE = 2
+
+    def __init__(self, fig, textes):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.textes = list(textes)
+        self.zone = None
+        self.fond = None
+        self.affiche = None  # textes tels qu'ils sont actuellement à l'écran
+
+        if self.actif:
+            for texte in self.textes:
+                texte.set_animated(True)
+            self.cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    @property
+    def actif(self):
+        return self.canvas.supports_blit
+
+    def _contenu(self):
+        return tuple(texte.get_text() for texte in self.textes)
+
+    def _on_draw(self, event):
+        """
+        Après un rendu complet : mémoriser le fond sous le HUD puis dessiner le HUD.
+        """
+        renderer = event.renderer
+        zones = [t.get_window_extent(renderer) for t in self.textes]
+        if not zones:
+            return
+        # Bande sur toute la largeur de la figure : le texte peut s'allonger
+        haut = Bbox.union(zones)
+        self.zone = Bbox.from_extents(
+            self.fig.bbox.x0, haut.y0 - self.MARGE,
+            self.fig.bbox.x1, haut.y1 + self.MARGE
+        )
+        self.fond = self.canvas.copy_from_bbox(self.zone)
+        for texte in self.textes:
+            texte.draw(renderer)
+        self.affiche = self._contenu()
+
+    def rafraichir(self):
+        """
+        Redessine le HUD si l'un de ses textes a changé depuis le dernier affichage.
+        """
+        contenu = self._contenu()
+        if contenu == self.affiche:
+            return
+        if not self.actif or self.fond is None:
+            # Pas de blit possible (backend, ou figure encore jamais dessinée)
+            self.canvas.draw_idle()
+            self.affiche = contenu
+            return
+
+        self.canvas.restore_region(self.fond)
+        for texte in self.textes:
+            self.fig.draw_artist(texte)
+        self.canvas.blit(self.zone)
+        self.affiche = contenu
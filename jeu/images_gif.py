@@ -0,0 +1,151 @@
+"""
+Lecture paresseuse d'un GIF animé (animation de fin de partie).
+
+Les images sont décodées une à une, au fur et à mesure de l'animation, au lieu
+d'être toutes décodées d'un coup en pleine résolution (imageio.mimread). Chaque
+image est réduite une seule fois à la taille en pixels de l'axes qui l'affiche,
+puis gardée dans un cache LRU de taille bornée : la mémoire utilisée ne dépend
+pas de la longueur du GIF.
+
+Le décodage des premières images peut être lancé à l'avance dans un fil
+d'exécution (prechauffer), par exemple pendant que les dernières paires sont
+jouées : l'écran de victoire s'affiche alors sans attente.
+"""
+import threading
+from collections import OrderedDict
+
+import imageio.v3 as iio
+import numpy as np
+from matplotlib import animation
+from PIL import Image
+
+
+def taille_pixels(fig, rect):
+    """
+    Taille (largeur, hauteur) en pixels d'un axes placé en `rect` = [gauche, bas,
+    largeur, hauteur] (fractions de la figure), connue avant sa création.
+    """
+    return (max(1, round(fig.bbox.width * rect[2])),
+            max(1, round(fig.bbox.height * rect[3])))
+
+
+class ImagesGif:
+    """
+    Images d'un GIF, décodées à la demande : images[i], ou itération dans l'ordre.
+
+    Le GIF est lu séquentiellement (une image dépend des précédentes) : demander
+    une image déjà dépassée et sortie du cache relance la lecture depuis le début.
+    Le nombre d'images n'est connu qu'une fois le GIF lu jusqu'au bout.
+    """
+
+    def __init__(self, chemin, taille=None, capacite=64):
+        self.chemin = chemin
+        self.taille = taille          # (largeur, hauteur) maximale en pixels, ou None
+        self.capacite = capacite      # nombre maximal d'images gardées en mémoire
+        self.cache = OrderedDict()    # indice -> image réduite, de la moins à la plus récente
+        self.nombre = None
+        self._verrou = threading.Lock()
+        self._lecteur = None
+        self._position = 0            # indice de la prochaine image du lecteur
+        self._fil = None
+
+    def _reduire(self, image):
+        """
+        Réduit l'image pour qu'elle tienne dans self.taille (jamais agrandie).
+        """
+        if self.taille is None:
+            return image
+        hauteur, largeur = image.shape[:2]
+        echelle = min(self.taille[0] / largeur, self.taille[1] / hauteur)
+        if echelle >= 1:
+            return image
+        taille = (max(1, round(largeur * echelle)), max(1, round(hauteur * echelle)))
+        return np.asarray(Image.fromarray(image).resize(taille, Image.Resampling.BILINEAR))
+
+    def _garder(self, i, image):
+        self.cache[i] = image
+        self.cache.move_to_end(i)
+        while len(self.cache) > self.capacite:
+            self.cache.popitem(last=False)
+
+    def _decoder(self, i):
+        """
+        Avance le lecteur jusqu'à l'image i (appelée sous le verrou).
+        """
+        if self._lecteur is None or i < self._position:
+            if self._lecteur is not None:
+                self._lecteur.close()
+            self._lecteur = iio.imiter(self.chemin)
+            self._position = 0
+        for image in self._lecteur:
+            k = self._position
+            self._position += 1
+            image = self._reduire(image)
+            self._garder(k, image)
+            if k == i:
+                return image
+        # Fin du GIF
+        self.nombre = self._position
+        self._lecteur = None
+        raise IndexError(i)
+
+    def __getitem__(self, i):
+        with self._verrou:
+            image = self.cache.get(i)
+            if image is not None:
+                self.cache.move_to_end(i)
+                return image
+            if self.nombre is not None and i >= self.nombre:
+                raise IndexError(i)
+            return self._decoder(i)
+
+    def __iter__(self):
+        k = 0
+        while self.nombre is None or k < self.nombre:
+            try:
+                image = self[k]
+            except IndexError:
+                return
+            yield image
+            k += 1
+
+    def prechauffer(self):
+        """
+        Décode en arrière-plan les premières images (autant que le cache en
+        contient). Sans effet si le préchargement est déjà lancé.
+        """
+        if self._fil is None:
+            self._fil = threading.Thread(target=self._precharger, daemon=True)
+            self._fil.start()
+        return self
+
+    def _precharger(self):
+        # Une image à la fois : l'animation n'attend jamais plus d'un décodage
+        for i in range(self.capacite):
+            try:
+                self[i]
+            except (IndexError, OSError, ValueError):
+                return
+
+
+def animer(ax, images, intervalle=80):
+    """
+    Anime les `images` (ImagesGif) dans l'axes `ax`, en boucle.
+    Renvoie l'animation, ou None si le GIF ne contient aucune image.
+    """
+    try:
+        premiere = images[0]
+    except IndexError:
+        return None
+
+    ax.axis('off')
+    im = ax.imshow(premiere, zorder=0)
+
+    def update(image):
+        im.set_data(image)
+        return [im]
+
+    # Les images viennent de l'itérateur (cache LRU) : l'animation n'en garde aucune.
+    # IMPORTANT : blit=False pour que tout (texte, etc.) soit rafraîchi correctement
+    return animation.FuncAnimation(ax.figure, update, frames=lambda: iter(images),
+                                   interval=intervalle, blit=False, cache_frame_data=False)
@@ -0,0 +1,245 @@
+"""
+Index spatial des cartes pour retrouver en temps constant la carte sous un clic.
+
+Les cartes sont repérées par leur rectangle englobant (x, y, largeur, hauteur),
+qui est aussi la zone cliquable des formes non rectangulaires (cercles, triangles) :
+le dos de la carte occupe toujours tout le rectangle.
+"""
+import math
+
+import numpy as np
+
+
+# ---------------------------------------
+# 1) Grille uniforme (cas des plateaux réguliers)
+# ---------------------------------------
+class GrilleSpatiale:
+    """
+    Table de hachage sur une grille uniforme : chaque cellule (i, j) contient
+    la liste des cartes dont le rectangle la recouvre (bords inclus).
+    """
+
+    def __init__(self, rects, largeur_cellule, hauteur_cellule):
+        self.rects = rects
+        self.x0 = min(r[0] for r in rects)
+        self.y0 = min(r[1] for r in rects)
+        self.largeur_cellule = largeur_cellule
+        self.hauteur_cellule = hauteur_cellule
+        self.cellules = {}
+
+        for indice, (x, y, largeur, hauteur) in enumerate(rects):
+            i_min, j_min = self._cellule(x, y)
+            i_max, j_max = self._cellule(x + largeur, y + hauteur)
+            for i in range(i_min, i_max + 1):
+                for j in range(j_min, j_max + 1):
+                    self.cellules.setdefault((i, j), []).append(indice)
+
+    def _cellule(self, x, y):
+        return (math.floor((x - self.x0) / self.largeur_cellule),
+                math.floor((y - self.y0) / self.hauteur_cellule))
+
+    def trouver(self, x, y):
+        """
+        Renvoie l'indice de la première carte contenant le point (x, y), ou None.
+        """
+        for indice in self.cellules.get(self._cellule(x, y), ()):
+            rx, ry, largeur, hauteur = self.rects[indice]
+            if rx <= x <= rx + largeur and ry <= y <= ry + hauteur:
+                return indice
+        return None
+
+
+# ---------------------------------------
+# 2) R-tree statique (cas des plateaux irréguliers)
+# ---------------------------------------
+class ArbreRectangles:
+    """
+    R-tree construit en une fois par la méthode STR (Sort-Tile-Recursive).
+    Utilisé quand les tailles de cartes sont trop hétérogènes pour une grille.
+    Chaque nœud est un tuple (xmin, ymin, xmax, ymax, enfants, est_feuille).
+    """
+
+    CAPACITE = 16
+
+    def __init__(self, rects):
+        self.rects = rects
+        niveau = [(x, y, x + largeur, y + hauteur, indice, True)
+                  for indice, (x, y, largeur, hauteur) in enumerate(rects)]
+        # Les entrées de base sont des "feuilles" dont l'enfant est l'indice de la carte
+        niveau = self._regrouper(niveau)
+        while len(niveau) > 1:
+            niveau = self._regrouper(niveau)
+        self.racine = niveau[0]
+
+    def _regrouper(self, noeuds):
+        capacite = self.CAPACITE
+        nb_groupes = math.ceil(len(noeuds) / capacite)
+        nb_tranches = math.ceil(math.sqrt(nb_groupes))
+        taille_tranche = nb_tranches * capacite
+
+        noeuds = sorted(noeuds, key=lambda n: n[0] + n[2])
+        parents = []
+        for debut in range(0, len(noeuds), taille_tranche):
+            tranche = sorted(noeuds[debut:debut + taille_tranche], key=lambda n: n[1] + n[3])
+            for k in range(0, len(tranche), capacite):
+                enfants = tranche[k:k + capacite]
+                parents.append((
+                    min(n[0] for n in enfants), min(n[1] for n in enfants),
+                    max(n[2] for n in enfants), max(n[3] for n in enfants),
+                    enfants, False
+                ))
+        return parents
+
+    def trouver(self, x, y):
+        """
+        Renvoie l'indice le plus petit parmi les cartes contenant (x, y), ou None
+        (même résultat qu'un parcours linéaire de la liste des cartes).
+        """
+        meilleur = None
+        pile = [self.racine]
+        while pile:
+            xmin, ymin, xmax, ymax, enfants, est_feuille = pile.pop()
+            if not (xmin <= x <= xmax and ymin <= y <= ymax):
+                continue
+            if est_feuille:
+                if meilleur is None or enfants < meilleur:
+                    meilleur = enfants
+            else:
+                pile.extend(enfants)
+        return meilleur
+
+
+# ---------------------------------------
+# 3) Grille en colonnes NumPy (très grands plateaux)
+# ---------------------------------------
+class GrilleColonnes:
+    """
+    Grille uniforme construite sans boucle Python, pour les plateaux de centaines
+    de milliers de cartes : chaque carte est rangée dans la cellule de son coin
+    bas-gauche, les indices des cartes triés par cellule (cellules d'une même
+    colonne de grille contiguës) avec le début de chaque cellule dans `debuts`.
+
+    Les cellules sont au moins aussi grandes que les cartes : une carte ne déborde
+    que sur les cellules voisines de droite et du haut, et une requête n'a qu'une
+    rangée de cellules à ajouter à gauche et en bas. Les rares cartes beaucoup plus
+    grandes que les autres (RAPPORT_TAILLES_MAX) sont testées à part.
+    """
+
+    def __init__(self, x, y, largeur, hauteur):
+        self.x, self.y = np.asarray(x, np.float64), np.asarray(y, np.float64)
+        self.x1 = self.x + largeur
+        self.y1 = self.y + hauteur
+        n = len(self.x)
+
+        largeur, hauteur = np.asarray(largeur, np.float64), np.asarray(hauteur, np.float64)
+        limite_l = RAPPORT_TAILLES_MAX * max(float(np.median(largeur)), 1e-12)
+        limite_h = RAPPORT_TAILLES_MAX * max(float(np.median(hauteur)), 1e-12)
+        grande = (largeur > limite_l) | (hauteur > limite_h)
+        self.grandes = np.flatnonzero(grande)
+        normales = np.flatnonzero(~grande)
+
+        self.x0 = float(self.x.min()) if n else 0.0
+        self.y0 = float(self.y.min()) if n else 0.0
+        self.largeur_cellule = float(largeur[normales].max()) if len(normales) else 1.0
+        self.hauteur_cellule = float(hauteur[normales].max()) if len(normales) else 1.0
+        self.largeur_cellule = self.largeur_cellule or 1.0
+        self.hauteur_cellule = self.hauteur_cellule or 1.0
+        if len(normales):
+            # Plateau clairsemé : cellules agrandies pour garder au plus ~4 cellules par carte
+            etendue = ((self.x[normales].max() - self.x0) / self.largeur_cellule + 1) * \
+                      ((self.y[normales].max() - self.y0) / self.hauteur_cellule + 1)
+            facteur = math.sqrt(etendue / (4 * len(normales)))
+            if facteur > 1:
+                self.largeur_cellule *= facteur
+                self.hauteur_cellule *= facteur
+        colonnes, lignes = self._cellules(self.x[normales], self.y[normales])
+        self.nx = int(colonnes.max()) + 1 if len(normales) else 1
+        self.ny = int(lignes.max()) + 1 if len(normales) else 1
+
+        cellule = colonnes * self.ny + lignes
+        ordre = np.argsort(cellule, kind='stable')
+        self.indices = normales[ordre]
+        self.debuts = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cellule, minlength=self.nx * self.ny), out=self.debuts[1:])
+
+    def _cellules(self, x, y):
+        return (np.floor((x - self.x0) / self.largeur_cellule).astype(np.int64),
+                np.floor((y - self.y0) / self.hauteur_cellule).astype(np.int64))
+
+    def _plage(self, xmin, ymin, xmax, ymax):
+        """
+        Cellules (i0..i1, j0..j1) où sont rangées les cartes qui peuvent toucher la zone.
+        """
+        i0 = math.floor((xmin - self.x0) / self.largeur_cellule) - 1
+        j0 = math.floor((ymin - self.y0) / self.hauteur_cellule) - 1
+        i1 = math.floor((xmax - self.x0) / self.largeur_cellule)
+        j1 = math.floor((ymax - self.y0) / self.hauteur_cellule)
+        i0, j0 = max(i0, 0), max(j0, 0)
+        i1, j1 = min(i1, self.nx - 1), min(j1, self.ny - 1)
+        return i0, i1, j0, j1
+
+    def _candidats(self, xmin, ymin, xmax, ymax):
+        i0, i1, j0, j1 = self._plage(xmin, ymin, xmax, ymax)
+        morceaux = [self.grandes]
+        if i0 <= i1 and j0 <= j1:
+            debuts = self.debuts
+            morceaux += [self.indices[debuts[i * self.ny + j0]:debuts[i * self.ny + j1 + 1]]
+                         for i in range(i0, i1 + 1)]
+        return np.concatenate(morceaux)
+
+    def compter(self, xmin, ymin, xmax, ymax):
+        """
+        Majorant du nombre de cartes dans la zone (cartes des cellules parcourues par
+        dans_zone), calculé sans les énumérer.
+        """
+        i0, i1, j0, j1 = self._plage(xmin, ymin, xmax, ymax)
+        total = len(self.grandes)
+        if i0 <= i1 and j0 <= j1:
+            colonnes = np.arange(i0, i1 + 1) * self.ny
+            total += int((self.debuts[colonnes + j1 + 1] - self.debuts[colonnes + j0]).sum())
+        return total
+
+    def dans_zone(self, xmin, ymin, xmax, ymax):
+        """
+        Indices (non triés) des cartes dont le rectangle intersecte la zone donnée.
+        """
+        c = self._candidats(xmin, ymin, xmax, ymax)
+        garde = ((self.x[c] <= xmax) & (self.x1[c] >= xmin)
+                 & (self.y[c] <= ymax) & (self.y1[c] >= ymin))
+        return c[garde]
+
+    def trouver(self, x, y):
+        """
+        Renvoie l'indice le plus petit parmi les cartes contenant (x, y), ou None.
+        """
+        dedans = self.dans_zone(x, y, x, y)
+        return int(dedans.min()) if len(dedans) else None
+
+
+# ---------------------------------------
+# 4) Choix de l'index selon la disposition
+# ---------------------------------------
+# Au-delà de ce rapport entre la plus grande et la plus petite carte,
+# une cellule de grille contiendrait trop de cartes : on passe au R-tree.
+RAPPORT_TAILLES_MAX = 4
+
+
+def construire_index(rects):
+    """
+    Construit l'index adapté à la liste de rectangles [(x, y, largeur, hauteur), ...] :
+    une grille uniforme si les cartes ont des tailles comparables, un R-tree sinon.
+    Renvoie None si la liste est vide.
+    """
+    if not rects:
+        return None
+
+    largeurs = [r[2] for r in rects]
+    hauteurs = [r[3] for r in rects]
+    largeur_max, hauteur_max = max(largeurs), max(hauteurs)
+    largeur_min, hauteur_min = min(largeurs), min(hauteurs)
+
+    if (largeur_min > 0 and hauteur_min > 0
+            and largeur_max <= RAPPORT_TAILLES_MAX * largeur_min
+            and hauteur_max <= RAPPORT_TAILLES_MAX * hauteur_min):
+        return GrilleSpatiale(rects, largeur_max, hauteur_max)
+    return ArbreRectangles(rects)
@@ -0,0 +1,242 @@
+"""
+Instrumentation optionnelle des scripts : temps passé dans chaque étape d'un
+clic et rafraîchissements du score, résumés en histogrammes (p50/p95/p99)
+écrits en JSON à la fin de la partie ; profil cProfile de la boucle
+d'événements en option.
+
+Activation : variable d'environnement JEU_MESURES (chemin du fichier JSON, ou
+1 pour MESURES_DEFAUT) ou option --mesures [FICHIER] ; profil : JEU_PROFIL ou
+--profil [FICHIER].
+
+Rien n'est instrumenté tant que ce n'est pas demandé : les fonctions des
+scripts ne sont remplacées par des versions chronométrées qu'à l'activation,
+le coût est donc nul sinon. Chaque étape enregistre son temps propre (hors
+étapes imbriquées), sauf 'clic', tout le gestionnaire du clic (moteur et
+artistes, sans peinture), et 'affichage', tout le rafraîchissement différé
+qui le suit (cartes et HUD en un seul passage).
+"""
+import argparse
+import cProfile
+import contextlib
+import functools
+import inspect
+import json
+import math
+import os
+import pstats
+import time
+
+MESURES_DEFAUT = "mesures.json"
+PROFIL_DEFAUT = "profil.prof"
+
+# Étapes chronométrées : fonction du script -> (nom de l'étape, temps inclusif)
+ETAPES_SCRIPT = {
+    'on_click': ('clic', True),
+    'play_card': ('regles', False),
+    'end_mismatch': ('regles', False),
+    'apply_events': ('artistes', False),
+    'flush_refresh': ('affichage', True),
+    'refresh_display': ('rendu_cartes', False),
+    'update_score_and_timer': ('score_et_temps', False),
+    'end_game': ('fin_de_partie', False),
+}
+
+
+# Cases des histogrammes : logarithmiques de 100 ns à 100 s, PAR_DECADE par décade
+# (précision d'environ 6 %)
+MINIMUM = 1e-7
+PAR_DECADE = 20
+CASES = 9 * PAR_DECADE
+
+
+class Histogramme:
+    """
+    Histogramme de durées à taille fixe (CASES cases logarithmiques) :
+    ajouter une mesure ne fait qu'incrémenter une case.
+    """
+
+    __slots__ = ('cases', 'nombre', 'total', 'maximum')
+
+    def __init__(self):
+        self.cases = [0] * CASES
+        self.nombre = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def ajouter(self, duree, log10=math.log10):
+        k = int(log10(duree / MINIMUM) * PAR_DECADE) if duree > MINIMUM else 0
+        self.cases[k if k < CASES else CASES - 1] += 1
+        self.nombre += 1
+        self.total += duree
+        if duree > self.maximum:
+            self.maximum = duree
+
+    def quantile(self, q):
+        """
+        Durée sous laquelle se trouve la proportion q des mesures (centre de la case).
+        """
+        if self.nombre == 0:
+            return 0.0
+        rang = q * self.nombre
+        cumul = 0
+        for k, compte in enumerate(self.cases):
+            cumul += compte
+            if cumul >= rang and compte:
+                return min(MINIMUM * 10 ** ((k + 0.5) / PAR_DECADE), self.maximum)
+        return self.maximum
+
+    def resume(self):
+        if self.nombre == 0:
+            return {'nombre': 0}
+        return {
+            'nombre': self.nombre,
+            'moyenne_ms': 1e3 * self.total / self.nombre,
+            'p50_ms': 1e3 * self.quantile(0.50),
+            'p95_ms': 1e3 * self.quantile(0.95),
+            'p99_ms': 1e3 * self.quantile(0.99),
+            'max_ms': 1e3 * self.maximum,
+            'total_s': self.total,
+        }
+
+
+class Mesures:
+    """
+    Histogrammes des étapes, et chronométrage des fonctions qui les réalisent.
+    """
+
+    def __init__(self, chemin=MESURES_DEFAUT):
+        self.chemin = chemin
+        self.histogrammes = {}
+        self._pile = [0.0]  # temps des étapes imbriquées, par niveau d'appel
+        self.debut = time.time()
+
+    def histogramme(self, nom):
+        if nom not in self.histogrammes:
+            self.histogrammes[nom] = Histogramme()
+        return self.histogrammes[nom]
+
+    def chronometrer(self, nom, fonction, inclusif=False):
+        """
+        Version chronométrée de `fonction` : sa durée est ajoutée à l'étape `nom`,
+        déduction faite des étapes chronométrées appelées par elle (sauf si inclusif).
+        """
+        ajouter = self.histogramme(nom).ajouter
+        pile = self._pile
+        horloge = time.perf_counter
+
+        @functools.wraps(fonction)
+        def mesuree(*args, **kwargs):
+            pile.append(0.0)
+            debut = horloge()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                duree = horloge() - debut
+                imbriquees = pile.pop()
+                pile[-1] += duree
+                ajouter(duree if inclusif else duree - imbriquees)
+
+        return mesuree
+
+    def resume(self):
+        return {nom: h.resume() for nom, h in sorted(self.histogrammes.items())}
+
+    def ecrire(self, chemin=None):
+        chemin = chemin or self.chemin
+        document = {'debut': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.debut)),
+                    'duree_s': time.time() - self.debut,
+                    'etapes': self.resume()}
+        with open(chemin, "w") as f:
+            json.dump(document, f, indent=2)
+        return chemin
+
+
+def options(arguments=None):
+    """
+    Options d'instrumentation lues dans la ligne de commande puis dans l'environnement :
+    (fichier des mesures ou None, fichier du profil ou None).
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--mesures', nargs='?', const=MESURES_DEFAUT, default=None)
+    parser.add_argument('--profil', nargs='?', const=PROFIL_DEFAUT, default=None)
+    args, _ = parser.parse_known_args(arguments)
+
+    def depuis_environnement(variable, defaut):
+        valeur = os.environ.get(variable, "")
+        if valeur in ("", "0"):
+            return None
+        return defaut if valeur == "1" else valeur
+
+    return (args.mesures or depuis_environnement('JEU_MESURES', MESURES_DEFAUT),
+            args.profil or depuis_environnement('JEU_PROFIL', PROFIL_DEFAUT))
+
+
+def instrumenter(espace, game_state, chemin=MESURES_DEFAUT):
+    """
+    Remplace les fonctions du script (son espace de noms `espace`, c.-à-d. globals())
+    et les objets de la partie (index, couche du HUD, canevas) par des versions
+    chronométrées, à appeler après setup_board. Les mesures sont écrites dans
+    `chemin` à la fin de la partie (end_game). Renvoie l'objet Mesures.
+    """
+    mesures = Mesures(chemin)
+    for fonction, (nom, inclusif) in ETAPES_SCRIPT.items():
+        if fonction in espace:
+            # Partie précédente du même processus (main.py) : on repart de l'original
+            originale = inspect.unwrap(espace[fonction])
+            espace[fonction] = mesures.chronometrer(nom, originale, inclusif)
+
+    fin_de_partie = espace.get('end_game')
+    if fin_de_partie is not None:
+        @functools.wraps(fin_de_partie)
+        def end_game(game_state):
+            fin_de_partie(game_state)
+            print(f"Mesures écrites dans {mesures.ecrire()}")
+        espace['end_game'] = end_game
+
+    index = game_state['index']
+    index.trouver = mesures.chronometrer('hit_test', index.trouver)
+    if game_state.get('hud') is not None:
+        hud = game_state['hud']
+        hud.rafraichir = mesures.chronometrer('rendu_hud', hud.rafraichir)
+    canvas = game_state['fig'].canvas
+    canvas.draw = mesures.chronometrer('dessin_complet', canvas.draw)
+    game_state['mesures'] = mesures
+    return mesures
+
+
+def premier_affichage(fig, debut, rapport=None):
+    """
+    Au premier rendu de `fig`, appelle rapport(durée) (par défaut, affiche la durée),
+    la durée étant comptée depuis `debut` (instant time.perf_counter()).
+    """
+    def au_rendu(event):
+        fig.canvas.mpl_disconnect(cid)
+        duree = time.perf_counter() - debut
+        if rapport is None:
+            print(f"Premier affichage en {duree * 1e3:.0f} ms")
+        else:
+            rapport(duree)
+
+    cid = fig.canvas.mpl_connect('draw_event', au_rendu)
+    return cid
+
+
+@contextlib.contextmanager
+def profil(chemin, lignes=20):
+    """
+    Profile (cProfile) le bloc, typiquement la boucle d'événements (plt.show()),
+    écrit les statistiques dans `chemin` et affiche les fonctions les plus coûteuses.
+    Sans effet si `chemin` est None.
+    """
+    if chemin is None:
+        yield None
+        return
+    profileur = cProfile.Profile()
+    profileur.enable()
+    try:
+        yield profileur
+    finally:
+        profileur.disable()
+        profileur.dump_stats(chemin)
+        print(f"Profil écrit dans {chemin}")
+        pstats.Stats(profileur).sort_stats('cumulative').print_stats(lignes)
@@ -0,0 +1,345 @@
+"""
+Journal des parties : chaque partie enregistre son plateau puis chaque carte
+jouée (indice + instant), à la suite des parties précédentes, dans un fichier
+binaire compact. Le journal se rejoue sans affichage, à vitesse maximale, pour
+vérifier les scores et les instants (tests de non-régression), ou dans la
+fenêtre du jeu, en temps réel.
+
+Format : signature (8 octets) puis une suite d'enregistrements, chacun commençant
+par un octet de type :
+- b'P' (début de partie) : longueur (uint32) de l'en-tête JSON (mode, noms,
+  joueurs automatiques, date, tables des couleurs et des formes, types des
+  colonnes), l'en-tête, puis les colonnes du plateau (ids, x, y, largeur,
+  hauteur, couleur, forme) ;
+- b'C' (carte jouée) : indice (uint32), instant en secondes depuis le début de
+  la partie (float32) ;
+- b'F' (fin de partie) : scores des deux joueurs (uint32), durée (float32).
+Une partie sans b'F' (fenêtre fermée avant la fin) est inachevée ; un
+enregistrement tronqué (arrêt brutal du programme) termine la lecture.
+
+Sont enregistrées les cartes effectivement jouées (play_card : clics et joueurs
+automatiques) : un clic ignoré ou mis en file pendant l'affichage d'une
+non-paire n'est écrit qu'au moment où il est joué. Au rejeu, une non-paire est
+donc toujours masquée avant la carte suivante.
+
+Usage : python -m jeu.journal                      (vérifie toutes les parties)
+        python -m jeu.journal parties.journal --liste
+        python -m jeu.journal --afficher 3         (rejoue la partie 3 dans la fenêtre)
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from jeu.cartes import Cartes
+from jeu.configuration import dictionnaire_plateau
+from jeu.moteur import Moteur, ETAT_ATTENTE_MASQUAGE
+
+SIGNATURE = b"MEMJRN01"
+JOURNAL_DEFAUT = "parties.journal"
+
+_DEBUT = struct.Struct("<cI")
+_CARTE = struct.Struct("<cIf")
+_FIN = struct.Struct("<cIIf")
+_COLONNES = ('ids', 'x', 'y', 'largeur', 'hauteur', 'couleur', 'forme')
+
+
+# ---------------------------------------
+# 1) Écriture
+# ---------------------------------------
+class Enregistreur:
+    """
+    Journal d'une partie en cours, ajouté à la fin de `chemin`.
+
+    Les enregistrements passent par le tampon du fichier (`taille_tampon` octets) :
+    noter une carte ne fait qu'ajouter 9 octets en mémoire, l'écriture sur le
+    disque a lieu quand le tampon est plein et à la fin de la partie.
+    """
+
+    def __init__(self, chemin, mode, cartes, noms=("", ""), ia=None, taille_tampon=1 << 16):
+        self.fichier = open(chemin, "ab", buffering=taille_tampon)
+        if self.fichier.seek(0, os.SEEK_END) == 0:
+            self.fichier.write(SIGNATURE)
+
+        entete, colonnes = entete_plateau(mode, cartes, noms, ia)
+        self.fichier.write(_DEBUT.pack(b'P', len(entete)))
+        self.fichier.write(entete)
+        for colonne in colonnes:
+            self.fichier.write(colonne.tobytes())
+        self.fichier.flush()
+
+        self.debut = time.perf_counter()
+        self._ecrire = self.fichier.write
+        self._carte = _CARTE.pack
+        self._horloge = time.perf_counter
+
+    def carte(self, indice):
+        """
+        Note la carte d'indice `indice`, jouée maintenant.
+        """
+        self._ecrire(self._carte(b'C', indice, self._horloge() - self.debut))
+
+    def fin(self, scores):
+        """
+        Note la fin de la partie et ses scores, puis vide le tampon sur le disque.
+        """
+        self._ecrire(_FIN.pack(b'F', scores[0], scores[1], self._horloge() - self.debut))
+        self.fichier.flush()
+
+    def fermer(self):
+        if not self.fichier.closed:
+            self.fichier.close()
+
+
+def entete_plateau(mode, cartes, noms=("", ""), ia=None):
+    """
+    En-tête JSON (octets) d'une partie et colonnes du plateau à écrire à sa suite,
+    dans l'ordre : ids, x, y, largeur, hauteur, couleur, forme (relues par lire_plateau).
+    """
+    colonnes = {nom: np.ascontiguousarray(getattr(cartes, nom)) for nom in _COLONNES}
+    entete = json.dumps({
+        'mode': mode,
+        'noms': list(noms),
+        'ia': {str(joueur): nom for joueur, nom in (ia or {}).items()},
+        'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'cartes': len(cartes),
+        'noms_couleurs': cartes.noms_couleurs,
+        'noms_formes': cartes.noms_formes,
+        'colonnes': {nom: colonne.dtype.str for nom, colonne in colonnes.items()},
+    }).encode()
+    return entete, list(colonnes.values())
+
+
+def options(arguments=None):
+    """
+    Fichier du journal : option --journal FICHIER, variable d'environnement
+    JEU_JOURNAL, ou JOURNAL_DEFAUT. None si désactivé (--sans-journal, JEU_JOURNAL=0).
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--journal', default=None)
+    parser.add_argument('--sans-journal', action='store_true')
+    args, _ = parser.parse_known_args(arguments)
+    if args.sans_journal:
+        return None
+    if args.journal:
+        return args.journal
+    valeur = os.environ.get('JEU_JOURNAL', "")
+    if valeur == "0":
+        return None
+    return valeur or JOURNAL_DEFAUT
+
+
+# ---------------------------------------
+# 2) Lecture
+# ---------------------------------------
+Partie = namedtuple('Partie', ['mode', 'noms', 'ia', 'date', 'cartes',
+                               'indices', 'instants', 'scores', 'duree'])
+Partie.__doc__ = """
+mode     : 'classique' ou 'formes' (règle d'appariement)
+noms, ia : noms des joueurs et {joueur: nom de l'agent}
+cartes   : plateau (Cartes)
+indices, instants : cartes jouées et instants (secondes depuis le début)
+scores, duree     : scores et durée finale, None si la partie est inachevée
+"""
+
+
+def lire_journal(chemin):
+    """
+    Parties du journal `chemin` (générateur), dans l'ordre où elles ont été jouées.
+    """
+    with open(chemin, "rb") as f:
+        donnees = f.read()
+    if not donnees.startswith(SIGNATURE):
+        raise ValueError(f"{chemin} n'est pas un journal de parties.")
+
+    position = len(SIGNATURE)
+    fin = len(donnees)
+    partie = None
+    carte = _CARTE.unpack_from
+    while position < fin:
+        type_ = donnees[position:position + 1]
+        if type_ == b'C' and partie is not None and position + _CARTE.size <= fin:
+            _, indice, instant = carte(donnees, position)
+            partie.indices.append(indice)
+            partie.instants.append(instant)
+            position += _CARTE.size
+        elif type_ == b'P' and position + _DEBUT.size <= fin:
+            if partie is not None:
+                yield partie
+            partie, position = _lire_debut(donnees, position)
+            if partie is None:
+                return
+        elif type_ == b'F' and partie is not None and position + _FIN.size <= fin:
+            _, s1, s2, duree = _FIN.unpack_from(donnees, position)
+            yield partie._replace(scores=(s1, s2), duree=duree)
+            partie = None
+            position += _FIN.size
+        else:
+            break  # enregistrement tronqué ou inattendu : fin de la partie lisible
+    if partie is not None:
+        yield partie
+
+
+def _lire_debut(donnees, position):
+    """
+    (Partie sans cartes jouées, position suivante), ou (None, position) si l'en-tête est tronqué.
+    """
+    _, taille = _DEBUT.unpack_from(donnees, position)
+    position += _DEBUT.size
+    if position + taille > len(donnees):
+        return None, position
+    entete = json.loads(donnees[position:position + taille])
+    position += taille
+
+    cartes, position = lire_plateau(donnees, position, entete)
+    if cartes is None:
+        return None, position
+    ia = {int(joueur): nom for joueur, nom in entete['ia'].items()}
+    return Partie(entete['mode'], tuple(entete['noms']), ia, entete['date'], cartes,
+                  [], [], None, None), position
+
+
+def lire_plateau(donnees, position, entete):
+    """
+    Plateau (Cartes) dont les colonnes commencent à `position` dans `donnees`,
+    décrites par `entete` (entete_plateau), sans recopie ; et la position suivante.
+    (None, position) si les colonnes sont tronquées.
+    """
+    n = entete['cartes']
+    colonnes = {}
+    for nom in _COLONNES:
+        dtype = np.dtype(entete['colonnes'][nom])
+        if position + n * dtype.itemsize > len(donnees):
+            return None, position
+        colonnes[nom] = np.frombuffer(donnees, dtype=dtype, count=n, offset=position)
+        position += n * dtype.itemsize
+    cartes = Cartes.depuis_colonnes(noms_couleurs=entete['noms_couleurs'],
+                                    noms_formes=entete['noms_formes'], **colonnes)
+    return cartes, position
+
+
+# ---------------------------------------
+# 3) Rejeu sans affichage (vérification)
+# ---------------------------------------
+Verification = namedtuple('Verification', ['scores', 'tours', 'erreurs'])
+Verification.__doc__ = """
+scores  : scores obtenus en rejouant la partie avec le moteur
+tours   : nombre de tours joués (deux cartes retournées)
+erreurs : écarts avec le journal (liste vide si la partie est conforme)
+"""
+
+
+def cles_paires(partie):
+    """
+    Clés de paire des cartes selon la règle du mode : la couleur en mode
+    classique (cle_classique), le couple (couleur, forme) en mode formes (cle_formes).
+    """
+    cartes = partie.cartes
+    if partie.mode == 'classique':
+        return cartes.couleur.tolist()
+    return cartes.cles_paires().tolist()
+
+
+def rejouer(partie):
+    """
+    Rejoue `partie` avec le moteur, à vitesse maximale, et la compare au journal.
+    """
+    moteur = Moteur(cles_paires(partie))
+    erreurs = []
+    tours = 0
+    flip, masquer = moteur.flip, moteur.masquer
+    for k, indice in enumerate(partie.indices):
+        if moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            masquer()
+        if indice >= len(moteur.cles):
+            erreurs.append(f"carte {k} : indice {indice} hors du plateau")
+            break
+        evenements = flip(indice)
+        if len(evenements) > 1:
+            tours += 1
+
+    instants = np.asarray(partie.instants, dtype=np.float64)
+    if np.any(np.diff(instants) < 0):
+        erreurs.append("instants non croissants")
+    if partie.scores is not None:
+        if tuple(moteur.scores) != tuple(partie.scores):
+            erreurs.append(f"scores {tuple(moteur.scores)} au lieu de {tuple(partie.scores)}")
+        if not moteur.fini:
+            erreurs.append("partie terminée dans le journal mais pas au rejeu")
+        if len(instants) and instants[-1] > partie.duree + 1e-3:
+            erreurs.append("carte jouée après la fin de la partie")
+    return Verification(tuple(moteur.scores), tours, erreurs)
+
+
+def verifier(chemin):
+    """
+    Rejoue toutes les parties de `chemin` : liste de (numéro, Partie, Verification).
+    """
+    return [(numero, partie, rejouer(partie))
+            for numero, partie in enumerate(lire_journal(chemin), 1)]
+
+
+# ---------------------------------------
+# 4) Rejeu dans la fenêtre du jeu (temps réel)
+# ---------------------------------------
+def formes_de_partie(partie):
+    """
+    Plateau de la partie sous la forme lue par lire_fichier_config dans les scripts.
+    """
+    return dictionnaire_plateau(partie.cartes, avec_forme=partie.mode == 'formes')
+
+
+def afficher(partie):
+    """
+    Rejoue `partie` dans la fenêtre de son mode, aux instants enregistrés.
+    """
+    # Chargement des scripts par main.py (lancement depuis la racine du projet)
+    racine = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if racine not in sys.path:
+        sys.path.insert(0, racine)
+    import main as lanceur
+    return lanceur.charger_mode(partie.mode).main(rejeu=partie)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification et rejeu du journal des parties.")
+    parser.add_argument('fichier', nargs='?', default=JOURNAL_DEFAUT)
+    parser.add_argument('--liste', action='store_true', help="liste les parties du journal")
+    parser.add_argument('--afficher', type=int, default=None, metavar='NUMERO',
+                        help="rejoue la partie NUMERO dans la fenêtre du jeu, en temps réel")
+    args = parser.parse_args()
+
+    if args.afficher is not None:
+        parties = list(lire_journal(args.fichier))
+        if not 1 <= args.afficher <= len(parties):
+            parser.error(f"le journal contient {len(parties)} parties")
+        afficher(parties[args.afficher - 1])
+        return
+
+    debut = time.perf_counter()
+    resultats = verifier(args.fichier)
+    duree = time.perf_counter() - debut
+
+    non_conformes = 0
+    for numero, partie, verification in resultats:
+        if args.liste:
+            etat = (f"{partie.scores[0]}-{partie.scores[1]} en {partie.duree:.1f} s"
+                    if partie.scores is not None else "inachevée")
+            print(f"{numero:>5}  {partie.date}  {partie.mode:<9} {len(partie.cartes):>6} cartes  "
+                  f"{partie.noms[0]} / {partie.noms[1]} : {etat}")
+        if verification.erreurs:
+            non_conformes += 1
+            print(f"Partie {numero} non conforme : {'; '.join(verification.erreurs)}")
+
+    print(f"{len(resultats)} parties rejouées en {duree:.3f} s "
+          f"({len(resultats) / max(duree, 1e-9):,.0f} parties/s), {non_conformes} non conformes")
+    sys.exit(1 if non_conformes else 0)
+
+
+if __name__ == "__main__":
+    main()
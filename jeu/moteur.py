@@ -0,0 +1,169 @@
+"""
+Moteur du jeu du memory, indépendant de tout affichage (n'importe pas Matplotlib).
+
+Le moteur connaît seulement, pour chaque carte, sa « clé de paire » : deux cartes
+forment une paire si elles ont la même clé (la couleur en mode classique,
+le couple (couleur, forme) en mode formes). Chaque action renvoie la liste des
+événements qu'elle a produits ; un affichage s'y abonne pour se mettre à jour.
+"""
+from collections import namedtuple
+
+# ---------------------------------------
+# 1) Règles d'appariement des deux modes de jeu
+# ---------------------------------------
+def cle_classique(data):
+    """
+    Mode classique, data = [(x,y), largeur, hauteur, couleur] : paire = même couleur.
+    """
+    return data[3]
+
+
+def cle_formes(data):
+    """
+    Mode formes, data = [(x,y), L, H, couleur, forme] : paire = même couleur ET même forme.
+    """
+    return (data[3], data[4])
+
+
+# ---------------------------------------
+# 2) Événements et états
+# ---------------------------------------
+Evenement = namedtuple('Evenement', ['type', 'cartes', 'joueur'])
+
+REVELEE = 'revelee'                # une carte est retournée face visible
+PAIRE = 'paire'                    # les deux cartes retournées forment une paire
+NON_PAIRE = 'non_paire'            # pas de paire : les cartes restent visibles jusqu'à masquer()
+MASQUEES = 'masquees'              # les deux cartes sont remises face cachée
+JOUEUR_SUIVANT = 'joueur_suivant'  # la main passe à l'autre joueur
+FIN = 'fin'                        # toutes les paires sont trouvées (joueur = gagnant)
+
+# États du tour : libre -> une carte -> deux cartes -> (attente du masquage) -> libre
+ETAT_LIBRE = 'libre'
+ETAT_UNE_CARTE = 'une_carte'
+ETAT_DEUX_CARTES = 'deux_cartes'
+ETAT_ATTENTE_MASQUAGE = 'attente_masquage'
+
+
+# ---------------------------------------
+# 3) Moteur
+# ---------------------------------------
+class Moteur:
+    """
+    Partie à deux joueurs sur un plateau de cartes désignées par leur indice.
+    """
+
+    __slots__ = ('cles', 'revelee', 'selection', 'scores', 'joueur',
+                 'paires_trouvees', 'total_paires', 'etat', 'abonnes')
+
+    def __init__(self, cles):
+        self.cles = list(cles)
+        self.revelee = bytearray(len(self.cles))
+        self.selection = []
+        self.scores = [0, 0]
+        self.joueur = 1  # joueur 1 ou 2
+        self.paires_trouvees = 0
+        self.total_paires = len(self.cles) // 2
+        self.etat = ETAT_LIBRE
+        self.abonnes = []
+
+    @classmethod
+    def depuis_formes(cls, formes, cle):
+        """
+        Construit le moteur à partir du dictionnaire lu par lire_fichier_config,
+        `cle` étant la règle d'appariement (cle_classique ou cle_formes).
+        """
+        return cls(cle(data) for data in formes.values())
+
+    def restaurer(self, revelee, scores, joueur, selection=()):
+        """
+        Remet la partie dans un état sauvegardé (jeu/sauvegarde.py) : cartes face
+        visible (paires trouvées et carte retournée du tour en cours), scores,
+        joueur courant. Aucun événement n'est publié.
+        """
+        self.revelee = bytearray(revelee)
+        self.selection = list(selection)
+        self.scores = list(scores)
+        self.joueur = joueur
+        self.paires_trouvees = (self.revelee.count(1) - len(self.selection)) // 2
+        self.etat = ETAT_UNE_CARTE if self.selection else ETAT_LIBRE
+
+    def abonner(self, fonction):
+        """
+        `fonction(evenements)` sera appelée après chaque action produisant des événements.
+        """
+        self.abonnes.append(fonction)
+
+    def _publier(self, evenements):
+        for fonction in self.abonnes:
+            fonction(evenements)
+        return evenements
+
+    @property
+    def fini(self):
+        return self.paires_trouvees == self.total_paires
+
+    def jouable(self, i):
+        """
+        Vrai si flip(i) retournerait la carte : elle est face cachée, la partie
+        n'est pas finie et aucune non-paire n'attend d'être masquée.
+        """
+        return not (self.revelee[i] or self.etat == ETAT_ATTENTE_MASQUAGE or self.fini)
+
+    def flip(self, i):
+        """
+        Retourne la carte d'indice i pour le joueur courant et renvoie les événements.
+        Le coup est ignoré (liste vide) s'il n'est pas jouable (voir jouable).
+        """
+        if not self.jouable(i):
+            return []
+
+        self.revelee[i] = 1
+        self.selection.append(i)
+        evenements = [Evenement(REVELEE, (i,), self.joueur)]
+        if len(self.selection) < 2:
+            self.etat = ETAT_UNE_CARTE
+            return self._publier(evenements)
+
+        self.etat = ETAT_DEUX_CARTES
+        c1, c2 = self.selection
+        if self.cles[c1] == self.cles[c2]:
+            # Paire trouvée : le joueur marque et rejoue
+            self.paires_trouvees += 1
+            self.scores[self.joueur - 1] += 1
+            self.selection = []
+            self.etat = ETAT_LIBRE
+            evenements.append(Evenement(PAIRE, (c1, c2), self.joueur))
+            if self.fini:
+                evenements.append(Evenement(FIN, (), self.gagnant()))
+        else:
+            self.etat = ETAT_ATTENTE_MASQUAGE
+            evenements.append(Evenement(NON_PAIRE, (c1, c2), self.joueur))
+        return self._publier(evenements)
+
+    def masquer(self):
+        """
+        Termine une non-paire : cache les deux cartes et passe au joueur suivant.
+        """
+        if self.etat != ETAT_ATTENTE_MASQUAGE:
+            return []
+
+        c1, c2 = self.selection
+        self.revelee[c1] = 0
+        self.revelee[c2] = 0
+        self.selection = []
+        self.etat = ETAT_LIBRE
+        self.next_player()
+        return self._publier([Evenement(MASQUEES, (c1, c2), self.joueur),
+                              Evenement(JOUEUR_SUIVANT, (), self.joueur)])
+
+    def next_player(self):
+        """
+        Passe au joueur suivant (1 -> 2 ou 2 -> 1).
+        """
+        self.joueur = 3 - self.joueur
+
+    def gagnant(self):
+        """
+        Joueur en tête (le joueur 1 l'emporte en cas d'égalité).
+        """
+        return 1 if self.scores[0] >= self.scores[1] else 2
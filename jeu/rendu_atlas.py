@@ -0,0 +1,225 @@
+"""
+Rendu du plateau en une seule image : le dos des cartes et chaque face
+(forme, couleur) sont rastérisés une fois dans un atlas de sprites (tableaux RGBA
+mis en cache), et le plateau est un tampon RGBA NumPy affiché par un unique imshow.
+
+Retourner une carte recopie le sprite de sa face (ou du dos) dans le tampon, par
+une affectation de tranche, puis seule la zone modifiée est redessinée : une petite
+image (« retouche ») prélevée dans le tampon, hors des artistes de l'axes, que le
+rendu par blit dessine puis recopie à l'écran. Le coût d'un clic ne dépend donc
+plus du nombre de cartes, seulement de la taille d'une carte en pixels.
+
+Les cartes sont alignées sur les pixels du tampon (les cartes d'une même taille
+partagent les mêmes sprites) et ne doivent pas se chevaucher, comme sur les
+plateaux générés par jeu/configuration.py.
+
+Activé par l'option --atlas ou la variable d'environnement JEU_ATLAS=1.
+"""
+import argparse
+import os
+
+import numpy as np
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.image import AxesImage
+
+from jeu.geometrie import sommets_forme
+from jeu.index_spatial import GrilleColonnes
+
+# Tampon du plateau : au plus PIXELS_PLATEAU_MAX pixels, et au plus
+# PIXELS_PAR_CARTE pixels sur le petit côté d'une carte
+PIXELS_PLATEAU_MAX = 1024 * 1024
+PIXELS_PAR_CARTE = 128
+
+# Points d'échantillonnage par pixel (sur chaque axe) pour lisser les bords des sprites
+SURECHANTILLONNAGE = 4
+
+# Rééchantillonnage à l'écran : au plus proche voisin, une retouche redessinée
+# par blit donne alors exactement les pixels d'un rendu complet
+INTERPOLATION = 'nearest'
+
+
+def atlas_demande(arguments=None):
+    """
+    Rendu par atlas demandé : option --atlas, ou variable d'environnement JEU_ATLAS=1.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--atlas', action='store_true')
+    args, _ = parser.parse_known_args(arguments)
+    return args.atlas or os.environ.get('JEU_ATLAS', "") not in ("", "0")
+
+
+# ---------------------------------------
+# 1) Atlas de sprites
+# ---------------------------------------
+class AtlasSprites:
+    """
+    Sprites RGBA (uint8, première ligne en bas) des cartes, rastérisés une seule
+    fois par taille en pixels : le dos, et la face de chaque (forme, couleur)
+    (dos de la face, puis forme colorée, comme create_card_patches). Contours
+    d'épaisseur `bord` pixels, à l'intérieur de la carte.
+    """
+
+    def __init__(self, noms_formes, rgba, couleur_dos='black', couleur_bord='white',
+                 couleur_fond='white', bord=1.0):
+        self.noms_formes = noms_formes
+        self.rgba = np.asarray(rgba, dtype=np.float64)  # couleur internée -> RGBA
+        self.couleur_dos = np.array(to_rgba(couleur_dos))
+        self.couleur_bord = np.array(to_rgba(couleur_bord))
+        self.fond = _octets(to_rgba(couleur_fond))
+        self.bord = bord
+        self.masques = {}  # (nom de forme, hauteur, largeur) -> (couverture, couverture de l'intérieur)
+        self.sprites = {}  # (forme, couleur, hauteur, largeur) -> sprite ; forme None pour le dos
+
+    def _masques(self, forme, hauteur, largeur):
+        cle = (forme, hauteur, largeur)
+        if cle not in self.masques:
+            self.masques[cle] = (_couverture(forme, hauteur, largeur, 0.0),
+                                 _couverture(forme, hauteur, largeur, self.bord))
+        return self.masques[cle]
+
+    def _peindre(self, dessous, forme, hauteur, largeur, couleur):
+        # Forme colorée et son contour posés sur `dessous`, au prorata de la couverture
+        exterieur, interieur = self._masques(forme, hauteur, largeur)
+        exterieur, interieur = exterieur[..., None], interieur[..., None]
+        return (dessous * (1 - exterieur) + self.couleur_bord * (exterieur - interieur)
+                + couleur * interieur)
+
+    def _dos(self, hauteur, largeur):
+        return self._peindre(self.fond / 255, "rectangle", hauteur, largeur, self.couleur_dos)
+
+    def dos(self, hauteur, largeur):
+        cle = (None, None, hauteur, largeur)
+        if cle not in self.sprites:
+            self.sprites[cle] = _octets(self._dos(hauteur, largeur))
+        return self.sprites[cle]
+
+    def face(self, forme, couleur, hauteur, largeur):
+        cle = (forme, couleur, hauteur, largeur)
+        if cle not in self.sprites:
+            self.sprites[cle] = _octets(self._peindre(
+                self._dos(hauteur, largeur), self.noms_formes[forme], hauteur, largeur,
+                self.rgba[couleur]))
+        return self.sprites[cle]
+
+
+def _couverture(forme, hauteur, largeur, marge):
+    """
+    Fraction de chaque pixel (hauteur × largeur) couverte par la forme (jeu/geometrie.py)
+    rétrécie de `marge` pixels : proportion de ses SURECHANTILLONNAGE² points
+    d'échantillonnage à au moins `marge` du bord.
+    """
+    s = SURECHANTILLONNAGE
+    u = ((np.arange(largeur * s) + 0.5) / s)[None, :]
+    v = ((np.arange(hauteur * s) + 0.5) / s)[:, None]
+    if forme == "circle":
+        dedans = np.hypot(u - largeur / 2, v - hauteur / 2) <= min(largeur, hauteur) / 2 - marge
+    else:
+        # Polygone convexe, sommets dans le sens trigonométrique : intérieur à gauche des arêtes
+        sommets = sommets_forme(forme, 0, 0, largeur, hauteur)
+        dedans = np.ones((hauteur * s, largeur * s), dtype=bool)
+        for (xa, ya), (xb, yb) in zip(sommets, sommets[1:] + sommets[:1]):
+            ex, ey = xb - xa, yb - ya
+            dedans &= ex * (v - ya) - ey * (u - xa) >= marge * np.hypot(ex, ey)
+    return dedans.reshape(hauteur, s, largeur, s).mean(axis=(1, 3))
+
+
+def _octets(rgba):
+    return (np.asarray(rgba) * 255).round().astype(np.uint8)
+
+
+# ---------------------------------------
+# 2) Plateau en une image
+# ---------------------------------------
+class PlateauAtlas:
+    """
+    Plateau de cartes (Cartes, jeu/cartes.py) affiché en une seule image.
+    Même interface que PlateauCollection : reveler(i), cacher(i), artistes().
+    """
+
+    def __init__(self, ax, cartes, couleur_dos='black', couleur_bord='white',
+                 couleur_fond='white', linewidth=1):
+        self.ax = ax
+        self.cartes = cartes
+        self.index = GrilleColonnes(cartes.x, cartes.y, cartes.largeur, cartes.hauteur)
+
+        # Échelle du tampon (pixels par unité) et rectangle de pixels de chaque carte
+        self.x0, self.y0 = float(cartes.x.min()), float(cartes.y.min())
+        etendue_x = float((cartes.x + cartes.largeur).max()) - self.x0
+        etendue_y = float((cartes.y + cartes.hauteur).max()) - self.y0
+        self.echelle = min(np.sqrt(PIXELS_PLATEAU_MAX / (etendue_x * etendue_y)),
+                           PIXELS_PAR_CARTE / float(np.median(np.minimum(cartes.largeur,
+                                                                         cartes.hauteur))))
+        self.c0 = np.round((cartes.x - self.x0) * self.echelle).astype(np.intp)
+        self.r0 = np.round((cartes.y - self.y0) * self.echelle).astype(np.intp)
+        self.largeurs = np.maximum(np.round(cartes.largeur * self.echelle), 1).astype(np.intp)
+        self.hauteurs = np.maximum(np.round(cartes.hauteur * self.echelle), 1).astype(np.intp)
+        self.taille = (int((self.r0 + self.hauteurs).max()), int((self.c0 + self.largeurs).max()))
+
+        # Contours : même épaisseur à l'écran que les patches, à la taille actuelle de l'axes
+        ecran = min(ax.bbox.width / etendue_x, ax.bbox.height / etendue_y)
+        bord = linewidth * ax.figure.dpi / 72 * self.echelle / ecran
+        self.atlas = AtlasSprites(cartes.noms_formes, to_rgba_array(cartes.noms_couleurs),
+                                  couleur_dos, couleur_bord, couleur_fond, bord)
+
+        # Tampon : fond, puis dos de toutes les cartes (une affectation par taille de carte)
+        pixels = np.empty(self.taille + (4,), dtype=np.uint8)
+        pixels[:] = self.atlas.fond
+        tailles, groupe = np.unique(np.stack([self.hauteurs, self.largeurs], axis=1),
+                                    axis=0, return_inverse=True)
+        for k, (hauteur, largeur) in enumerate(tailles.tolist()):
+            indices = np.flatnonzero(groupe.ravel() == k)
+            lignes = self.r0[indices, None, None] + np.arange(hauteur)[None, :, None]
+            colonnes = self.c0[indices, None, None] + np.arange(largeur)[None, None, :]
+            pixels[lignes, colonnes] = self.atlas.dos(hauteur, largeur)
+
+        self.image = ax.imshow(pixels, origin='lower', interpolation=INTERPOLATION,
+                               extent=self._etendue(0, self.taille[0], 0, self.taille[1]))
+        # imshow garde sa propre copie du tableau : c'est elle qui est modifiée ensuite
+        self.pixels = self.image.get_array()
+        # Mêmes marges autour du plateau qu'avec les patches (imshow y colle les limites)
+        self.image.sticky_edges.x[:] = []
+        self.image.sticky_edges.y[:] = []
+
+        self.modifiee = None  # zone (r0, r1, c0, c1) modifiée depuis le dernier appel à artistes()
+        self.retouche = None  # image de la dernière zone modifiée
+        for i in np.flatnonzero(cartes.revelee):
+            self.reveler(i)
+
+    def _etendue(self, r0, r1, c0, c1):
+        e = self.echelle
+        return (self.x0 + c0 / e, self.x0 + c1 / e, self.y0 + r0 / e, self.y0 + r1 / e)
+
+    def _copier(self, i, sprite):
+        r0, c0 = int(self.r0[i]), int(self.c0[i])
+        r1, c1 = r0 + sprite.shape[0], c0 + sprite.shape[1]
+        self.pixels[r0:r1, c0:c1] = sprite
+        if self.modifiee is not None:
+            a0, a1, b0, b1 = self.modifiee
+            r0, r1, c0, c1 = min(r0, a0), max(r1, a1), min(c0, b0), max(c1, b1)
+        self.modifiee = (r0, r1, c0, c1)
+        self.image.stale = True
+
+    def reveler(self, i):
+        c = self.cartes
+        self._copier(i, self.atlas.face(int(c.forme[i]), int(c.couleur[i]),
+                                        int(self.hauteurs[i]), int(self.largeurs[i])))
+
+    def cacher(self, i):
+        self._copier(i, self.atlas.dos(int(self.hauteurs[i]), int(self.largeurs[i])))
+
+    def artistes(self):
+        """
+        Artiste à redessiner après reveler / cacher : image de la zone modifiée depuis
+        le dernier appel (rectangle englobant des cartes retournées ensemble).
+        """
+        if self.modifiee is not None:
+            r0, r1, c0, c1 = self.modifiee
+            retouche = AxesImage(self.ax, origin='lower', interpolation=INTERPOLATION,
+                                 extent=self._etendue(r0, r1, c0, c1))
+            retouche.set_data(self.pixels[r0:r1, c0:c1])
+            retouche.set_figure(self.ax.figure)
+            retouche.set_transform(self.ax.transData)
+            retouche.set_clip_path(self.ax.patch)
+            self.retouche = retouche
+            self.modifiee = None
+        return [self.retouche if self.retouche is not None else self.image]
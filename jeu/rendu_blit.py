@@ -0,0 +1,84 @@
+"""
+Rendu par « blit » : au lieu de redessiner toute la figure après chaque clic,
+on ne redessine que les artistes des cartes modifiées, puis on ne recopie à
+l'écran que les zones concernées. Le texte du score a sa propre couche
+(jeu/hud.py).
+
+Chaque zone est d'abord remise dans son état du dernier rendu complet (copie
+du canevas prise à ce moment-là) : un artiste redessiné plusieurs fois ne se
+superpose jamais à lui-même, les bords anticrénelés ne s'épaississent pas.
+"""
+import math
+
+from matplotlib.transforms import Bbox
+
+
+class RenduBlit:
+    """
+    Gère le rendu partiel d'une figure.
+
+    Un blit n'est possible qu'après un premier rendu complet de la figure
+    (premier affichage). Si le backend ne sait pas faire de blit, on retombe
+    sur un rendu complet à chaque rafraîchissement.
+    """
+
+    # Marge (en pixels) autour des zones recopiées, pour inclure l'épaisseur des contours
+    MARGE = 2
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.dessinee = False
+        self.fond = None  # copie du canevas au dernier rendu complet
+
+        if self.actif:
+            self.cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    @property
+    def actif(self):
+        return self.canvas.supports_blit
+
+    def _on_draw(self, event):
+        self.fond = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.dessinee = True
+
+    @classmethod
+    def zone(cls, etendue):
+        """
+        Zone recopiée pour un artiste d'étendue donnée (coordonnées d'affichage) :
+        l'étendue avec sa marge, arrondie aux pixels entiers qui la contiennent.
+        """
+        x0, y0, x1, y1 = etendue.padded(cls.MARGE).extents
+        return Bbox.from_extents(math.floor(x0), math.floor(y0), math.ceil(x1), math.ceil(y1))
+
+    def _restaurer(self, zone):
+        """
+        Remet une zone (en pixels entiers) dans son état du dernier rendu complet.
+        """
+        # restore_region attend des lignes d'image, comptées depuis le haut,
+        # et inclut la dernière ligne et la dernière colonne
+        largeur, hauteur = self.fig.bbox.width, self.fig.bbox.height
+        x0, y0 = max(zone.x0, 0), max(hauteur - zone.y1, 0)
+        x1, y1 = min(zone.x1, largeur), min(hauteur - zone.y0, hauteur)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.canvas.restore_region(self.fond, bbox=(x0, y0, x1 - 1, y1 - 1), xy=(0, 0))
+
+    def rafraichir(self, artistes=()):
+        """
+        Remet les zones des artistes modifiés dans leur état du dernier rendu
+        complet, y redessine les artistes puis recopie ces zones à l'écran.
+        """
+        if not self.actif or not self.dessinee:
+            # Pas de blit possible (backend, ou figure encore jamais dessinée)
+            self.canvas.draw_idle()
+            return
+
+        zones = [self.zone(artiste.get_window_extent()) for artiste in artistes]
+        # Toutes les zones d'abord : deux zones voisines peuvent se chevaucher
+        for zone in zones:
+            self._restaurer(zone)
+        for artiste in artistes:
+            artiste.axes.draw_artist(artiste)
+        for zone in zones:
+            self.canvas.blit(zone)
@@ -0,0 +1,152 @@
+"""
+Rendu du plateau avec des collections Matplotlib : tous les dos de cartes dans
+une seule PolyCollection, et une PolyCollection de faces par type de forme.
+Retourner une carte ne crée ni ne modifie aucun artiste individuel : on met à
+jour une ligne du tableau des couleurs de la collection concernée. Pour le
+blit, seules les cartes retournées sont redessinées, dans une petite
+collection de retouche par carte (comme la retouche de jeu/rendu_atlas.py) :
+le coût d'un clic ne dépend pas du nombre de cartes.
+"""
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.transforms import Bbox
+
+from jeu.geometrie import sommets_forme, sommets_rectangle
+from jeu.index_spatial import GrilleColonnes
+from jeu.rendu_blit import RenduBlit
+
+
+class Retouche(PolyCollection):
+    """
+    Collection de retouche d'une carte : la carte et ses voisines proches,
+    découpées à la zone recopiée autour de la carte. Son étendue à l'écran est
+    le rectangle de la carte (celle d'une collection sans décalages est vide
+    pour Matplotlib).
+    """
+
+    def __init__(self, etendue, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.etendue = etendue
+
+    def get_window_extent(self, renderer=None):
+        return self.etendue
+
+
+class PlateauCollection:
+    """
+    Plateau de n cartes décrit par leurs rectangles [(x, y, L, H), ...],
+    leurs couleurs de face et (optionnellement) leurs formes.
+    Les cartes sont désignées par leur indice dans ces listes ; `revelees`
+    (tableau de booléens, optionnel) : cartes déjà face visible.
+    """
+
+    def __init__(self, ax, rects, couleurs, formes=None, revelees=None,
+                 couleur_dos='black', couleur_bord='white', linewidth=1):
+        n = len(rects)
+        if formes is None:
+            formes = ["rectangle"] * n
+        self.ax = ax
+        self.bord = np.array(to_rgba(couleur_bord))
+        self.linewidth = linewidth
+        self.modifiees = {}  # cartes retournées depuis le dernier appel à artistes()
+        self.retouches = []
+        x, y, largeur, hauteur = np.asarray(rects, dtype=np.float64).reshape(-1, 4).T
+        self.index = GrilleColonnes(x, y, largeur, hauteur)
+
+        # 1) Dos des cartes : toujours dessinés, la face se superpose quand elle est visible
+        self.dos = PolyCollection(
+            [sommets_rectangle(*r) for r in rects],
+            facecolors=couleur_dos, edgecolors=couleur_bord, linewidths=linewidth
+        )
+        ax.add_collection(self.dos)
+
+        # 2) Faces : une collection par forme, faces transparentes tant qu'elles sont cachées
+        rgba = to_rgba_array(couleurs)
+        self.collection_de = np.empty(n, dtype=np.intp)  # carte -> collection de faces
+        self.rang_de = np.empty(n, dtype=np.intp)        # carte -> ligne dans la collection
+        self.faces = []
+        self.couleurs_faces = []
+        self.couleurs_bords = []
+
+        for forme in dict.fromkeys(formes):
+            indices = [i for i, f in enumerate(formes) if f == forme]
+            self.collection_de[indices] = len(self.faces)
+            self.rang_de[indices] = np.arange(len(indices))
+
+            fc = rgba[indices].copy()
+            fc[:, 3] = 0 if revelees is None else revelees[indices]
+            ec = np.tile(self.bord, (len(indices), 1))
+            ec[:, 3] = fc[:, 3]
+            collection = PolyCollection(
+                [sommets_forme(forme, *rects[i]) for i in indices],
+                facecolors=fc, edgecolors=ec, linewidths=linewidth
+            )
+            ax.add_collection(collection)
+            self.faces.append(collection)
+            # Tableaux RGBA détenus par la collection, convertis une fois ici
+            # (update_scalarmappable : sinon reconvertis au premier tracé) ;
+            # retourner une carte modifie une ligne en place, sans reconversion
+            collection.update_scalarmappable()
+            self.couleurs_faces.append(collection.get_facecolor())
+            self.couleurs_bords.append(collection.get_edgecolor())
+
+    def _afficher_face(self, i, visible):
+        k, rang = self.collection_de[i], self.rang_de[i]
+        alpha = 1.0 if visible else 0.0
+        self.couleurs_faces[k][rang, 3] = alpha
+        self.couleurs_bords[k][rang, 3] = alpha
+        self.faces[k].stale = True
+        self.modifiees[i] = None
+
+    def reveler(self, i):
+        self._afficher_face(i, True)
+
+    def cacher(self, i):
+        self._afficher_face(i, False)
+
+    def _retouche(self, i):
+        """
+        Petite collection de la carte i dans son état actuel, avec les cartes
+        qui débordent dans la zone recopiée autour d'elle (restaurée depuis le
+        dernier rendu complet, où ces voisines pouvaient être dans un autre
+        état) : dos, puis faces visibles, découpés à cette zone.
+        """
+        vers_ecran = self.ax.transData
+        x0, y0 = self.index.x[i], self.index.y[i]
+        x1, y1 = self.index.x1[i], self.index.y1[i]
+        etendue = Bbox(vers_ecran.transform([(x0, y0), (x1, y1)]))
+        zone = RenduBlit.zone(etendue)
+        (xmin, ymin), (xmax, ymax) = vers_ecran.inverted().transform(zone.get_points())
+        cartes = np.sort(self.index.dans_zone(xmin, ymin, xmax, ymax))
+
+        chemins_dos = self.dos.get_paths()
+        sommets = [chemins_dos[j].vertices for j in cartes]
+        faces = [self.dos.get_facecolor()[0]] * len(cartes)
+        bords = [self.bord] * len(cartes)
+        for j in cartes:
+            k, rang = self.collection_de[j], self.rang_de[j]
+            if self.couleurs_faces[k][rang, 3]:
+                sommets.append(self.faces[k].get_paths()[rang].vertices)
+                faces.append(self.couleurs_faces[k][rang])
+                bords.append(self.couleurs_bords[k][rang])
+
+        # Tableaux RGBA : pas de conversion couleur par couleur
+        retouche = Retouche(etendue, sommets, facecolors=np.array(faces),
+                            edgecolors=np.array(bords), linewidths=self.linewidth)
+        retouche.axes = self.ax
+        retouche.set_figure(self.ax.figure)
+        retouche.set_transform(vers_ecran)
+        retouche.set_clip_path(self.ax.patch)
+        retouche.set_clip_box(zone)
+        return retouche
+
+    def artistes(self):
+        """
+        Artistes à redessiner après reveler / cacher : une retouche par carte
+        retournée depuis le dernier appel.
+        """
+        if self.modifiees:
+            self.retouches = [self._retouche(i) for i in self.modifiees]
+            self.modifiees = {}
+        return self.retouches
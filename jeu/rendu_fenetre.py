@@ -0,0 +1,267 @@
+"""
+Rendu des très grands plateaux : seules les cartes visibles dans la vue
+courante (zoom, déplacement) sont dessinées.
+
+Le plateau est un unique artiste Matplotlib dont le dessin dépend des limites
+de la vue au moment du rendu :
+- vue rapprochée (au plus CARTES_VISIBLES_MAX cartes) : les cartes visibles,
+  retrouvées par l'index spatial (GrilleColonnes), sont dessinées en polygones
+  (une collection pour les dos, une par forme pour les faces visibles) ;
+- vue éloignée : le plateau est rendu en une seule image, à la résolution de
+  l'écran (niveau de détail réduit : sans contours ni formes, une carte ne couvre
+  que quelques pixels). L'image est prélevée dans une image de tout le plateau,
+  tenue à jour carte par carte, si sa résolution suffit ; sinon elle est calculée
+  à partir des seules cartes visibles.
+Rien n'est recalculé si ni la vue, ni la taille de l'axes, ni une carte visible
+n'ont changé depuis le dernier rendu.
+
+Zoom à la molette (activer_zoom), déplacement avec l'outil « pan » de la barre
+d'outils (touche p).
+"""
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+
+from jeu.geometrie import sommets_colonnes
+from jeu.index_spatial import GrilleColonnes
+
+# Au-delà de ce nombre de cartes dans la vue, le plateau est rendu en image
+CARTES_VISIBLES_MAX = 1500
+
+# Image de tout le plateau : au plus PIXELS_PLATEAU_MAX pixels, et au plus
+# PIXELS_PAR_CARTE pixels sur le petit côté d'une carte
+PIXELS_PLATEAU_MAX = 2048 * 2048
+PIXELS_PAR_CARTE = 4
+
+# Facteur de zoom d'un cran de molette
+FACTEUR_ZOOM = 1.25
+
+
+class PlateauFenetre(Artist):
+    """
+    Plateau de cartes (Cartes, jeu/cartes.py) dessiné d'après la vue de l'axes.
+    Même interface que PlateauCollection : reveler(i), cacher(i), artistes().
+    L'état face visible / cachée est lu dans la colonne cartes.revelee.
+    """
+
+    def __init__(self, ax, cartes, couleur_dos='black', couleur_bord='white',
+                 couleur_fond='white', linewidth=1):
+        super().__init__()
+        self.cartes = cartes
+        self.index = GrilleColonnes(cartes.x, cartes.y, cartes.largeur, cartes.hauteur)
+        self.rgba = to_rgba_array(cartes.noms_couleurs)  # couleur internée -> RGBA
+        # Palette des images : fond, dos, puis une entrée par couleur
+        self.palette = np.vstack([_octets([to_rgba(couleur_fond), to_rgba(couleur_dos)]),
+                                  _octets(self.rgba)])
+        self.bornes = (float(cartes.x.min()), float(cartes.y.min()),
+                       float((cartes.x + cartes.largeur).max()),
+                       float((cartes.y + cartes.hauteur).max()))
+
+        # Image de tout le plateau (indices de la palette), tenue à jour carte par carte
+        xmin, ymin, xmax, ymax = self.bornes
+        self.echelle = min(np.sqrt(PIXELS_PLATEAU_MAX / ((xmax - xmin) * (ymax - ymin))),
+                           PIXELS_PAR_CARTE / float(np.median(np.minimum(cartes.largeur,
+                                                                         cartes.hauteur))))
+        self.taille_plateau = (max(int(np.ceil((xmax - xmin) * self.echelle)), 1),
+                               max(int(np.ceil((ymax - ymin) * self.echelle)), 1))
+        self.plateau = self._rasteriser(np.arange(len(cartes)), xmin, ymin,
+                                        self.echelle, self.echelle, *self.taille_plateau)
+
+        self.dos = PolyCollection([], facecolors=couleur_dos, edgecolors=couleur_bord,
+                                  linewidths=linewidth)
+        self.faces = {forme: PolyCollection([], edgecolors=couleur_bord, linewidths=linewidth)
+                      for forme in range(len(cartes.noms_formes))}
+        self.enfants = [self.dos, *self.faces.values()]
+
+        ax.add_artist(self)
+        for enfant in self.enfants:
+            enfant.set_figure(ax.figure)
+            enfant.axes = ax
+            enfant.set_transform(ax.transData)
+            enfant.set_clip_path(ax.patch)
+        ax.update_datalim([self.bornes[:2], self.bornes[2:]])
+
+        self.vue = None      # (limites, taille en pixels) du dernier calcul
+        self.detail = False  # vue rapprochée : polygones ; sinon self.pixels
+        self.pixels = None   # image RGBA de la vue (première ligne en haut)
+
+    # -- État des cartes --
+
+    def _changer(self, i, valeur):
+        c = self.cartes
+        # Image du plateau : le rectangle de pixels de la carte
+        (r0,), (r1,), (c0,), (c1,) = self._rectangles_pixels(
+            [i], *self.bornes[:2], self.echelle, self.echelle, *self.taille_plateau)
+        self.plateau[r0:r1, c0:c1] = valeur
+        # Vue recalculée au prochain rendu, seulement si la carte y est
+        if self.vue is not None:
+            (xa, xb, ya, yb), _ = self.vue
+            if c.x[i] <= max(xa, xb) and c.x[i] + c.largeur[i] >= min(xa, xb) and \
+                    c.y[i] <= max(ya, yb) and c.y[i] + c.hauteur[i] >= min(ya, yb):
+                self.vue = None
+        self.stale = True
+
+    def reveler(self, i):
+        self._changer(i, 2 + self.cartes.couleur[i])
+
+    def cacher(self, i):
+        self._changer(i, 1)
+
+    def artistes(self):
+        return [self]
+
+    # -- Rendu --
+
+    def get_children(self):
+        return self.enfants
+
+    def get_window_extent(self, renderer=None):
+        return self.axes.bbox
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        ax = self.axes
+        boite = ax.bbox
+        vue = (tuple(ax.get_xlim()) + tuple(ax.get_ylim()),
+               (max(int(round(boite.width)), 1), max(int(round(boite.height)), 1)))
+        if vue != self.vue:
+            self._mettre_a_jour(*vue)
+            self.vue = vue
+        if self.detail:
+            self.dos.draw(renderer)
+            for collection in self.faces.values():
+                collection.draw(renderer)
+        else:
+            # Image déjà à la résolution de l'axes : copiée telle quelle
+            gc = renderer.new_gc()
+            gc.set_clip_rectangle(boite)
+            renderer.draw_image(gc, round(boite.x0), round(boite.y0), self.pixels)
+            gc.restore()
+        self.stale = False
+
+    def _mettre_a_jour(self, limites, pixels):
+        xa, xb, ya, yb = limites
+        xmin, xmax = min(xa, xb), max(xa, xb)
+        ymin, ymax = min(ya, yb), max(ya, yb)
+        largeur, hauteur = pixels
+        sx, sy = largeur / (xmax - xmin), hauteur / (ymax - ymin)
+
+        # Vue éloignée (image du plateau assez fine) : pas besoin des cartes visibles
+        eloignee = sx <= 2 * self.echelle and sy <= 2 * self.echelle
+        if not eloignee or self.index.compter(xmin, ymin, xmax, ymax) <= CARTES_VISIBLES_MAX:
+            visibles = self.index.dans_zone(xmin, ymin, xmax, ymax)
+            self.detail = len(visibles) <= CARTES_VISIBLES_MAX
+            if self.detail:
+                self._polygones(np.sort(visibles))
+                return
+        self.detail = False
+        if eloignee:
+            image = self._echantillonner(xmin, ymin, sx, sy, largeur, hauteur)
+        else:
+            image = self._rasteriser(visibles, xmin, ymin, sx, sy, largeur, hauteur)
+        # Ordre des lignes de l'écran (la première en haut), attendu par draw_image
+        self.pixels = np.ascontiguousarray(self.palette[image[::-1]])
+
+    def _polygones(self, visibles):
+        c = self.cartes
+        self.dos.set_verts(sommets_colonnes('rectangle', c.x[visibles], c.y[visibles],
+                                            c.largeur[visibles], c.hauteur[visibles]))
+        faces = visibles[c.revelee[visibles]]
+        formes = c.forme[faces]
+        for forme, collection in self.faces.items():
+            k = faces[formes == forme]
+            collection.set_verts(sommets_colonnes(c.noms_formes[forme], c.x[k], c.y[k],
+                                                  c.largeur[k], c.hauteur[k]))
+            collection.set_facecolor(self.rgba[c.couleur[k]])
+
+    def _echantillonner(self, xmin, ymin, sx, sy, largeur, hauteur):
+        """
+        Vue prélevée dans l'image du plateau (plus proche voisin), fond hors du plateau.
+        """
+        bx, by = self.bornes[:2]
+        pl, ph = self.taille_plateau
+        colonnes = np.floor((xmin + (np.arange(largeur) + 0.5) / sx - bx) * self.echelle).astype(np.intp)
+        lignes = np.floor((ymin + (np.arange(hauteur) + 0.5) / sy - by) * self.echelle).astype(np.intp)
+        image = self.plateau[np.clip(lignes, 0, ph - 1)[:, None], np.clip(colonnes, 0, pl - 1)]
+        image[(lignes < 0) | (lignes >= ph)] = 0
+        image[:, (colonnes < 0) | (colonnes >= pl)] = 0
+        return image
+
+    def _rectangles_pixels(self, indices, xmin, ymin, sx, sy, largeur, hauteur):
+        """
+        Rectangles de pixels [r0, r1[ × [c0, c1[ des cartes : chacune s'étend jusqu'au
+        pixel qui suit son bord, ce qui comble les écarts de moins d'un pixel entre
+        cartes (sinon, une vue éloignée serait striée de moirés).
+        """
+        c = self.cartes
+        x, y = c.x[indices], c.y[indices]
+        c0 = np.clip(np.floor((x - xmin) * sx), 0, largeur - 1).astype(np.intp)
+        r0 = np.clip(np.floor((y - ymin) * sy), 0, hauteur - 1).astype(np.intp)
+        c1 = np.clip(np.floor((x + c.largeur[indices] - xmin) * sx) + 1, c0 + 1, largeur).astype(np.intp)
+        r1 = np.clip(np.floor((y + c.hauteur[indices] - ymin) * sy) + 1, r0 + 1, hauteur).astype(np.intp)
+        return r0, r1, c0, c1
+
+    def _rasteriser(self, indices, xmin, ymin, sx, sy, largeur, hauteur):
+        """
+        Image (indices de la palette) des cartes `indices` : fond, dos des cartes et
+        couleur des faces visibles (un pixel partagé par deux faces reste au dos).
+        """
+        c = self.cartes
+        r0, r1, c0, c1 = self._rectangles_pixels(indices, xmin, ymin, sx, sy, largeur, hauteur)
+        image = (_couverture(r0, r1, c0, c1, hauteur, largeur) > 0).astype(np.int32)
+
+        faces = np.flatnonzero(c.revelee[indices])
+        if len(faces):
+            r0, r1, c0, c1 = r0[faces], r1[faces], c0[faces], c1[faces]
+            nombre = _couverture(r0, r1, c0, c1, hauteur, largeur)
+            couleur = _couverture(r0, r1, c0, c1, hauteur, largeur,
+                                  2 + c.couleur[indices[faces]].astype(np.float64))
+            une = nombre == 1
+            image[une] = couleur[une]
+        return image
+
+
+def _octets(rgba):
+    return (np.asarray(rgba) * 255).round().astype(np.uint8)
+
+
+def _couverture(r0, r1, c0, c1, hauteur, largeur, poids=None):
+    """
+    Somme, pour chaque pixel, des poids (entiers) des rectangles de pixels
+    [r0, r1[ × [c0, c1[ qui le recouvrent (1 par rectangle par défaut) :
+    différences aux quatre coins comptées par bincount, puis sommes cumulées
+    sur les deux axes.
+    """
+    pas = largeur + 1
+    taille = (hauteur + 1) * pas
+    plus = np.concatenate([r0 * pas + c0, r1 * pas + c1])
+    moins = np.concatenate([r0 * pas + c1, r1 * pas + c0])
+    if poids is None:
+        diff = np.bincount(plus, minlength=taille) - np.bincount(moins, minlength=taille)
+    else:
+        poids = np.concatenate([poids, poids])
+        diff = (np.bincount(plus, poids, minlength=taille)
+                - np.bincount(moins, poids, minlength=taille)).round().astype(np.int64)
+    diff = diff.reshape(hauteur + 1, pas)
+    return np.cumsum(np.cumsum(diff, axis=0), axis=1)[:hauteur, :largeur]
+
+
+def activer_zoom(ax, facteur=FACTEUR_ZOOM):
+    """
+    Zoom à la molette, centré sur le curseur. Renvoie l'identifiant de connexion.
+    """
+    def on_scroll(event):
+        if event.inaxes is not ax or event.xdata is None:
+            return
+        echelle = 1 / facteur if event.button == 'up' else facteur
+        x0, x1 = ax.get_xlim()
+        y0, y1 = ax.get_ylim()
+        ax.set_xlim(event.xdata + (x0 - event.xdata) * echelle,
+                    event.xdata + (x1 - event.xdata) * echelle)
+        ax.set_ylim(event.ydata + (y0 - event.ydata) * echelle,
+                    event.ydata + (y1 - event.ydata) * echelle)
+        ax.figure.canvas.draw_idle()
+
+    return ax.figure.canvas.mpl_connect('scroll_event', on_scroll)
@@ -0,0 +1,338 @@
+"""
+Sauvegarde automatique de la partie en cours, pour la reprendre plus tard
+(option --reprendre des scripts).
+
+Seul l'état logique est sauvegardé : plateau, cartes face visible, scores,
+joueur courant, temps écoulé et noms des joueurs ; les artistes Matplotlib sont
+recréés au chargement. Format (versionné) :
+- signature (6 octets) et numéro de version du format (uint16) ;
+- état, de taille fixe : numéro de la sauvegarde, scores des deux joueurs
+  (uint32), joueur courant, nombre de cartes retournées du tour en cours (uint8),
+  ces cartes (int32, -1 si aucune), temps écoulé en secondes (float64) ;
+- longueur (uint32) et en-tête JSON du plateau, colonnes du plateau (comme le
+  journal, jeu/journal.py) ;
+- masque des cartes face visible (un octet par carte, copie de Moteur.revelee).
+
+Le fichier est écrit en entier au début de la partie. Ensuite, après chaque tour
+(paire trouvée ou non-paire masquée), seuls les octets du masque des cartes du
+tour et l'état sont réécrits en place : quelques dizaines d'octets, en
+quelques microsecondes, quelle que soit la taille du plateau. Les écritures ne
+sont pas suivies d'un fsync (pas de latence ajoutée au clic) : elles survivent à
+l'arrêt du programme, pas forcément à une coupure de courant.
+
+Une nouvelle partie ne remplace pas sans le demander une partie non finie
+sauvegardée dans le même fichier : voir choisir.
+
+Usage : python -m jeu.sauvegarde partie_formes.sauvegarde   (contenu)
+        python -m jeu.sauvegarde --cartes 1000000            (temps d'une sauvegarde)
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from jeu.journal import entete_plateau, lire_plateau
+from jeu.moteur import Moteur, PAIRE, MASQUEES
+
+SIGNATURE = b"MEMSAV"
+VERSION = 1
+
+_SIGNATURE = struct.Struct("<6sH")
+_ETAT = struct.Struct("<IIIBBiid")
+_ENTETE = struct.Struct("<I")
+
+
+def options(mode, arguments=None):
+    """
+    Fichier de sauvegarde automatique : option --sauvegarde FICHIER, variable
+    d'environnement JEU_SAUVEGARDE, ou partie_<mode>.sauvegarde ; None si désactivée
+    (--sans-sauvegarde, JEU_SAUVEGARDE=0). Et partie à reprendre : option --reprendre
+    (reprend la partie sauvegardée dans ce fichier).
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--sauvegarde', default=None)
+    parser.add_argument('--sans-sauvegarde', action='store_true')
+    parser.add_argument('--reprendre', action='store_true')
+    args, _ = parser.parse_known_args(arguments)
+    if args.sans_sauvegarde:
+        return None, args.reprendre
+    valeur = os.environ.get('JEU_SAUVEGARDE', "")
+    if valeur == "0" and not args.sauvegarde:
+        return None, args.reprendre
+    return args.sauvegarde or valeur or f"partie_{mode}.sauvegarde", args.reprendre
+
+
+# ---------------------------------------
+# 1) Écriture
+# ---------------------------------------
+class Sauvegarde:
+    """
+    Sauvegarde de la partie jouée par `moteur` sur le plateau `cartes` (Cartes),
+    mise à jour après chaque tour. `horloge()` donne le temps écoulé (secondes).
+    """
+
+    def __init__(self, chemin, mode, cartes, moteur, horloge, noms=("", ""), ia=None):
+        self.chemin = chemin
+        self.moteur = moteur
+        self.horloge = horloge
+        self.numero = 0
+
+        # Fichier complet écrit à part puis renommé : une sauvegarde précédente
+        # n'est remplacée que par une sauvegarde entière
+        entete, colonnes = entete_plateau(mode, cartes, noms, ia)
+        provisoire = chemin + ".tmp"
+        with open(provisoire, "wb") as f:
+            f.write(_SIGNATURE.pack(SIGNATURE, VERSION))
+            f.write(self._etat())
+            f.write(_ENTETE.pack(len(entete)))
+            f.write(entete)
+            for colonne in colonnes:
+                f.write(colonne.tobytes())
+            self.debut_masque = f.tell()
+            f.write(moteur.revelee)
+        os.replace(provisoire, chemin)
+
+        # Ensuite, réécritures en place sans tampon (un appel système par écriture)
+        self.fichier = open(chemin, "r+b", buffering=0)
+        moteur.abonner(self.observer)
+
+    def _etat(self):
+        moteur = self.moteur
+        selection = (list(moteur.selection) + [-1, -1])[:2]
+        return _ETAT.pack(self.numero, moteur.scores[0], moteur.scores[1], moteur.joueur,
+                          len(moteur.selection), selection[0], selection[1], self.horloge())
+
+    def observer(self, evenements):
+        for ev in evenements:
+            if ev.type in (PAIRE, MASQUEES):
+                self.sauver(ev.cartes)
+
+    def sauver(self, cartes=()):
+        """
+        Réécrit l'état et l'octet du masque des cartes données (celles dont la
+        face a changé depuis la dernière sauvegarde).
+        """
+        fichier, revelee = self.fichier, self.moteur.revelee
+        for i in cartes:
+            fichier.seek(self.debut_masque + i)
+            fichier.write(revelee[i:i + 1])
+        self.numero += 1
+        fichier.seek(_SIGNATURE.size)
+        fichier.write(self._etat())
+
+    def fermer(self):
+        """
+        Fin de la session : sauvegarde la carte retournée du tour en cours, ou
+        supprime la sauvegarde si la partie est finie (plus rien à reprendre).
+        """
+        if self.fichier.closed:
+            return
+        if self.moteur.fini:
+            self.fichier.close()
+            os.remove(self.chemin)
+            return
+        self.sauver(self.moteur.selection)
+        self.fichier.close()
+
+
+# ---------------------------------------
+# 2) Lecture
+# ---------------------------------------
+Instantane = namedtuple('Instantane', ['version', 'numero', 'mode', 'noms', 'ia', 'date',
+                                       'cartes', 'revelee', 'selection', 'scores',
+                                       'joueur', 'temps'])
+Instantane.__doc__ = """
+version, numero : version du format et numéro de la sauvegarde
+mode, noms, ia  : comme dans le journal ; date du début de la partie
+cartes          : plateau (Cartes)
+revelee         : cartes face visible (tableau d'octets 0/1, indexé comme les cartes)
+selection       : carte retournée du tour en cours (tuple vide ou d'un élément)
+scores, joueur  : scores des deux joueurs et joueur courant
+temps           : temps écoulé (secondes)
+"""
+
+
+def charger(chemin):
+    """
+    Partie sauvegardée dans `chemin` (Instantane). Une non-paire encore visible à
+    la sauvegarde (fenêtre fermée pendant son affichage) est masquée, comme elle
+    l'aurait été dans la partie.
+    """
+    with open(chemin, "rb") as f:
+        donnees = f.read()
+    if len(donnees) < _SIGNATURE.size + _ETAT.size + _ENTETE.size:
+        raise ValueError(f"{chemin} n'est pas une sauvegarde de partie.")
+    signature, version = _SIGNATURE.unpack_from(donnees)
+    if signature != SIGNATURE:
+        raise ValueError(f"{chemin} n'est pas une sauvegarde de partie.")
+    if version > VERSION:
+        raise ValueError(f"{chemin} : format de sauvegarde {version} (version {VERSION} "
+                         f"au plus prise en charge).")
+
+    numero, s1, s2, joueur, nombre, c1, c2, temps = _ETAT.unpack_from(donnees, _SIGNATURE.size)
+    position = _SIGNATURE.size + _ETAT.size
+    (taille,) = _ENTETE.unpack_from(donnees, position)
+    position += _ENTETE.size
+    entete = json.loads(donnees[position:position + taille])
+    position += taille
+    cartes, position = lire_plateau(donnees, position, entete)
+    if cartes is None or position + len(cartes) > len(donnees):
+        raise ValueError(f"{chemin} : sauvegarde tronquée.")
+    revelee = np.frombuffer(donnees, dtype=np.uint8, count=len(cartes), offset=position)
+
+    selection = (c1, c2)[:nombre]
+    if len(selection) == 2:
+        revelee = revelee.copy()
+        revelee[list(selection)] = 0
+        selection, joueur = (), 3 - joueur
+    ia = {int(j): nom for j, nom in entete['ia'].items()}
+    return Instantane(version, numero, entete['mode'], tuple(entete['noms']), ia, entete['date'],
+                      cartes, revelee, selection, (s1, s2), joueur, temps)
+
+
+def restaurer(instantane, cartes, moteur):
+    """
+    Remet le plateau (Cartes : colonnes revelee et trouvee) et le moteur dans
+    l'état de la sauvegarde, sans boucle sur les cartes.
+    """
+    cartes.revelee[:] = instantane.revelee.astype(bool)
+    cartes.trouvee[:] = cartes.revelee
+    cartes.trouvee[list(instantane.selection)] = False
+    moteur.restaurer(instantane.revelee, instantane.scores, instantane.joueur,
+                     instantane.selection)
+
+
+# ---------------------------------------
+# 3) Reprise ou nouvelle partie
+# ---------------------------------------
+def en_cours(chemin):
+    """
+    Partie non finie sauvegardée dans `chemin` (Instantane), ou None s'il n'y en a
+    pas (pas de fichier, ou fichier illisible : il peut être remplacé).
+    """
+    if not chemin or not os.path.exists(chemin):
+        return None
+    try:
+        return charger(chemin)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def decrire(instantane):
+    """
+    Résumé d'une partie sauvegardée, sur une ligne.
+    """
+    s = instantane
+    trouvees = int(s.revelee.sum()) - len(s.selection)
+    return (f"partie du mode {s.mode} du {s.date} : {s.noms[0]} {s.scores[0]} - "
+            f"{s.noms[1]} {s.scores[1]}, {trouvees}/{len(s.cartes)} cartes trouvées")
+
+
+def choisir(chemin, mode, reprendre=None, demander=input):
+    """
+    Partie à reprendre (Instantane ou None) et fichier où sauvegarder la partie
+    jouée (None : pas de sauvegarde). `chemin` : fichier de sauvegarde (options).
+    reprendre=True reprend la partie sauvegardée ; False commence une nouvelle
+    partie qui remplace la sauvegarde ; None : si une partie non finie est
+    sauvegardée, le joueur choisit de la reprendre, de la remplacer ou de jouer
+    sans sauvegarde (réponse vide : reprendre ; fin de l'entrée : sans sauvegarde,
+    la partie sauvegardée est gardée).
+    """
+    if reprendre is False:
+        return None, chemin
+    instantane = en_cours(chemin)
+    if reprendre:
+        if instantane is None or instantane.mode != mode:
+            print(f"Aucune partie du mode {mode} à reprendre : nouvelle partie.")
+            return None, chemin
+        return instantane, chemin
+    if instantane is None:
+        return None, chemin
+
+    print(f"Partie non finie dans {chemin} : {decrire(instantane)}.")
+    if instantane.mode == mode:
+        question = "[R]eprendre / [n]ouvelle partie (remplace la sauvegarde) / [s]ans sauvegarde : "
+    else:
+        question = "[n]ouvelle partie (remplace la sauvegarde) / [S]ans sauvegarde : "
+    try:
+        reponse = demander(question).strip().lower()
+    except EOFError:
+        reponse = "s"
+    if reponse.startswith("n"):
+        return None, chemin
+    if instantane.mode == mode and not reponse.startswith("s"):
+        return instantane, chemin
+    print("La partie sauvegardée est gardée ; cette partie ne sera pas sauvegardée.")
+    return None, None
+
+
+# ---------------------------------------
+# 4) Temps d'une sauvegarde (sans affichage)
+# ---------------------------------------
+def mesurer(n, tours, chemin):
+    """
+    Partie jouée au hasard sur n cartes, sauvegardée après chaque tour. Renvoie
+    (durée de l'écriture complète, durées des sauvegardes de tour en secondes).
+    """
+    from jeu.cartes import Cartes
+
+    rng = np.random.default_rng(0)
+    cles = rng.permutation(np.arange(n) // 2)
+    cartes = Cartes(np.arange(n).astype(str), np.zeros(n), np.zeros(n), np.ones(n),
+                    np.ones(n), cles.astype(str))
+    moteur = Moteur(cles.tolist())
+    debut = time.perf_counter()
+    sauvegarde = Sauvegarde(chemin, 'classique', cartes, moteur, lambda: 0.0)
+    creation = time.perf_counter() - debut
+
+    durees = []
+    horloge = time.perf_counter
+    cachees = rng.permutation(n).tolist()
+    for _ in range(tours):
+        tour = [cachees.pop(), cachees.pop()]
+        for i in tour:
+            moteur.flip(i)
+        debut = horloge()
+        sauvegarde.sauver(tour)
+        durees.append(horloge() - debut)
+        moteur.masquer()
+    sauvegarde.fermer()
+    os.remove(chemin)
+    return creation, durees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contenu d'une sauvegarde, ou temps d'une sauvegarde.")
+    parser.add_argument('fichier', nargs='?', default=None)
+    parser.add_argument('--cartes', type=int, default=None,
+                        help="mesure le temps des sauvegardes sur un plateau de CARTES cartes")
+    parser.add_argument('--tours', type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.cartes is not None:
+        creation, durees = mesurer(args.cartes, min(args.tours, args.cartes // 2),
+                                   args.fichier or "mesure.sauvegarde")
+        durees = np.array(durees) * 1e6
+        print(f"{args.cartes} cartes : écriture complète {creation * 1e3:.1f} ms ; "
+              f"sauvegarde d'un tour p50 {np.percentile(durees, 50):.1f} µs, "
+              f"p99 {np.percentile(durees, 99):.1f} µs")
+        return 0
+    if args.fichier is None:
+        parser.error("donner un fichier de sauvegarde ou --cartes")
+
+    s = charger(args.fichier)
+    retournee = f", carte {s.selection[0]} retournée" if s.selection else ""
+    print(f"{args.fichier} : format {s.version}, sauvegarde n° {s.numero}, partie du {s.date}\n"
+          f"{s.mode}, {len(s.cartes)} cartes, {int(s.revelee.sum()) - len(s.selection)} trouvées"
+          f"{retournee}\n{s.noms[0]} : {s.scores[0]}   {s.noms[1]} : {s.scores[1]}   "
+          f"(tour du joueur {s.joueur})   temps {int(s.temps) // 60:02d}:{int(s.temps) % 60:02d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Serveur de parties (asyncio) : de nombreuses parties simultanées, jouées à
+distance avec les règles du moteur (tours, paires, non-paire visible 1,5 s).
+
+Protocole : une connexion TCP (localhost) par client, un message JSON par ligne
+dans chaque sens. Le client envoie des actions :
+    {"action": "creer", "regle": "classique" | "formes", "nom": "...", "joueurs": 1 | 2}
+        joueurs = 2 : les deux joueurs partagent la connexion (comme dans la
+        fenêtre du jeu) ; joueurs = 1 : la partie attend un adversaire
+    {"action": "rejoindre", "partie": numero (facultatif), "nom": "..."}
+        sans numéro : première partie en attente de la même règle
+    {"action": "retourner", "carte": indice}
+    {"action": "quitter"}
+    {"action": "statistiques"}
+et reçoit les événements du moteur, avec un champ "type" : partie, debut,
+revelee, paire, non_paire, masquees, joueur_suivant, fin, abandon, erreur,
+statistiques.
+
+Aucun tour n'attend : le masquage d'une non-paire est une tâche asyncio
+(asyncio.sleep), une partie inactive ne coûte que son moteur et sa connexion.
+La mémoire reste bornée : nombre de parties limité, lignes reçues limitées à
+LONGUEUR_MAX_LIGNE, plateaux partagés entre les parties (tirés dans une
+réserve de PLATEAUX_FORMES plateaux), et un client qui ne lit pas ses messages
+est déconnecté quand son tampon d'envoi dépasse TAMPON_MAX_ENVOI.
+
+Usage : python -m jeu.serveur --port 8765
+        python -m jeu.client_charge --parties 10000 --actives 100   (test de charge)
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import random
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows : pas de limites de ressources à la Unix
+    resource = None
+
+from jeu.configuration import lire_config_classique, generer_plateau, dictionnaire_plateau
+from jeu.moteur import (Moteur, cle_classique, cle_formes, REVELEE, PAIRE, NON_PAIRE, FIN,
+                        ETAT_ATTENTE_MASQUAGE)
+
+HOTE = "127.0.0.1"
+PORT = 8765
+
+# Durée d'affichage de deux cartes qui ne correspondent pas (comme dans les scripts)
+DELAI_MASQUAGE = 1.5
+
+PARTIES_MAX = 20_000
+LONGUEUR_MAX_LIGNE = 4096
+TAMPON_MAX_ENVOI = 1 << 16
+PLATEAUX_FORMES = 64
+
+
+# ---------------------------------------
+# 1) Plateaux (partagés entre les parties)
+# ---------------------------------------
+class Plateau:
+    """
+    Clés de paire et rectangles des cartes d'un plateau, envoyés aux joueurs au début.
+    """
+
+    __slots__ = ('cles', 'rects')
+
+    def __init__(self, formes, cle):
+        self.cles = tuple(cle(data) for data in formes.values())
+        self.rects = [[data[0][0], data[0][1], data[1], data[2]] for data in formes.values()]
+
+
+@functools.lru_cache(maxsize=None)
+def plateaux(regle, fichier_config="config.txt"):
+    """
+    Plateaux proposés pour une règle : celui de config.txt en mode classique,
+    une réserve de plateaux tirés au hasard (6×6) en mode formes.
+    """
+    if regle == 'classique':
+        return (Plateau(lire_config_classique(fichier_config), cle_classique),)
+    return tuple(Plateau(dictionnaire_plateau(generer_plateau(colonnes=6, lignes=6, graine=k),
+                                              avec_forme=True), cle_formes)
+                 for k in range(PLATEAUX_FORMES))
+
+
+def encoder(message):
+    """
+    Ligne du protocole (JSON compact terminé par un saut de ligne).
+    """
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+# ---------------------------------------
+# 2) Parties et connexions
+# ---------------------------------------
+class Connexion:
+    """
+    Un client : il occupe une place (joueur 1 ou 2) ou les deux places d'une partie.
+    """
+
+    __slots__ = ('writer', 'partie', 'places', 'nom')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.partie = None
+        self.places = ()
+        self.nom = ""
+
+    def envoyer(self, message):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > TAMPON_MAX_ENVOI:
+            # Client qui ne lit plus : déconnecté plutôt que de garder ses messages
+            transport.abort()
+            return
+        self.writer.write(encoder(message))
+
+
+class Partie:
+    """
+    Une partie en cours ou en attente d'un adversaire.
+    """
+
+    __slots__ = ('numero', 'regle', 'plateau', 'moteur', 'connexions', 'noms', 'masquage')
+
+    def __init__(self, numero, regle, plateau):
+        self.numero = numero
+        self.regle = regle
+        self.plateau = plateau
+        self.moteur = Moteur(plateau.cles)
+        self.connexions = []
+        self.noms = ["", ""]
+        self.masquage = None  # tâche de masquage d'une non-paire
+
+    def diffuser(self, message):
+        for connexion in self.connexions:
+            connexion.envoyer(message)
+
+    @property
+    def commencee(self):
+        return len(self.connexions) == 2 or (self.connexions and len(self.connexions[0].places) == 2)
+
+
+def _message(evenement, moteur):
+    """
+    Message du protocole pour un événement du moteur.
+    """
+    type_, cartes, joueur = evenement
+    message = {'type': type_, 'joueur': joueur}
+    if type_ == REVELEE:
+        cle = moteur.cles[cartes[0]]
+        message['carte'] = cartes[0]
+        message['cle'] = list(cle) if isinstance(cle, tuple) else cle
+    elif cartes:
+        message['cartes'] = list(cartes)
+    if type_ in (PAIRE, FIN):
+        message['scores'] = list(moteur.scores)
+    return message
+
+
+# ---------------------------------------
+# 3) Serveur
+# ---------------------------------------
+class Serveur:
+    """
+    Parties hébergées et traitement des actions des clients.
+    """
+
+    def __init__(self, parties_max=PARTIES_MAX, delai_masquage=DELAI_MASQUAGE, graine=None):
+        self.parties_max = parties_max
+        self.delai_masquage = delai_masquage
+        self.rng = random.Random(graine)
+        self.parties = {}
+        self.en_attente = {'classique': deque(), 'formes': deque()}
+        self.numeros = itertools.count(1)
+        self.connexions = 0
+        self.parties_terminees = 0
+
+    async def servir(self, hote=HOTE, port=PORT):
+        serveur = await asyncio.start_server(self.client, hote, port,
+                                             limit=LONGUEUR_MAX_LIGNE, backlog=4096)
+        async with serveur:
+            await serveur.serve_forever()
+
+    async def client(self, reader, writer):
+        """
+        Boucle de lecture d'un client : une action par ligne.
+        """
+        connexion = Connexion(writer)
+        self.connexions += 1
+        try:
+            while True:
+                try:
+                    ligne = await reader.readline()
+                except ValueError:
+                    connexion.envoyer({'type': 'erreur', 'message': "ligne trop longue"})
+                    break
+                if not ligne:
+                    break
+                try:
+                    message = json.loads(ligne)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict) or message.get('action') not in ACTIONS:
+                    connexion.envoyer({'type': 'erreur', 'message': "action inconnue"})
+                    continue
+                erreur = getattr(self, "_" + message['action'])(connexion, message)
+                if erreur:
+                    connexion.envoyer({'type': 'erreur', 'message': erreur})
+        except ConnectionError:
+            pass
+        finally:
+            self.connexions -= 1
+            self._quitter(connexion, None)
+            writer.close()
+
+    # -- Actions (renvoient un message d'erreur, ou None) --
+
+    def _creer(self, connexion, message):
+        if connexion.partie is not None:
+            return "déjà dans une partie"
+        if len(self.parties) >= self.parties_max:
+            return "serveur complet"
+        regle = message.get('regle', 'classique')
+        if type(regle) is not str or regle not in self.en_attente:
+            return "règle inconnue"
+        joueurs = message.get('joueurs', 1)
+        if type(joueurs) is not int or joueurs not in (1, 2):
+            return "joueurs : 1 ou 2"
+
+        partie = Partie(next(self.numeros), regle, self.rng.choice(plateaux(regle)))
+        self.parties[partie.numero] = partie
+        connexion.partie = partie
+        connexion.places = (1, 2) if joueurs == 2 else (1,)
+        connexion.nom = str(message.get('nom', ""))[:40]
+        partie.connexions.append(connexion)
+        partie.noms = [connexion.nom, connexion.nom if joueurs == 2 else ""]
+        connexion.envoyer({'type': 'partie', 'partie': partie.numero, 'places': list(connexion.places)})
+        if joueurs == 2:
+            self._commencer(partie)
+        else:
+            self.en_attente[regle].append(partie)
+
+    def _rejoindre(self, connexion, message):
+        if connexion.partie is not None:
+            return "déjà dans une partie"
+        numero = message.get('partie')
+        if numero is None:
+            regle = message.get('regle', 'classique')
+            attente = self.en_attente.get(regle) if type(regle) is str else None
+            if not attente:
+                return "aucune partie en attente"
+            partie = attente.popleft()
+        else:
+            # Entier JSON seulement (ni liste, ni objet, ni booléen)
+            if type(numero) is not int:
+                return "numéro de partie invalide"
+            partie = self.parties.get(numero)
+            if partie is None or partie.commencee:
+                return "partie introuvable ou complète"
+            self.en_attente[partie.regle].remove(partie)
+
+        connexion.partie = partie
+        connexion.places = (2,)
+        connexion.nom = str(message.get('nom', ""))[:40]
+        partie.connexions.append(connexion)
+        partie.noms[1] = connexion.nom
+        connexion.envoyer({'type': 'partie', 'partie': partie.numero, 'places': [2]})
+        self._commencer(partie)
+
+    def _commencer(self, partie):
+        partie.diffuser({'type': 'debut', 'partie': partie.numero, 'regle': partie.regle,
+                         'noms': partie.noms, 'cartes': partie.plateau.rects,
+                         'joueur': partie.moteur.joueur})
+
+    def _retourner(self, connexion, message):
+        partie = connexion.partie
+        if partie is None or not partie.commencee:
+            return "pas de partie en cours"
+        moteur = partie.moteur
+        if moteur.joueur not in connexion.places:
+            return "ce n'est pas votre tour"
+        if moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            return "cartes en cours d'affichage"
+        carte = message.get('carte')
+        if type(carte) is not int or not 0 <= carte < len(moteur.cles):
+            return "carte invalide"
+        evenements = moteur.flip(carte)
+        if not evenements:
+            return "carte déjà visible"
+        self._diffuser(partie, evenements)
+
+    def _quitter(self, connexion, message):
+        partie = connexion.partie
+        if partie is None:
+            return None
+        connexion.partie = None
+        if partie.numero not in self.parties:
+            return None
+        if not partie.commencee:
+            self.en_attente[partie.regle].remove(partie)
+        else:
+            for autre in partie.connexions:
+                if autre is not connexion:
+                    autre.partie = None
+                    autre.envoyer({'type': 'abandon', 'joueur': connexion.places[0]})
+        self._terminer(partie)
+
+    def _statistiques(self, connexion, message):
+        connexion.envoyer({
+            'type': 'statistiques',
+            'parties': len(self.parties),
+            'en_attente': sum(len(attente) for attente in self.en_attente.values()),
+            'connexions': self.connexions,
+            'parties_terminees': self.parties_terminees,
+            'memoire_max_mo': memoire_max_mo(),
+        })
+
+    # -- Déroulement --
+
+    def _diffuser(self, partie, evenements):
+        moteur = partie.moteur
+        for evenement in evenements:
+            partie.diffuser(_message(evenement, moteur))
+            if evenement.type == NON_PAIRE:
+                partie.masquage = asyncio.get_running_loop().create_task(self._masquer(partie))
+            elif evenement.type == FIN:
+                for connexion in partie.connexions:
+                    connexion.partie = None
+                self._terminer(partie)
+
+    async def _masquer(self, partie):
+        """
+        Non-paire : les cartes restent visibles delai_masquage secondes, sans bloquer le serveur.
+        """
+        await asyncio.sleep(self.delai_masquage)
+        partie.masquage = None
+        if partie.numero in self.parties:
+            self._diffuser(partie, partie.moteur.masquer())
+
+    def _terminer(self, partie):
+        if partie.masquage is not None:
+            partie.masquage.cancel()
+            partie.masquage = None
+        if self.parties.pop(partie.numero, None) is not None:
+            self.parties_terminees += 1
+        partie.connexions = []
+
+
+ACTIONS = ('creer', 'rejoindre', 'retourner', 'quitter', 'statistiques')
+
+
+def memoire_max_mo():
+    """
+    Mémoire maximale utilisée par le serveur (Mo), None si inconnue (Windows).
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def augmenter_limite_fichiers():
+    """
+    Porte la limite de descripteurs ouverts (une connexion = un descripteur) au maximum
+    autorisé. Renvoie cette limite, ou None si elle n'est pas réglable (Windows).
+    """
+    if resource is None:
+        return None
+    souple, dure = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if souple < dure:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (dure, dure))
+    return dure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de parties du jeu du memory.")
+    parser.add_argument('--hote', default=HOTE)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--parties-max', type=int, default=PARTIES_MAX)
+    parser.add_argument('--delai-masquage', type=float, default=DELAI_MASQUAGE)
+    args = parser.parse_args()
+
+    limite = augmenter_limite_fichiers()
+    descripteurs = f", {limite} descripteurs" if limite is not None else ""
+    print(f"Serveur sur {args.hote}:{args.port} ({args.parties_max} parties au plus"
+          f"{descripteurs})")
+    serveur = Serveur(args.parties_max, args.delai_masquage)
+    try:
+        asyncio.run(serveur.servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Simulation Monte Carlo vectorisée : B parties jouées simultanément, l'état de
+toutes les parties étant stocké dans des tableaux NumPy (cartes × parties, un
+bit par carte).
+
+Les règles sont celles du moteur : deux cartes forment une paire si elles ont
+la même clé (couleur en mode classique, (couleur, forme) en mode formes) ;
+un joueur qui trouve une paire rejoue, sinon la main passe.
+
+Débit mesuré (un cœur, 18 paires) : plus de 100 000 parties/s quand au moins un
+joueur a une mémoire parfaite, plus d'un million entre deux joueurs sans mémoire
+(tirage direct, voir _simuler_sans_memoire). Avec une mémoire limitée, environ
+40 000 parties/s seulement : les parties sont deux fois plus longues et l'oubli
+tire des bits aléatoires à chaque tour ; cet écart à l'objectif est accepté.
+
+Usage : python -m jeu.simulation --parties 100000 --paires 18 --politiques parfaite aleatoire
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from jeu.cartes import interner
+
+# ---------------------------------------
+# 1) Politiques des joueurs
+# ---------------------------------------
+Politique = namedtuple('Politique', ['memoire', 'oubli'])
+Politique.__doc__ = """
+memoire : le joueur se souvient-il des cartes vues ?
+oubli   : probabilité, à chaque tour, d'oublier chacune des cartes mémorisées
+          (arrondie au multiple de 2^-16 le plus proche, voir _oublier).
+"""
+
+ALEATOIRE = Politique(False, 0.0)
+PARFAITE = Politique(True, 0.0)
+
+
+def memoire_limitee(oubli):
+    return Politique(True, float(oubli))
+
+
+def politique_depuis_nom(nom):
+    """
+    'aleatoire', 'parfaite' ou 'limitee:<taux>' (ex. 'limitee:0.1').
+    """
+    if nom == 'aleatoire':
+        return ALEATOIRE
+    if nom == 'parfaite':
+        return PARFAITE
+    if nom.startswith('limitee:'):
+        return memoire_limitee(nom.split(':', 1)[1])
+    raise ValueError(f"Politique inconnue : {nom!r}")
+
+
+# ---------------------------------------
+# 2) Ensembles de cartes codés en bits
+# ---------------------------------------
+# L'état des B parties est stocké bit à bit : un tableau (mots × parties) d'entiers
+# 64 bits où le bit i correspond à la carte i. Les cartes sont rangées par paires
+# (cartes 2p et 2p+1, la partenaire de i est i ^ 1) : les joueurs ne voient pas les
+# positions, seulement ce qu'ils ont mémorisé, et leurs choix sont uniformes parmi
+# les cartes d'une même catégorie ; la disposition est donc sans effet sur les
+# statistiques.
+_UN = np.uint64(1)
+_BITS_PAIRS = np.uint64(0x5555555555555555)  # bit de la première carte de chaque paire
+_L8 = np.uint64(0x0101010101010101)
+_H8 = np.uint64(0x8080808080808080)
+
+# _SELECTION_OCTET[8 * octet + k] : position du k-ième bit à 1 de l'octet
+_SELECTION_OCTET = np.zeros(256 * 8, dtype=np.uint8)
+for _octet in range(256):
+    _bits = [b for b in range(8) if _octet >> b & 1]
+    _SELECTION_OCTET[8 * _octet:8 * _octet + len(_bits)] = _bits
+
+
+if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+    def _popcount(x):
+        return np.bitwise_count(x).astype(np.int64)
+else:
+    def _popcount(x):
+        x = x - ((x >> _UN) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return ((x * _L8) >> np.uint64(56)).astype(np.int64)
+
+
+def _selection_mot(x, k):
+    """
+    Position du k-ième bit à 1 de chaque mot x (k < nombre de bits à 1), sans boucle
+    sur les bits : sommes par octet dans un seul mot, puis table pour l'octet trouvé.
+    """
+    k = k.astype(np.uint64)
+    octets = x - ((x >> _UN) & np.uint64(0x5555555555555555))
+    octets = (octets & np.uint64(0x3333333333333333)) + ((octets >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    octets = (octets + (octets >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    cumuls = octets * _L8                          # octet j : nombre de bits dans les octets 0..j
+    avant = (((k * _L8) | _H8) - cumuls) & _H8     # octets dont le cumul est <= k
+    decalage = (_popcount(avant) * 8).astype(np.uint64)
+    rang = k - (((cumuls << np.uint64(8)) >> decalage) & np.uint64(0xFF))
+    octet = (x >> decalage) & np.uint64(0xFF)
+    return decalage.astype(np.int64) + np.take(_SELECTION_OCTET, (octet << np.uint64(3)) | rang)
+
+
+def _tirer(mots, u):
+    """
+    Pour chaque partie (colonne de `mots`), indice d'une carte tirée uniformément
+    parmi les bits à 1, u étant un tirage uniforme dans [0, 1) ; -1 si aucun bit.
+    """
+    nb = _popcount(mots)
+    total = nb[0] if len(mots) == 1 else nb.sum(axis=0)
+    k = (u * total).astype(np.int64)
+    indice = np.full(mots.shape[1], -1, dtype=np.int64)
+    for w, mot in enumerate(mots):
+        ici = (indice < 0) & (k < nb[w])
+        indice = np.where(ici, 64 * w + _selection_mot(mot, np.minimum(k, 63)), indice)
+        k -= nb[w]
+    return indice
+
+
+def _plus_bas(mots):
+    """
+    Indice du bit à 1 le plus bas de chaque partie (-1 si aucun bit).
+    """
+    indice = np.full(mots.shape[1], -1, dtype=np.int64)
+    for w in reversed(range(len(mots))):
+        mot = mots[w]
+        bas = _popcount((mot & (~mot + _UN)) - _UN)
+        indice = np.where(mot != 0, 64 * w + bas, indice)
+    return indice
+
+
+def _contient(mots, indice):
+    """
+    Le bit `indice` est-il à 1, pour chaque partie ?
+    """
+    decalage = (indice & 63).astype(np.uint64)
+    present = np.zeros(mots.shape[1], dtype=bool)
+    for w, mot in enumerate(mots):
+        present |= ((mot >> decalage) & _UN).astype(bool) & (indice >> 6 == w)
+    return present
+
+
+def _bit(indice, nb_mots):
+    """
+    Ensembles (nb_mots × parties) réduits à la carte `indice` de chaque partie.
+    """
+    bit = _UN << (indice & 63).astype(np.uint64)
+    mot = indice >> 6
+    return np.stack([np.where(mot == w, bit, np.uint64(0)) for w in range(nb_mots)])
+
+
+PRECISION_OUBLI = 16
+
+
+def _oublier(memoire, oubli, rng):
+    """
+    Efface chaque carte de `memoire` avec la probabilité `oubli`, arrondie à
+    2^-PRECISION_OUBLI : un masque où chaque bit vaut 1 avec cette probabilité est
+    construit à partir de mots aléatoires, un par chiffre binaire de la probabilité
+    (du moins significatif au plus significatif : OU pour un chiffre 1, ET pour un 0).
+    """
+    q = round(oubli * (1 << PRECISION_OUBLI))
+    if q <= 0:
+        return
+    if q >= 1 << PRECISION_OUBLI:
+        memoire[...] = 0
+        return
+    chiffres = [(q >> k) & 1 for k in range(PRECISION_OUBLI)]
+    chiffres = chiffres[chiffres.index(1):]  # les 0 de poids faible laissent le masque vide
+    aleatoire = rng.bit_generator.random_raw((len(chiffres),) + memoire.shape)
+    masque = np.zeros(memoire.shape, dtype=np.uint64)
+    for chiffre, mots in zip(chiffres, aleatoire):
+        if chiffre:
+            masque |= mots
+        else:
+            masque &= mots
+    memoire &= ~masque
+
+
+# ---------------------------------------
+# 3) Simulation
+# ---------------------------------------
+Resultats = namedtuple('Resultats', ['tours', 'scores'])
+Resultats.__doc__ = """
+tours  : nombre de tours (deux cartes retournées) de chaque partie, forme (B,)
+scores : paires trouvées par chaque joueur, forme (B, 2) (le joueur 1 commence)
+"""
+
+
+def simuler(cles, nb_parties, politiques=(PARFAITE, PARFAITE), graine=None,
+            tours_max=100_000, taille_bloc=16384):
+    """
+    Joue `nb_parties` parties sur le plateau décrit par `cles` (clé de paire de chaque
+    carte, ex. Moteur.cles) et renvoie les Resultats. Chaque clé doit apparaître
+    exactement deux fois. Au plus `taille_bloc` parties sont en cours à la fois, pour
+    que les tableaux de travail restent dans le cache du processeur ; une partie
+    finie est remplacée par une nouvelle (voir _simuler_flux). Une partie non finie
+    après `tours_max` tours a 0 tour et des scores nuls.
+    """
+    noms, ids = interner(cles)
+    if len(ids) != 2 * len(noms) or np.any(np.bincount(ids) != 2):
+        raise ValueError("Chaque clé de paire doit apparaître exactement deux fois.")
+
+    rng = np.random.default_rng(graine)
+    tours = np.zeros(nb_parties, dtype=np.int32)
+    scores = np.zeros((nb_parties, 2), dtype=np.int32)
+    if not any(politique.memoire for politique in politiques):
+        _simuler_sans_memoire(len(noms), nb_parties, rng, tours_max, tours, scores)
+    else:
+        _simuler_flux(len(ids), nb_parties, politiques, rng, tours_max, taille_bloc,
+                      tours, scores)
+    return Resultats(tours, scores)
+
+
+def _simuler_sans_memoire(nb_paires, nb_parties, rng, tours_max, res_tours, res_scores):
+    """
+    Parties entre deux joueurs sans mémoire : avec k paires restantes, un tour trouve
+    une paire avec la probabilité 1 / (2k - 1), quel que soit le passé. Le nombre de
+    non-paires avant chacune des paires est donc un tirage géométrique ; sa parité
+    dit qui trouve la paire. Une boucle sur les paires, aucune sur les tours.
+    """
+    joueur = np.zeros(nb_parties, dtype=np.int64)
+    colonnes = np.arange(nb_parties)
+    for k in range(nb_paires, 0, -1):
+        echecs = rng.geometric(1 / (2 * k - 1), nb_parties) - 1
+        res_tours += (echecs + 1).astype(np.int32)
+        joueur ^= echecs & 1
+        res_scores[colonnes, joueur] += 1
+    trop_longues = res_tours > tours_max
+    res_tours[trop_longues] = 0
+    res_scores[trop_longues] = 0
+
+
+# Parties en cours retirées et remplacées dès qu'elles sont au moins 1/COMPACTAGE du lot
+COMPACTAGE = 8
+
+
+def _simuler_flux(n, nb_parties, politiques, rng, tours_max, taille_lot, res_tours, res_scores):
+    """
+    Joue les parties à n cartes par un lot d'au plus `taille_lot` parties en cours ;
+    remplit res_tours et res_scores. Les colonnes des parties finies sont retirées,
+    et remplacées par de nouvelles parties, tous les quelques tours (quand elles
+    forment une part suffisante du lot) : le travail d'un tour suit le nombre de
+    parties en cours, et le lot ne se vide qu'à la fin de la simulation.
+    """
+    nb_mots = (n + 63) // 64
+    tout = np.array([(1 << min(64, n - 64 * w)) - 1 for w in range(nb_mots)], dtype=np.uint64)
+    restante = np.zeros((nb_mots, 0), dtype=np.uint64)
+    # Cartes mémorisées par chaque joueur (restent vides pour un joueur sans mémoire)
+    memoire = np.zeros((2, nb_mots, 0), dtype=np.uint64)
+    joueur = np.zeros(0, dtype=np.int64)      # 0 : joueur 1, 1 : joueur 2
+    scores = np.zeros((0, 2), dtype=np.int32)
+    tours = np.zeros(0, dtype=np.int32)
+    partie = np.zeros(0, dtype=np.int64)      # numéro de chaque partie du lot
+    en_cours = np.zeros(0, dtype=bool)
+    suivante = 0                              # prochaine partie à commencer
+
+    while True:
+        # a) Parties finies retirées du lot, nouvelles parties ajoutées
+        libres = len(partie) - int(en_cours.sum())
+        if libres * COMPACTAGE >= max(len(partie), 1) or not en_cours.any():
+            partie, joueur, scores, tours = (partie[en_cours], joueur[en_cours],
+                                             scores[en_cours], tours[en_cours])
+            restante, memoire = restante[:, en_cours], memoire[:, :, en_cours]
+            ajout = min(taille_lot - len(partie), nb_parties - suivante)
+            if ajout > 0:
+                partie = np.concatenate([partie, np.arange(suivante, suivante + ajout)])
+                joueur = np.concatenate([joueur, np.zeros(ajout, dtype=np.int64)])
+                scores = np.concatenate([scores, np.zeros((ajout, 2), dtype=np.int32)])
+                tours = np.concatenate([tours, np.zeros(ajout, dtype=np.int32)])
+                restante = np.concatenate([restante, np.repeat(tout[:, None], ajout, axis=1)], axis=1)
+                memoire = np.concatenate([memoire, np.zeros((2, nb_mots, ajout), dtype=np.uint64)],
+                                         axis=2)
+                suivante += ajout
+            if len(partie) == 0:
+                break
+            en_cours = np.ones(len(partie), dtype=bool)
+
+        b = len(partie)
+        vue = np.where(joueur == 0, memoire[0], memoire[1]) & restante
+
+        # b) Paire connue : les deux cartes d'une paire sont mémorisées
+        i_paire = _plus_bas(vue & (vue >> _UN) & _BITS_PAIRS)
+        a_paire = i_paire >= 0
+
+        # c) Sinon : première carte tirée parmi les cartes non mémorisées (il en reste
+        #    forcément une, sinon une paire serait connue)
+        inconnue = restante & ~vue
+        i1 = _tirer(inconnue, rng.random(b))
+
+        # Deuxième carte : la partenaire (i1 ^ 1) si elle est mémorisée, sinon une autre
+        # carte non mémorisée (il en reste une dès que la partenaire est inconnue)
+        partenaire = i1 ^ 1
+        i2 = _tirer(inconnue & ~_bit(i1, nb_mots), rng.random(b))
+        i2 = np.where(_contient(vue, partenaire), partenaire, i2)
+
+        i1 = np.where(a_paire, i_paire, i1)
+        i2 = np.where(a_paire, i_paire + 1, i2)
+
+        # d) Résolution du tour, pour les parties en cours seulement (une partie finie
+        #    reste dans le lot jusqu'au prochain compactage, sans changer)
+        retournees = np.where(en_cours, _bit(i1, nb_mots) | _bit(i2, nb_mots), np.uint64(0))
+        paire = ((i1 >> 1) == (i2 >> 1)) & en_cours
+        restante &= ~np.where(paire, retournees, np.uint64(0))
+        scores[paire, joueur[paire]] += 1
+        joueur = np.where(paire | ~en_cours, joueur, 1 - joueur)
+        tours += en_cours
+
+        # Les joueurs avec mémoire voient les cartes retournées, puis oublient éventuellement
+        for j, politique in enumerate(politiques):
+            if politique.memoire:
+                memoire[j] |= retournees
+                if politique.oubli > 0:
+                    _oublier(memoire[j], politique.oubli, rng)
+
+        # e) Parties terminées : résultats enregistrés ; trop longues : abandonnées
+        finie = en_cours & ~restante.any(axis=0)
+        if finie.any():
+            res_tours[partie[finie]] = tours[finie]
+            res_scores[partie[finie]] = scores[finie]
+        en_cours &= ~finie & (tours < tours_max)
+
+
+# ---------------------------------------
+# 4) Statistiques
+# ---------------------------------------
+def resumer(resultats):
+    """
+    Distributions de la durée des parties et de l'écart de score,
+    et avantage du premier joueur.
+    """
+    tours, scores = resultats
+    ecart = scores[:, 0] - scores[:, 1]
+    victoires_j1 = np.mean(ecart > 0)
+    victoires_j2 = np.mean(ecart < 0)
+    return {
+        'parties': len(tours),
+        'tours_moyen': float(tours.mean()),
+        'tours_ecart_type': float(tours.std()),
+        'tours_quantiles': {q: float(np.quantile(tours, q)) for q in (0.05, 0.5, 0.95)},
+        'tours_distribution': dict(zip(*(v.tolist() for v in np.unique(tours, return_counts=True)))),
+        'ecart_moyen': float(ecart.mean()),
+        'ecart_distribution': dict(zip(*(v.tolist() for v in np.unique(ecart, return_counts=True)))),
+        'victoires_j1': float(victoires_j1),
+        'victoires_j2': float(victoires_j2),
+        'egalites': float(np.mean(ecart == 0)),
+        'avantage_premier_joueur': float(victoires_j1 - victoires_j2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation Monte Carlo de parties de memory.")
+    parser.add_argument('--parties', type=int, default=100_000)
+    parser.add_argument('--paires', type=int, default=18)
+    parser.add_argument('--politiques', nargs=2, default=['parfaite', 'parfaite'],
+                        metavar=('J1', 'J2'), help="aleatoire, parfaite ou limitee:<taux>")
+    parser.add_argument('--graine', type=int, default=None)
+    args = parser.parse_args()
+
+    cles = [p for p in range(args.paires) for _ in range(2)]
+    politiques = [politique_depuis_nom(nom) for nom in args.politiques]
+
+    debut = time.perf_counter()
+    resultats = simuler(cles, args.parties, politiques, graine=args.graine)
+    duree = time.perf_counter() - debut
+
+    resume = resumer(resultats)
+    print(f"{args.parties} parties de {args.paires} paires en {duree:.2f} s "
+          f"({args.parties / duree:,.0f} parties/s)")
+    print(f"Tours : moyenne {resume['tours_moyen']:.2f}, écart-type {resume['tours_ecart_type']:.2f}, "
+          f"médiane {resume['tours_quantiles'][0.5]:.0f}")
+    print(f"Écart de score moyen (J1 - J2) : {resume['ecart_moyen']:+.3f}")
+    print(f"Victoires J1 {resume['victoires_j1']:.3f}, J2 {resume['victoires_j2']:.3f}, "
+          f"égalités {resume['egalites']:.3f} -> avantage du premier joueur "
+          f"{resume['avantage_premier_joueur']:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Analyse exacte d'une partie entre deux joueurs à mémoire parfaite : nombre
+moyen de tours, écart de score moyen et probabilité de victoire du premier
+joueur, calculés par programmation dynamique (sans simulation).
+
+Les joueurs suivent la stratégie des agents à mémoire parfaite du jeu (AgentMemoire,
+politique PARFAITE de jeu/simulation.py) : jouer une paire connue s'il y en a
+une ; sinon retourner une carte jamais vue, puis sa partenaire si elle est
+connue, et sinon une autre carte jamais vue. Les deux joueurs voient toutes les
+cartes retournées : ils partagent la même information.
+
+État d'un début de tour : u paires dont aucune carte n'a été vue, k paires dont
+une seule carte a été vue (d = 2u + k cartes jamais vues), plus éventuellement
+une paire entièrement connue, ramassée aussitôt. Chaque transition diminue d de
+1 ou 2 : les états sont calculés par couches de même d, chaque couche en une
+opération NumPy sur tous les u, et seules les deux couches précédentes sont
+gardées en mémoire.
+
+Usage : python -m jeu.solveur --paires 12 18 1000
+        python -m jeu.solveur --config config.txt --regle classique
+"""
+import argparse
+import functools
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from jeu.cartes import interner
+from jeu.configuration import lire_config_classique, lire_config_formes, plateau_formes_aleatoire
+from jeu.moteur import cle_classique, cle_formes
+
+REGLES = {'classique': cle_classique, 'formes': cle_formes}
+
+# Au-delà de ce nombre de paires, la distribution exacte des écarts de score
+# (nécessaire aux probabilités de victoire) n'est pas calculée par défaut : son
+# coût croît comme le cube du nombre de paires.
+PAIRES_MAX_DISTRIBUTION = 400
+
+Analyse = namedtuple('Analyse', ['paires', 'tours_moyen', 'ecart_moyen',
+                                 'victoires_j1', 'egalites', 'victoires_j2'])
+Analyse.__doc__ = """
+paires       : nombre de paires du plateau
+tours_moyen  : nombre moyen de tours (deux cartes retournées)
+ecart_moyen  : écart de score moyen (J1 - J2), le joueur 1 commençant
+victoires_j1, egalites, victoires_j2 : probabilités exactes (None si la
+               distribution n'a pas été calculée). En cas d'égalité, le jeu
+               donne la victoire au joueur 1 (Moteur.gagnant).
+"""
+
+
+# ---------------------------------------
+# 1) Programmation dynamique
+# ---------------------------------------
+def _probabilites(d, u, k):
+    """
+    Probabilités des issues d'un tour sans paire connue, pour chaque u de la couche d :
+    (paire avec une carte déjà vue, paire de deux cartes jamais vues,
+    non-paire révélant une paire complète, non-paire de deux nouvelles cartes).
+    """
+    d1 = max(d - 1, 1)
+    nouvelle = 2 * u / d
+    return (k / d,
+            nouvelle / d1,
+            nouvelle * k / d1,
+            nouvelle * (2 * u - 2) / d1)
+
+
+def _decaler(valeurs, pas):
+    """
+    valeurs[u - pas] à la position u (0 avant) : état atteint en découvrant `pas` paires.
+    """
+    resultat = np.zeros_like(valeurs)
+    resultat[pas:] = valeurs[:-pas]
+    return resultat
+
+
+@functools.lru_cache(maxsize=8)
+def esperances(paires_max):
+    """
+    Nombre moyen de tours et écart de score moyen (joueur qui commence - l'autre)
+    pour tous les plateaux de 0 à `paires_max` paires : deux tableaux indexés par
+    le nombre de paires. Coût en O(paires_max²), vectorisé par couches.
+    """
+    n = paires_max
+    u = np.arange(n + 1, dtype=np.float64)
+    tours = np.zeros(n + 1)
+    ecarts = np.zeros(n + 1)
+    # Couches d - 1 et d - 2 : espérances indexées par u
+    t1 = np.zeros(n + 1)
+    e1 = np.zeros(n + 1)
+    t2 = np.zeros(n + 1)
+    e2 = np.zeros(n + 1)
+    for d in range(1, 2 * n + 1):
+        k = d - 2 * u
+        valide = (k >= 0) & (u + k <= n)
+        p_vue, p_paire, p_revelee, p_nouvelles = _probabilites(d, u, np.maximum(k, 0))
+        t_paire, e_paire = _decaler(t2, 1), _decaler(e2, 1)
+        t_nouv, e_nouv = _decaler(t2, 2), _decaler(e2, 2)
+        # Paire : le joueur marque et rejoue ; non-paire : la main passe (écart inversé).
+        # Paire révélée : l'adversaire la ramasse au tour suivant (un tour, un point).
+        t = (1 + p_vue * t1 + p_paire * t_paire
+             + p_revelee * (1 + t_paire) + p_nouvelles * t_nouv)
+        e = (p_vue * (1 + e1) + p_paire * (1 + e_paire)
+             - p_revelee * (1 + e_paire) - p_nouvelles * e_nouv)
+        t = np.where(valide, t, 0.0)
+        e = np.where(valide, e, 0.0)
+        if d % 2 == 0:
+            # Début de partie à d / 2 paires : état u = d / 2, k = 0
+            tours[d // 2], ecarts[d // 2] = t[d // 2], e[d // 2]
+        t1, e1, t2, e2 = t, e, t1, e1
+    return tours, ecarts
+
+
+@functools.lru_cache(maxsize=8)
+def distribution_ecarts(paires):
+    """
+    Distribution exacte de l'écart de score final (J1 - J2) d'une partie à `paires`
+    paires : tableau de 2 * paires + 1 probabilités, l'indice j correspondant à
+    l'écart j - paires. Coût en O(paires³) (une distribution par état), réduit en ne
+    calculant, dans chaque couche, que les u valides et les écarts atteignables.
+    """
+    n = paires
+    # Distributions de l'écart (joueur au trait - l'autre), ligne u + 2 pour l'état u
+    # (deux lignes vides pour u - 1 et u - 2), colonne centre + écart (une colonne
+    # vide de chaque côté pour le décalage d'un point)
+    centre = n + 1
+    forme = (n + 3, 2 * n + 3)
+    f1 = np.zeros(forme)
+    f2 = np.zeros(forme)
+    f1[2, centre] = 1.0  # d = 0 : partie finie, écart nul
+
+    for d in range(1, 2 * n + 1):
+        bas, haut = max(0, d - n), d // 2 + 1  # u valides : bas <= u < haut
+        c = min(d, n)                          # écart atteignable : au plus ±c
+        colonnes = slice(centre - c, centre + c + 1)
+        plus_un = slice(centre - c - 1, centre + c)
+        u = np.arange(bas, haut, dtype=np.float64)
+        p_vue, p_paire, p_revelee, p_nouvelles = (
+            p[:, None] for p in _probabilites(d, u, d - 2 * u))
+
+        paire = f2[bas + 1:haut + 1, plus_un]
+        f = np.zeros(forme)
+        f[bas + 2:haut + 2, colonnes] = (
+            p_vue * f1[bas + 2:haut + 2, plus_un] + p_paire * paire
+            + p_revelee * paire[:, ::-1] + p_nouvelles * f2[bas:haut, colonnes][:, ::-1])
+        f1, f2 = f, f1
+    return f1[n + 2, 1:-1]
+
+
+def analyser(paires, distribution=None):
+    """
+    Analyse exacte d'un plateau de `paires` paires. La distribution des écarts
+    (probabilités de victoire) est calculée si `distribution` est vrai, ou par
+    défaut jusqu'à PAIRES_MAX_DISTRIBUTION paires.
+    """
+    tours, ecarts = esperances(paires)
+    if distribution is None:
+        distribution = paires <= PAIRES_MAX_DISTRIBUTION
+    victoires_j1 = egalites = victoires_j2 = None
+    if distribution:
+        probas = distribution_ecarts(paires)
+        victoires_j1 = float(probas[paires + 1:].sum())
+        egalites = float(probas[paires])
+        victoires_j2 = float(probas[:paires].sum())
+    return Analyse(paires, float(tours[paires]), float(ecarts[paires]),
+                   victoires_j1, egalites, victoires_j2)
+
+
+# ---------------------------------------
+# 2) Plateaux du jeu
+# ---------------------------------------
+def paires_du_plateau(cles):
+    """
+    Nombre de paires d'un plateau décrit par les clés de paire de ses cartes
+    (ex. Moteur.cles, selon la règle du mode). Chaque clé doit apparaître
+    exactement deux fois, comme dans le jeu.
+    """
+    noms, ids = interner(cles)
+    if len(ids) != 2 * len(noms) or np.any(np.bincount(ids) != 2):
+        raise ValueError("Chaque clé de paire doit apparaître exactement deux fois.")
+    return len(noms)
+
+
+def cles_config(fichier, regle):
+    """
+    Clés de paire du plateau lu dans `fichier`, selon la règle du mode.
+    """
+    lire = lire_config_classique if regle == 'classique' else lire_config_formes
+    cle = REGLES[regle]
+    return [cle(data) for data in lire(fichier).values()]
+
+
+def afficher(analyse):
+    print(f"{analyse.paires} paires : {analyse.tours_moyen:.4f} tours en moyenne, "
+          f"écart de score moyen (J1 - J2) {analyse.ecart_moyen:+.4f}")
+    if analyse.victoires_j1 is not None:
+        print(f"    victoires J1 {analyse.victoires_j1:.4f}, égalités {analyse.egalites:.4f}, "
+              f"J2 {analyse.victoires_j2:.4f} -> J1 gagne (égalité comprise) "
+              f"avec une probabilité de {analyse.victoires_j1 + analyse.egalites:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse exacte d'une partie entre joueurs à mémoire parfaite.")
+    parser.add_argument('--paires', type=int, nargs='*', default=None,
+                        help="nombres de paires (par défaut : plateaux classique et formes du jeu)")
+    parser.add_argument('--config', default=None, help="plateau lu dans un fichier (ex. config.txt)")
+    parser.add_argument('--regle', choices=list(REGLES), default='classique')
+    parser.add_argument('--distribution', action=argparse.BooleanOptionalAction, default=None,
+                        help=f"probabilités de victoire (par défaut jusqu'à {PAIRES_MAX_DISTRIBUTION} paires)")
+    args = parser.parse_args()
+
+    if args.paires:
+        plateaux = [(f"{p} paires", p) for p in args.paires]
+    elif args.config:
+        plateaux = [(args.config, paires_du_plateau(cles_config(args.config, args.regle)))]
+    else:
+        formes = plateau_formes_aleatoire()
+        plateaux = [("config.txt (classique)", paires_du_plateau(cles_config("config.txt", 'classique'))),
+                    ("plateau formes", paires_du_plateau(cle_formes(data) for data in formes.values()))]
+
+    for nom, paires in plateaux:
+        debut = time.perf_counter()
+        analyse = analyser(paires, args.distribution)
+        print(f"{nom} ({time.perf_counter() - debut:.2f} s)")
+        afficher(analyse)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Tournoi entre agents (IA contre IA), réparti sur tous les cœurs du processeur.
+
+Chaque partie est jouée par le moteur du jeu (mêmes règles d'appariement et de
+tour que les scripts). Les parties sont regroupées en lots ; chaque lot a son
+propre générateur aléatoire, initialisé à partir de la graine du tournoi et du
+numéro du lot : les résultats ne dépendent ni du nombre de processus ni de
+l'ordre dans lequel les lots se terminent.
+
+Les résultats sont ajoutés au fichier de sortie (une ligne JSON par lot) dès
+qu'un lot est terminé : un tournoi interrompu reprend là où il s'était arrêté.
+
+Usage : python -m jeu.tournoi --agents aleatoire memoire --parties 1000
+        python -m jeu.tournoi --agents aleatoire memoire --config config.txt --regle classique
+"""
+import argparse
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+from jeu.agents import AGENTS
+from jeu.configuration import lire_config_classique, lire_config_formes, plateau_formes_aleatoire
+from jeu.moteur import Moteur, cle_classique, cle_formes, ETAT_ATTENTE_MASQUAGE
+
+REGLES = {'classique': cle_classique, 'formes': cle_formes}
+
+
+# ---------------------------------------
+# 1) Une partie
+# ---------------------------------------
+def jouer_partie(moteur, agents):
+    """
+    Joue une partie complète, agents[0] occupant la place du joueur 1.
+    Renvoie (scores, nombre de tours).
+    """
+    for agent in agents:
+        agent.debut_partie(moteur)
+    tours = 0
+    while not moteur.fini:
+        agent = agents[moteur.joueur - 1]
+        i = agent.choisir()
+        if not moteur.flip(i):
+            raise ValueError(f"L'agent {agent.nom!r} a choisi une carte invalide ({i}).")
+        if len(moteur.selection) == 0 or moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            tours += 1
+        if moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            moteur.masquer()
+    return tuple(moteur.scores), tours
+
+
+@functools.lru_cache(maxsize=None)
+def _cles_config(fichier, regle):
+    """
+    Clés de paire du plateau fixe lu dans `fichier` (lu une seule fois par processus).
+    """
+    lire = lire_config_classique if regle == 'classique' else lire_config_formes
+    cle = REGLES[regle]
+    return tuple(cle(data) for data in lire(fichier).values())
+
+
+def _nouveau_moteur(parametres, rng):
+    if parametres['config']:
+        return Moteur(_cles_config(parametres['config'], parametres['regle']))
+    return Moteur.depuis_formes(plateau_formes_aleatoire(rng), REGLES[parametres['regle']])
+
+
+# ---------------------------------------
+# 2) Lots de parties (exécutés dans les processus)
+# ---------------------------------------
+def calendrier(parametres):
+    """
+    Liste des parties (agent du joueur 1, agent du joueur 2) : toutes les paires
+    d'agents se rencontrent `parties` fois, en alternant qui commence.
+    """
+    rencontres = list(itertools.combinations(parametres['agents'], 2))
+    return [(a, b) if k % 2 == 0 else (b, a)
+            for k in range(parametres['parties']) for a, b in rencontres]
+
+
+def _jouer_lot(tache):
+    parametres, numero, parties = tache
+    rng = random.Random(f"{parametres['graine']}:{numero}")
+    resultats = []
+    for nom1, nom2 in parties:
+        moteur = _nouveau_moteur(parametres, rng)
+        (s1, s2), tours = jouer_partie(moteur, [AGENTS[nom1](rng), AGENTS[nom2](rng)])
+        resultats.append([nom1, nom2, s1, s2, tours])
+    return numero, resultats
+
+
+# ---------------------------------------
+# 3) Classement (fusion incrémentale des résultats)
+# ---------------------------------------
+class Classement:
+    """
+    Bilans cumulés par couple d'agents : victoires de a contre b, et nuls.
+    """
+
+    def __init__(self, agents):
+        self.agents = list(agents)
+        self.rang = {nom: k for k, nom in enumerate(self.agents)}
+        n = len(self.agents)
+        self.victoires = np.zeros((n, n), dtype=np.int64)  # victoires[a, b] : a bat b
+        self.nuls = np.zeros((n, n), dtype=np.int64)       # symétrique
+        self.parties = 0
+
+    def ajouter(self, resultats):
+        for nom1, nom2, s1, s2, _ in resultats:
+            a, b = self.rang[nom1], self.rang[nom2]
+            if s1 > s2:
+                self.victoires[a, b] += 1
+            elif s2 > s1:
+                self.victoires[b, a] += 1
+            else:
+                self.nuls[a, b] += 1
+                self.nuls[b, a] += 1
+            self.parties += 1
+
+    def elo(self, victoires=None, nuls=None, iterations=200):
+        """
+        Classement Elo par maximum de vraisemblance (modèle de Bradley-Terry, un nul
+        compte une demi-victoire), centré sur 0. Chaque couple reçoit un nul fictif
+        pour que le classement reste fini même sans aucune victoire.
+        """
+        victoires = self.victoires if victoires is None else victoires
+        nuls = self.nuls if nuls is None else nuls
+        points = victoires + 0.5 * nuls + 0.5
+        np.fill_diagonal(points, 0)
+        rencontres = points + points.T
+        force = np.ones(len(self.agents))
+        for _ in range(iterations):
+            force = points.sum(axis=1) / (rencontres / (force[:, None] + force[None, :])).sum(axis=1)
+            force /= np.exp(np.log(force).mean())
+        return 400 * np.log10(force)
+
+    def intervalles(self, niveau=0.95, tirages=200, graine=0):
+        """
+        Intervalles de confiance des classements Elo, par rééchantillonnage des
+        bilans de chaque couple (bootstrap paramétrique).
+        """
+        rng = np.random.default_rng(graine)
+        n = len(self.agents)
+        echantillons = np.empty((tirages, n))
+        for t in range(tirages):
+            victoires = np.zeros((n, n), dtype=np.int64)
+            nuls = np.zeros((n, n), dtype=np.int64)
+            for a, b in itertools.combinations(range(n), 2):
+                total = self.victoires[a, b] + self.victoires[b, a] + self.nuls[a, b]
+                if total == 0:
+                    continue
+                probas = np.array([self.victoires[a, b], self.victoires[b, a], self.nuls[a, b]]) / total
+                victoires[a, b], victoires[b, a], nuls[a, b] = rng.multinomial(total, probas)
+                nuls[b, a] = nuls[a, b]
+            echantillons[t] = self.elo(victoires, nuls)
+        alpha = (1 - niveau) / 2
+        return np.quantile(echantillons, [alpha, 1 - alpha], axis=0).T
+
+    def afficher(self):
+        elo = self.elo()
+        bornes = self.intervalles()
+        print(f"\n{'Agent':<12} {'Elo':>7}   {'IC 95 %':<17} {'V':>7} {'N':>7} {'D':>7}")
+        for k in np.argsort(-elo):
+            v = self.victoires[k].sum()
+            d = self.victoires[:, k].sum()
+            nuls = self.nuls[k].sum()
+            print(f"{self.agents[k]:<12} {elo[k]:>+7.1f}   [{bornes[k, 0]:+7.1f}, {bornes[k, 1]:+7.1f}] "
+                  f"{v:>7} {nuls:>7} {d:>7}")
+
+
+# ---------------------------------------
+# 4) Fichier de résultats (reprise après interruption)
+# ---------------------------------------
+def lire_resultats(chemin, parametres):
+    """
+    Lots déjà terminés dans `chemin` : { numéro : résultats }, ou None s'il n'y a
+    rien à reprendre. Une dernière ligne incomplète (interruption pendant
+    l'écriture) est ignorée ; si c'est l'en-tête, le tournoi repart de zéro.
+    """
+    if not os.path.exists(chemin):
+        return None
+    lots = {}
+    with open(chemin) as f:
+        lignes = f.read().splitlines()
+    if not lignes:
+        return None
+    try:
+        entete = json.loads(lignes[0])
+    except json.JSONDecodeError:
+        return None
+    if entete != parametres:
+        raise SystemExit(f"{chemin} contient un autre tournoi : changez --sortie ou supprimez le fichier.")
+    for ligne in lignes[1:]:
+        try:
+            lot = json.loads(ligne)
+        except json.JSONDecodeError:
+            break
+        lots[lot['lot']] = lot['parties']
+    return lots
+
+
+def tournoi(parametres, sortie, processus=None):
+    """
+    Joue (ou termine) le tournoi décrit par `parametres` et renvoie le Classement.
+    """
+    parties = calendrier(parametres)
+    taille = parametres['taille_lot']
+    lots = [parties[k:k + taille] for k in range(0, len(parties), taille)]
+
+    classement = Classement(parametres['agents'])
+    faits = lire_resultats(sortie, parametres)
+    if faits is None:
+        with open(sortie, 'w') as f:
+            f.write(json.dumps(parametres) + "\n")
+        faits = {}
+    else:
+        # Réécriture sans l'éventuelle ligne incomplète
+        with open(sortie, 'w') as f:
+            f.write(json.dumps(parametres) + "\n")
+            for numero, resultats in faits.items():
+                f.write(json.dumps({'lot': numero, 'parties': resultats}) + "\n")
+        print(f"Reprise : {len(faits)}/{len(lots)} lots déjà joués.")
+    for resultats in faits.values():
+        classement.ajouter(resultats)
+
+    taches = [(parametres, k, lot) for k, lot in enumerate(lots) if k not in faits]
+    with open(sortie, 'a') as f, multiprocessing.Pool(processus) as pool:
+        for numero, resultats in pool.imap_unordered(_jouer_lot, taches):
+            f.write(json.dumps({'lot': numero, 'parties': resultats}) + "\n")
+            f.flush()
+            classement.ajouter(resultats)
+            print(f"\r{classement.parties}/{len(parties)} parties", end="", flush=True)
+    print()
+    return classement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tournoi entre agents du jeu du memory.")
+    parser.add_argument('--agents', nargs='+', default=list(AGENTS), choices=list(AGENTS))
+    parser.add_argument('--parties', type=int, default=100, help="parties par couple d'agents")
+    parser.add_argument('--config', default=None,
+                        help="plateau fixe (ex. config.txt) ; par défaut, un plateau formes tiré à chaque partie")
+    parser.add_argument('--regle', choices=list(REGLES), default=None,
+                        help="règle d'appariement (par défaut : classique avec --config, formes sinon)")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--processus', type=int, default=None, help="par défaut : nombre de cœurs")
+    parser.add_argument('--taille-lot', type=int, default=50, help="parties par lot (unité de reprise)")
+    parser.add_argument('--sortie', default='tournoi.jsonl')
+    args = parser.parse_args()
+
+    if len(set(args.agents)) < 2:
+        parser.error("il faut au moins deux agents différents")
+    parametres = {
+        'agents': list(dict.fromkeys(args.agents)),
+        'parties': args.parties,
+        'config': args.config,
+        'regle': args.regle or ('classique' if args.config else 'formes'),
+        'graine': args.graine,
+        'taille_lot': args.taille_lot,
+    }
+    classement = tournoi(parametres, args.sortie, args.processus)
+    classement.afficher()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Export d'une partie en vidéo (MP4) ou en GIF animé : une partie du journal
+(jeu/journal.py), ou la partie qui vient d'être jouée (option --video FICHIER
+des scripts, ou JEU_VIDEO=FICHIER ; la vidéo est écrite à la fermeture de la fenêtre).
+
+Les images sont dessinées par le script du mode (setup_board, reveal_card,
+hide_card : même rendu que dans la fenêtre), hors écran sur le backend Agg : une
+image au début, puis une après chaque carte retournée et chaque non-paire masquée.
+Elles sont envoyées une à une à ffmpeg (imageio-ffmpeg), qui encode au fil de
+l'eau : aucune liste d'images n'est constituée, la mémoire utilisée ne dépend pas
+de la longueur de la partie.
+
+L'état du plateau à chaque image se déduit des cartes jouées : les images sont
+indépendantes. Elles sont rendues par tranches dans un pool de processus, chaque
+processus gardant sa figure d'une tranche à la suivante et n'avançant le moteur
+que de l'écart entre ses tranches ; au plus quelques tranches attendent d'être
+écrites, dans l'ordre.
+
+Usage : python -m jeu.video --partie 3 --sortie partie3.mp4
+        python -m jeu.video parties.journal --partie -1 --sortie derniere.gif --ips 6
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from jeu.cartes import Cartes
+from jeu.journal import JOURNAL_DEFAUT, Partie, cles_paires, formes_de_partie, lire_journal
+from jeu.moteur import Moteur, REVELEE, MASQUEES, ETAT_ATTENTE_MASQUAGE
+
+# Taille des images en pixels (multiples de 16 : pas de redimensionnement par ffmpeg)
+TAILLE = (960, 720)
+DPI = 100
+
+# Images par seconde (une image par carte retournée ou non-paire masquée),
+# et durée pendant laquelle la dernière image reste affichée
+IPS = 4
+PAUSE_FIN = 2.0
+
+# Images rendues d'un bloc par un processus ; tranches en attente par processus
+TRANCHE = 8
+TRANCHES_PAR_PROCESSUS = 2
+
+# Étape « masquer la non-paire » (les autres étapes sont des indices de cartes)
+MASQUER = -1
+
+# GIF : une palette par image, calculée par ffmpeg image par image (en flux ;
+# une palette commune à toute la partie demanderait de garder toutes les images)
+_FILTRE_GIF = ("split[a][b];[a]palettegen=stats_mode=single:max_colors=64[p];"
+               "[b][p]paletteuse=new=1:dither=none")
+
+
+def options(arguments=None):
+    """
+    Fichier de la vidéo de la partie : option --video FICHIER, ou variable
+    d'environnement JEU_VIDEO. None si aucune vidéo n'est demandée.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--video', default=None)
+    args, _ = parser.parse_known_args(arguments)
+    return args.video or os.environ.get('JEU_VIDEO') or None
+
+
+# ---------------------------------------
+# 1) Étapes de la partie
+# ---------------------------------------
+def etapes(partie):
+    """
+    Étapes affichées de la partie, rejouée avec le moteur : indice de la carte
+    retournée, ou MASQUER ; et leurs instants. Une carte jouée sans effet (déjà
+    face visible) ne donne pas d'image.
+    """
+    moteur = Moteur(cles_paires(partie))
+    liste, instants = [], []
+    for indice, instant in zip(partie.indices, partie.instants):
+        if moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            moteur.masquer()
+            liste.append(MASQUER)
+            instants.append(instant)
+        if moteur.flip(int(indice)):
+            liste.append(int(indice))
+            instants.append(instant)
+    return np.array(liste, dtype=np.int64), np.array(instants, dtype=np.float64)
+
+
+# ---------------------------------------
+# 2) Rendu hors écran (dans chaque processus)
+# ---------------------------------------
+class RenduImages:
+    """
+    Plateau d'une partie dessiné hors écran par le script de son mode. L'image k
+    montre le plateau après les k premières étapes.
+    """
+
+    def __init__(self, partie, liste, instants, taille=TAILLE, dpi=DPI):
+        self.liste = liste
+        self.instants = instants
+        self.cles = cles_paires(partie)
+        self.script = _charger_script(partie.mode)
+
+        fig = Figure(figsize=(taille[0] / dpi, taille[1] / dpi), dpi=dpi)
+        FigureCanvasAgg(fig)
+        game_state = self.script.init_game_state()
+        game_state['formes'] = formes_de_partie(partie)
+        game_state['fig'] = fig
+        game_state['ax'] = fig.add_subplot()
+        game_state['namep1'] = partie.noms[0] or "Joueur1"
+        game_state['namep2'] = partie.noms[1] or "Joueur2"
+        game_state['start_time'] = time.time()
+        # Messages du script (chargement des images...) : pas dans la sortie de l'export
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.script.setup_board(game_state)
+        self.game_state = game_state
+        self.dessinee = False
+
+        # Moteur sans abonné : l'affichage est mis à jour ici, étape par étape
+        self._recommencer()
+
+    def _recommencer(self):
+        self.moteur = Moteur(self.cles)
+        self.game_state['moteur'] = self.moteur
+        self.position = 0
+
+    def _avancer(self, afficher):
+        etape = int(self.liste[self.position])
+        self.position += 1
+        if etape == MASQUER:
+            evenements = self.moteur.masquer()
+        else:
+            evenements = self.moteur.flip(etape)
+        if not afficher:
+            return
+        cards = self.game_state['cards']
+        modifiees = []
+        for ev in evenements:
+            if ev.type == REVELEE:
+                self.script.reveal_card(cards[ev.cartes[0]])
+                modifiees.append(cards[ev.cartes[0]])
+            elif ev.type == MASQUEES:
+                for i in ev.cartes:
+                    self.script.hide_card(cards[i])
+                    modifiees.append(cards[i])
+        self.script.refresh_display(self.game_state, modifiees)
+
+    def _image(self):
+        game_state = self.game_state
+        k = self.position
+        instant = self.instants[k - 1] if k else 0.0
+        game_state['start_time'] = time.time() - instant
+        self.script.update_score_and_timer(game_state)
+        # Tampon RGBA contigu recopié tel quel (ffmpeg convertit les pixels)
+        return np.array(game_state['fig'].canvas.buffer_rgba())
+
+    def images(self, debut, fin):
+        """
+        Images debut..fin-1, une à une. Le moteur repart du début si la tranche
+        précède la position courante, puis avance sans dessiner jusqu'à `debut`.
+        """
+        if debut < self.position:
+            self._recommencer()
+        while self.position < debut:
+            self._avancer(afficher=False)
+
+        # Plateau mis à l'état du moteur : rendu complet la première fois, ensuite
+        # seules les cartes qui diffèrent de la tranche précédente sont redessinées
+        cards = self.game_state['cards']
+        cible = np.frombuffer(self.moteur.revelee, dtype=np.uint8).astype(bool)
+        modifiees = [cards[i] for i in np.flatnonzero(cards.revelee != cible).tolist()]
+        for card in modifiees:
+            if cible[card.indice]:
+                self.script.reveal_card(card)
+            else:
+                self.script.hide_card(card)
+        if self.dessinee:
+            self.script.refresh_display(self.game_state, modifiees)
+        else:
+            self.game_state['fig'].canvas.draw()
+            self.dessinee = True
+        yield self._image()
+
+        # Images suivantes : seules les cartes modifiées sont redessinées (blit)
+        while self.position < fin - 1:
+            self._avancer(afficher=True)
+            yield self._image()
+
+
+def _charger_script(mode):
+    # Scripts chargés par main.py (comme jeu.journal.afficher)
+    racine = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if racine not in sys.path:
+        sys.path.insert(0, racine)
+    import main as lanceur
+    with contextlib.redirect_stdout(io.StringIO()):
+        return lanceur.charger_mode(mode)
+
+
+_rendu = None  # RenduImages du processus
+
+
+def _initialiser(partie, liste, instants, taille, dpi):
+    global _rendu
+    _rendu = RenduImages(partie, liste, instants, taille, dpi)
+
+
+def _rendre_tranche(debut, fin):
+    return list(_rendu.images(debut, fin))
+
+
+# ---------------------------------------
+# 3) Export
+# ---------------------------------------
+def _images(partie, liste, instants, taille, dpi, processus):
+    """
+    Images de la partie, dans l'ordre, rendues par tranches dans `processus`
+    processus (dans ce processus si 1), au plus TRANCHES_PAR_PROCESSUS tranches
+    en attente par processus.
+    """
+    nombre = len(liste) + 1
+    tranches = [(a, min(a + TRANCHE, nombre)) for a in range(0, nombre, TRANCHE)]
+    if processus <= 1 or len(tranches) == 1:
+        rendu = RenduImages(partie, liste, instants, taille, dpi)
+        for debut, fin in tranches:
+            yield from rendu.images(debut, fin)
+        return
+
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser,
+                             initargs=(partie, liste, instants, taille, dpi)) as pool:
+        en_attente = deque()
+        suivantes = iter(tranches)
+        for debut, fin in suivantes:
+            en_attente.append(pool.submit(_rendre_tranche, debut, fin))
+            if len(en_attente) >= processus * TRANCHES_PAR_PROCESSUS:
+                break
+        while en_attente:
+            images = en_attente.popleft().result()
+            tranche = next(suivantes, None)
+            if tranche is not None:
+                en_attente.append(pool.submit(_rendre_tranche, *tranche))
+            yield from images
+
+
+def _ecrivain(chemin, taille, ips):
+    """
+    Encodeur ffmpeg en flux (générateur d'imageio-ffmpeg, prêt à recevoir les images).
+    """
+    # Importé ici : le jeu se lance sans imageio-ffmpeg tant qu'aucune vidéo n'est demandée
+    import imageio_ffmpeg
+
+    if chemin.lower().endswith(".gif"):
+        options = dict(codec='gif', pix_fmt_out='pal8', output_params=['-vf', _FILTRE_GIF])
+    else:
+        options = dict(codec='libx264', pix_fmt_out='yuv420p',
+                       output_params=['-preset', 'veryfast', '-tune', 'animation'])
+    ecrivain = imageio_ffmpeg.write_frames(chemin, taille, fps=ips, pix_fmt_in='rgba',
+                                           macro_block_size=1, ffmpeg_log_level='error',
+                                           **options)
+    ecrivain.send(None)
+    return ecrivain
+
+
+def exporter(partie, chemin, ips=IPS, taille=TAILLE, dpi=DPI, processus=None):
+    """
+    Écrit la vidéo de `partie` dans `chemin` (GIF animé si l'extension est .gif,
+    MP4 sinon). Renvoie le nombre d'images écrites.
+    """
+    if processus is None:
+        # Un cœur reste à ffmpeg (et à ce processus, qui lui transmet les images)
+        processus = max(1, (os.cpu_count() or 1) - 1)
+    liste, instants = etapes(partie)
+    ecrivain = _ecrivain(chemin, taille, ips)
+    nombre = 0
+    try:
+        derniere = None
+        for derniere in _images(partie, liste, instants, taille, dpi, processus):
+            ecrivain.send(derniere)
+            nombre += 1
+        for _ in range(int(PAUSE_FIN * ips)):
+            ecrivain.send(derniere)
+            nombre += 1
+    finally:
+        ecrivain.close()
+    return nombre
+
+
+class Capture:
+    """
+    Cartes jouées pendant la partie en cours (comme journal.Enregistreur), pour
+    en exporter la vidéo une fois la fenêtre fermée.
+    """
+
+    def __init__(self, chemin, mode, cartes, noms=("", "")):
+        self.chemin = chemin
+        self.mode = mode
+        # Plateau sans son affichage (les processus de rendu le redessinent)
+        self.cartes = Cartes.depuis_colonnes(
+            cartes.ids, cartes.x, cartes.y, cartes.largeur, cartes.hauteur,
+            cartes.noms_couleurs, cartes.couleur, cartes.noms_formes, cartes.forme)
+        self.noms = tuple(noms)
+        self.indices = []
+        self.instants = []
+        self.debut = time.perf_counter()
+
+    def carte(self, indice):
+        """
+        Note la carte d'indice `indice`, jouée maintenant.
+        """
+        self.indices.append(indice)
+        self.instants.append(time.perf_counter() - self.debut)
+
+    def partie(self):
+        return Partie(self.mode, self.noms, {}, time.strftime("%Y-%m-%d %H:%M:%S"),
+                      self.cartes, np.array(self.indices, dtype=np.uint32),
+                      np.array(self.instants, dtype=np.float32), None, None)
+
+    def exporter(self, **options):
+        """
+        Écrit la vidéo de la partie (rien si aucune carte n'a été jouée) ;
+        renvoie le nombre d'images écrites.
+        """
+        if not self.indices:
+            return 0
+        return exporter(self.partie(), self.chemin, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export d'une partie du journal en vidéo (MP4 ou GIF).")
+    parser.add_argument('fichier', nargs='?', default=JOURNAL_DEFAUT)
+    parser.add_argument('--partie', type=int, default=-1, metavar='NUMERO',
+                        help="numéro de la partie (à partir de 1 ; négatif : depuis la fin)")
+    parser.add_argument('--sortie', required=True, help="fichier .mp4 ou .gif")
+    parser.add_argument('--ips', type=float, default=IPS, help="images (coups) par seconde")
+    parser.add_argument('--taille', type=int, nargs=2, default=TAILLE, metavar=('LARGEUR', 'HAUTEUR'))
+    parser.add_argument('--processus', type=int, default=None,
+                        help="processus de rendu (par défaut : un par cœur, moins un)")
+    args = parser.parse_args()
+
+    # Une seule partie gardée en mémoire pendant la lecture du journal
+    nombre, partie = 0, None
+    gardees = deque(maxlen=-args.partie if args.partie < 0 else None)
+    for nombre, p in enumerate(lire_journal(args.fichier), 1):
+        if args.partie < 0:
+            gardees.append(p)
+        elif nombre == args.partie:
+            partie = p
+            break
+    if args.partie < 0 and len(gardees) == -args.partie:
+        partie = gardees[0]
+    if partie is None:
+        parser.error(f"partie {args.partie} absente du journal ({nombre} parties)")
+
+    debut = time.perf_counter()
+    images = exporter(partie, args.sortie, args.ips, tuple(args.taille), processus=args.processus)
+    duree = time.perf_counter() - debut
+    print(f"{args.sortie} : {images} images ({len(partie.indices)} cartes jouées) "
+          f"en {duree:.2f} s ({images / duree:,.0f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
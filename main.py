@@ -1,34 +1,144 @@
+import importlib.util
 import os
-import sys
+import threading
+import time
 
-def choisir_et_executer_script():
-    fichiers = sorted(f for f in os.listdir()
-                      if f.endswith('.py') and f != 'main.py')
-    if not fichiers:
-        return print("\033[91m\nAucun script disponible.\033[0m")
+RACINE = os.path.dirname(os.path.abspath(__file__))
+
+# Modes de jeu : nom -> (script, description). Chaque script expose
+# main(noms, debut, ia, reprendre=...) ;
+# il n'est importé (et Matplotlib avec lui) que lorsque son mode est choisi, puis
+# gardé en mémoire : une nouvelle partie ne repaie pas le coût des imports.
+MODES = {
+    'classique': ("script classique.py",
+                  "Le jeu avec les cartes rectangulaires comme initialement demandé."),
+    'formes': ("script formes.py",
+               "Une version du jeu avec des formes de cartes variées."),
+}
+
+_modules = {}
+_verrou = threading.Lock()
+
+
+def charger_mode(nom):
+    """
+    Module du script du mode `nom`, importé une seule fois par processus.
+    """
+    with _verrou:
+        if nom not in _modules:
+            spec = importlib.util.spec_from_file_location(
+                f"mode_{nom}", os.path.join(RACINE, MODES[nom][0]))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[nom] = module
+        return _modules[nom]
 
-    print("\n\033[90m===== Scripts Disponibles =====\033[0m")
-    for i, f in enumerate(fichiers, 1):
-        print(f"\033[94m{i}.\033[0m \033[31;5;150m{f}\033[0m")
-    print("\033[90m===============================\033[0m")
-    print("\n\033[90m============ Infos ============\033[0m")
-    print("\033[90mLe script 'classique' contient le jeu avec les cartes rectangulaires comme initialement demandé. \nLe script 'formes' contient une version du jeu avec des formes de cartes variées. \033[0m")
 
+def precharger_mode(nom):
+    """
+    Importe le mode en arrière-plan (pendant la saisie des noms des joueurs).
+    Une erreur d'import sera signalée par charger_mode, au lancement de la partie.
+    """
+    def importer():
+        try:
+            charger_mode(nom)
+        except Exception:
+            pass
+    fil = threading.Thread(target=importer, daemon=True)
+    fil.start()
+    return fil
+
+
+def choisir_mode():
+    noms = list(MODES)
+    print("\n\033[90m======= Modes de jeu ==========\033[0m")
+    for i, nom in enumerate(noms, 1):
+        print(f"\033[94m{i}.\033[0m \033[31;5;150m{nom}\033[0m \033[90m: {MODES[nom][1]}\033[0m")
+    print("\033[90m===============================\033[0m")
 
     try:
-        choix = int(
-            input("\n\033[94mEntrez le numéro du script à exécuter : \033[0m")
-        ) - 1
-        if choix < 0 or choix >= len(fichiers):
+        choix = int(input("\n\033[94mEntrez le numéro du mode de jeu : \033[0m")) - 1
+        if choix < 0 or choix >= len(noms):
             raise ValueError
-        print(f"\n\033[95mExécution de {fichiers[choix]}...\033[0m\n")
-
-        # Utilisez "python" ou "python3" selon la plateforme
-        commande_python = "python3" if sys.platform != "win32" else "python"
-        os.system(f'{commande_python} "{fichiers[choix]}"')
-    except (ValueError, IndexError):
+    except ValueError:
         print("\033[91m\nEntrée invalide. Veuillez réessayer.\033[0m")
+        return None
+    return noms[choix]
+
+
+def demander_joueurs():
+    """
+    Noms des deux joueurs, et places tenues par l'ordinateur : un joueur nommé
+    « ia » ou « ia:niveau » (facile, moyen, difficile, memoire...) est un agent.
+    Renvoie (noms, {joueur: nom de l'agent}).
+    """
+    # Importé ici : le module des agents n'importe ni NumPy ni Matplotlib
+    from jeu.agents import AGENTS, NIVEAU_DEFAUT
+
+    print("\033[90m(« ia » ou « ia:niveau » pour jouer contre l'ordinateur ; "
+          f"niveaux : {', '.join(AGENTS)})\033[0m")
+    noms, ia = [], {}
+    for joueur in (1, 2):
+        nom = input(f"Nom du joueur {joueur} : ").strip()
+        prefixe, _, niveau = nom.partition(":")
+        if prefixe.lower() == "ia":
+            niveau = niveau.strip().lower() or NIVEAU_DEFAUT
+            if niveau not in AGENTS:
+                print(f"\033[91mNiveau inconnu, niveau {NIVEAU_DEFAUT} choisi.\033[0m")
+                niveau = NIVEAU_DEFAUT
+            ia[joueur] = niveau
+        noms.append(nom or f"Joueur{joueur}")
+    return tuple(noms), ia
+
+
+def proposer_reprise(mode):
+    """
+    Si une partie non finie du mode est sauvegardée (jeu/sauvegarde.py), propose de
+    la reprendre. Renvoie True (reprendre), False (nouvelle partie, qui remplace la
+    sauvegarde) ou None (aucune partie du mode à reprendre : le script demandera
+    s'il trouve la sauvegarde d'un autre mode dans le même fichier).
+    """
+    # Importé ici, comme les agents (NumPy est déjà en cours d'import par precharger_mode)
+    from jeu import sauvegarde
+
+    chemin, _ = sauvegarde.options(mode)
+    instantane = sauvegarde.en_cours(chemin)
+    if instantane is None or instantane.mode != mode:
+        return None
+    print(f"\n\033[90mPartie non finie : {sauvegarde.decrire(instantane)}\033[0m")
+    reponse = input("\033[94mLa [r]eprendre, ou [n]ouvelle partie (la sauvegarde sera "
+                    "remplacée) : \033[0m").strip().lower()
+    return not reponse.startswith("n")
+
+
+def main():
+    mode = choisir_mode()
+    if mode is None:
+        return
+    fil = precharger_mode(mode)
+    joueurs = None
+
+    while True:
+        reprendre = proposer_reprise(mode)
+        if not reprendre and joueurs is None:
+            joueurs = demander_joueurs()
+        noms, ia = joueurs if not reprendre else (None, None)
+
+        # Délai mesuré du lancement de la partie à son premier affichage
+        debut = time.perf_counter()
+        print(f"\n\033[95mLancement du mode {mode}...\033[0m\n")
+        fil.join()
+        charger_mode(mode).main(noms, debut, ia, reprendre=reprendre)
+
+        reponse = input("\n\033[94mRejouer ? [o]ui / [c]hanger de mode / [n]on : \033[0m").strip().lower()
+        if reponse.startswith("c"):
+            mode = choisir_mode()
+            if mode is None:
+                return
+            fil = precharger_mode(mode)
+        elif not reponse.startswith("o"):
+            return
 
 
 if __name__ == "__main__":
-    choisir_et_executer_script()
\ No newline at end of file
+    main()
@@ -1,124 +1,106 @@
 import os
 import time
 import matplotlib.pyplot as plt
-from matplotlib import animation
-import imageio
 import random
+from collections import deque
+
+from jeu.agents import AGENTS, adversaires_demandes
+from jeu.index_spatial import construire_index
+from jeu import instrumentation, journal, sauvegarde, video
+from jeu.hud import CoucheHud
+from jeu.rendu_blit import RenduBlit
+from jeu.rendu_collection import PlateauCollection
+from jeu.rendu_fenetre import PlateauFenetre, activer_zoom
+from jeu.cartes import Cartes
+from jeu.conseils import Analyste, conseils_demandes, decrire
+from jeu.configuration import lire_config_classique as lire_fichier_config
+from jeu.fichier_geometrie import ecrire_geometries
+from jeu.images_gif import ImagesGif, animer, taille_pixels
+from jeu.moteur import (Moteur, cle_classique, REVELEE, PAIRE, NON_PAIRE,
+                        MASQUEES, JOUEUR_SUIVANT, FIN, ETAT_ATTENTE_MASQUAGE)
 
 plt.close('all')
 
-# ---------------------------------------
-# Gif
-# ---------------------------------------
+# Au-delà de ce nombre de cartes, le plateau est dessiné avec des collections
+# (quelques artistes au total) plutôt qu'avec deux artistes par carte.
+SEUIL_COLLECTION = 500
 
-def display_gif(ax, filepath):
-    frames = imageio.mimread(filepath)
-    if not frames:
-        print(f"Impossible de lire le GIF à partir de {filepath}")
-        return None
+# Au-delà de ce nombre de cartes, seules les cartes dans la vue sont dessinées
+# (zoom à la molette, déplacement avec l'outil « pan »), en image si la vue est éloignée
+SEUIL_FENETRE = 20_000
 
-    ax.axis('off')
-    # Afficher la première image du GIF
-    im = ax.imshow(frames[0], zorder=0)
+# Durée d'affichage de deux cartes qui ne correspondent pas
+DELAI_MASQUAGE_MS = 1500
 
-    def update(frame):
-        im.set_data(frame)
-        return [im]
+# Délai avant chaque carte retournée par un joueur automatique (IA)
+DELAI_IA_MS = 700
 
-    # IMPORTANT : blit=False pour que tout (texte, etc.) soit rafraîchi correctement
-    ani = animation.FuncAnimation(ax.figure, update, frames=frames, interval=80, blit=False)
-    return ani
+# Géométries (couleur + sommets) de toutes les cartes du plateau
+FICHIER_GEOMETRIES = os.path.join("figures", "geometries_classique.bin")
 
+# GIF de fin de partie et position de son axes dans la figure
+GIF_PATH = "gif/i-win-you-lose.gif"
+GIF_RECT = [0.25, 0.1, 0.5, 0.5]
 
+# Le décodage du GIF commence en arrière-plan quand il reste ce nombre de paires
+PAIRES_AVANT_GIF = 2
 
 # ---------------------------------------
-# 1) Lecture du fichier de configuration et stockage des informations des cartes 
+# Gif
 # ---------------------------------------
-def lire_fichier_config(fichier):
+
+def prepare_gif(game_state, prefetch=True):
     """
-    Lit le fichier de configuration, randomise les positions des formes,
-    et retourne un dictionnaire { 'indice': [(x,y), largeur, hauteur, couleur], ... }.
+    Prépare (une seule fois) la lecture paresseuse du GIF de fin, réduit à la
+    taille de son axes ; avec prefetch, les premières images sont décodées en
+    arrière-plan. Renvoie None si le fichier est absent.
     """
-    shapes = []
-    coordinates = []
-    
-    # Lecture du fichier et stockage des informations
-    with open(fichier, 'r') as f:
-        for ligne in f:
-            elements = ligne.strip().split(';')
-            if len(elements) < 5:
-                continue
-            indice = elements[0]
-            point_depart = eval(elements[1])  # Conversion de "[x,y]" en tuple
-            largeur = int(elements[2])
-            hauteur = int(elements[3])
-            couleur = elements[4]
-            
-            # Stocker les infos de la forme sans coordonnée, et collecter la coordonnée séparément
-            shapes.append((indice, largeur, hauteur, couleur))
-            coordinates.append(point_depart)
-    
-    # Mélanger aléatoirement les coordonnées
-    #random.shuffle(coordinates)
-    
-    # Réattribuer les coordonnées mélangées aux formes
-    dictionnaire_formes = {}
-    for shape, new_coord in zip(shapes, coordinates):
-        indice, largeur, hauteur, couleur = shape
-        dictionnaire_formes[indice] = [new_coord, largeur, hauteur, couleur]
-    
-    return dictionnaire_formes
+    if game_state['gif'] is None and os.path.exists(GIF_PATH):
+        taille = taille_pixels(game_state['fig'], GIF_RECT)
+        game_state['gif'] = ImagesGif(GIF_PATH, taille=taille)
+    if prefetch and game_state['gif'] is not None:
+        game_state['gif'].prechauffer()
+    return game_state['gif']
 
 
-# ---------------------------------------
-# 2) Calcul des coordonnées d'une forme
-# ---------------------------------------
-def compute_shape_coords(data):
+def display_gif(ax, images):
     """
-    À partir des informations d'une forme, calcule les coordonnées des sommets du rectangle.
+    Anime le GIF (ImagesGif) dans l'axes `ax` ; les images sont décodées au fil de l'animation.
     """
-    (x, y), largeur, hauteur, couleur = data
-    coords = [(x, y), (x + largeur, y), (x + largeur, y + hauteur), (x, y + hauteur)]
-    return coords
+    ani = animer(ax, images, intervalle=80)
+    if ani is None:
+        print(f"Impossible de lire le GIF à partir de {images.chemin}")
+    return ani
+
 
 
 # ---------------------------------------
-# 3) Création des fichiers CSV pour chaque forme et mise à jour du dictionnaire
+# 1) Lecture du fichier de configuration et stockage des informations des cartes 
+# ---------------------------------------
+# (lecture déplacée dans jeu/configuration.py, importée ci-dessus sous le nom lire_fichier_config)
+
+
+# ---------------------------------------
+# 2) Géométries de toutes les cartes dans un seul fichier
 # ---------------------------------------
 def create_shape_files(formes):
     """
-    Parcourt le dictionnaire des formes, crée un fichier CSV pour chaque forme
-    dans le dossier 'figures' au format spécifié, et remplace la valeur 
-    associée à chaque clé par le chemin du fichier créé.
-    Affiche le dictionnaire avant et après la création des fichiers.
+    Écrit en une fois la couleur et les sommets de toutes les cartes dans un seul
+    fichier (FICHIER_GEOMETRIES), indexé par identifiant de carte : voir
+    jeu/fichier_geometrie.py. Rien n'est écrit si les géométries n'ont pas changé
+    depuis le lancement précédent.
     """
-    #print("Dictionnaire avant création des fichiers :")
-    #print(formes)
-
-    dossier = "figures"
-    os.makedirs(dossier, exist_ok=True)
-
-    for key in list(formes.keys()):
-        data = formes[key]
-        coords = compute_shape_coords(data)
-        couleur = data[3]
-        filename = os.path.join(dossier, f"rectangle_{key}.csv")
-        with open(filename, 'w') as f:
-            f.write(f"{couleur};\n")
-            for pt in coords:
-                f.write(f"{pt};\n")
-        formes[key] = filename
-
-    #print("\nDictionnaire après création des fichiers :")
-    #print(formes)
+    os.makedirs(os.path.dirname(FICHIER_GEOMETRIES), exist_ok=True)
+    return ecrire_geometries(FICHIER_GEOMETRIES, Cartes.depuis_formes(formes))
 
 
 # ---------------------------------------
-# 4) Fonction pour tracer et remplir un rectangle
+# 3) Fonction pour tracer et remplir un rectangle
 # ---------------------------------------
 def tracer_rectangle(ax, x, y, largeur, hauteur, facecolor='black', edgecolor='white', linewidth=1):
     """
     Trace le contour d'un rectangle sur l'axes `ax` et remplit son intérieur.
+    Renvoie le polygone rempli et la ligne de contour.
     """
     # Calcul des limites
     x_min, x_max = x, x + largeur
@@ -129,16 +111,16 @@ def tracer_rectangle(ax, x, y, largeur, hauteur, facecolor='black', edgecolor='w
     y_coords = [y_min, y_min, y_max, y_max, y_min]
 
     # Tracer le contour
-    ax.plot(x_coords, y_coords, color=edgecolor, linewidth=linewidth)
+    contour = ax.plot(x_coords, y_coords, color=edgecolor, linewidth=linewidth)[0]
 
     # Remplir l'intérieur
     poly = ax.fill(x_coords, y_coords, facecolor=facecolor, edgecolor=edgecolor, linewidth=linewidth)[0]
 
-    return poly
+    return poly, contour
 
 
 # ---------------------------------------
-# 5) Gestion du jeu
+# 4) Gestion du jeu
 # ---------------------------------------
 def init_game_state():
     """
@@ -146,19 +128,40 @@ def init_game_state():
     """
     return {
         'formes': None,
-        'cards': [],
+        'cards': None,  # Cartes : colonnes x, y, largeur, hauteur, couleur, révélée...
+        'index': None,  # index spatial des cartes (clic -> carte)
         'fig': None,
         'ax': None,
-        'clicked_cards': [],
-        'pairs_found': 0,
-        'total_pairs': 0,
-        'player1_score': 0,
-        'player2_score': 0,
-        'current_player': 1,  # joueur 1 ou 2
+        'moteur': None,  # règles du jeu : paires, scores, joueur courant (jeu/moteur.py)
         'start_time': 0,
         'disable_clicks': False,
+        'politique_clics': 'ignorer',  # clics pendant le masquage : 'ignorer' ou 'file'
+        'file_clics': deque(),
+        'timer_masquage': None,
+        'ia': {},  # joueur (1 ou 2) -> nom de l'agent qui tient sa place (jeu/agents.py)
+        'adversaires': {},  # joueur -> agent, créés par setup_board
+        'timer_ia': None,
+        'journal': None,  # enregistrement de la partie (jeu/journal.py)
+        'video': None,  # cartes jouées, pour la vidéo de la partie (jeu/video.py)
+        'sauvegarde': None,  # sauvegarde automatique après chaque tour (jeu/sauvegarde.py)
+        'reprise': None,  # partie sauvegardée reprise (Instantane), restaurée par setup_board
+        'rejeu': None,  # partie du journal rejouée (Partie), au lieu d'une partie jouée
+        'rejeu_position': 0,
+        'timer_rejeu': None,
         'score_timer_text': None,
         'timer': None,
+        'blit': True,  # rendu partiel (seules les cartes modifiées sont redessinées)
+        'rendu': None,
+        'a_rafraichir': {},  # indices des cartes à redessiner au prochain rafraîchissement
+        'timer_rendu': None,
+        'hud': None,  # couche du score et du temps (jeu/hud.py)
+        'mesures': None,  # histogrammes des étapes, si l'instrumentation est activée
+        'conseils': None,  # analyse de la partie (jeu/conseils.py), si le panneau est affiché
+        'conseils_text': None,
+        'hud_conseils': None,
+        'survol': None,  # carte sous le pointeur (panneau de conseils)
+        'mode_collection': None,  # True/False, 'fenetre', ou None : choix selon la taille du plateau
+        'gif': None,  # images du GIF de fin (ImagesGif), préparées avant la fin de partie
         'namep1': None,
         'namep2': None
     }
@@ -172,33 +175,58 @@ def setup_board(game_state):
     ax = game_state['ax']
     ax.set_axis_off()
 
-    for key, data in game_state['formes'].items():
-        (x, y), largeur, hauteur, couleur = data
-        
-        # Dessiner le rectangle initial (face cachée en noir)
-        poly = tracer_rectangle(
-            ax, x, y, largeur, hauteur, 
-            facecolor='black', edgecolor='white', linewidth=1
+    # Cartes stockées en colonnes (jeu/cartes.py), manipulées par des vues légères
+    cards = Cartes.depuis_formes(game_state['formes'])
+    game_state['cards'] = cards
+
+    # Règles du jeu (2 cartes par couleur). Partie reprise : plateau et moteur remis
+    # dans l'état sauvegardé avant la création des artistes
+    game_state['moteur'] = Moteur.depuis_formes(game_state['formes'], cle_classique)
+    if game_state['reprise'] is not None:
+        sauvegarde.restaurer(game_state['reprise'], cards, game_state['moteur'])
+
+    mode_collection = game_state['mode_collection']
+    if mode_collection is None:
+        mode_collection = 'fenetre' if len(cards) > SEUIL_FENETRE else len(cards) > SEUIL_COLLECTION
+    if mode_collection == 'fenetre':
+        # Seules les cartes dans la vue sont dessinées (jeu/rendu_fenetre.py)
+        cards.collection = PlateauFenetre(ax, cards)
+        activer_zoom(ax)
+    elif mode_collection:
+        # Tout le plateau en deux collections (dos + faces)
+        cards.collection = PlateauCollection(
+            ax, cards.rects(), cards.couleurs(), revelees=cards.revelee
         )
-
-        card_info = {
-            'id': key,
-            'x': x,
-            'y': y,
-            'width': largeur,
-            'height': hauteur,
-            'true_color': couleur,
-            'face_color': 'black',
-            'is_revealed': False,
-            'patch': poly
-        }
-        game_state['cards'].append(card_info)
+    else:
+        # Dessiner chaque rectangle initial (face cachée en noir)
+        cards.artistes = [
+            tracer_rectangle(ax, x, y, largeur, hauteur,
+                             facecolor='black', edgecolor='white', linewidth=1)
+            for x, y, largeur, hauteur in cards.rects()
+        ]
+        for i in cards.revelees():
+            reveal_card(cards[i])
+
+    # Index spatial construit une seule fois : un clic retrouve sa carte en O(1)
+    if mode_collection == 'fenetre':
+        game_state['index'] = cards.collection.index
+    else:
+        game_state['index'] = construire_index(cards.rects())
 
     ax.set_aspect('equal', adjustable='box')
     ax.autoscale_view()
 
-    # Total de paires (puisqu'il y a 2 cartes par couleur)
-    game_state['total_pairs'] = len(game_state['cards']) // 2
+    # Panneau de conseils : l'analyse s'abonne avant l'affichage, qui la lit
+    if game_state['conseils'] is not None:
+        game_state['conseils'].debut_partie(game_state['moteur'])
+    # L'affichage s'abonne aux événements du moteur
+    game_state['moteur'].abonner(lambda evenements: apply_events(game_state, evenements))
+
+    # Joueurs automatiques : ils suivent la partie par les événements du moteur
+    for joueur, nom in game_state['ia'].items():
+        agent = AGENTS[nom](random.Random())
+        agent.debut_partie(game_state['moteur'])
+        game_state['adversaires'][joueur] = agent
 
     # Préparation d'un texte pour afficher le score et le temps
     game_state['score_timer_text'] = ax.text(
@@ -207,8 +235,29 @@ def setup_board(game_state):
         fontsize=12, fontweight="bold"
     )
 
-    # Mise à jour initiale de l'affichage Score/Timer
+    # Score et temps dans leur propre couche : le timer ne redessine pas le plateau
+    game_state['hud'] = CoucheHud(game_state['fig'], [game_state['score_timer_text']])
+    if game_state['conseils'] is not None:
+        create_hints_panel(game_state)
+    if game_state['blit']:
+        game_state['rendu'] = RenduBlit(game_state['fig'])
+
+    # Mise à jour initiale de l'affichage Score/Timer (et du panneau de conseils)
     update_score_and_timer(game_state)
+    update_hints(game_state)
+
+
+def create_hints_panel(game_state):
+    """
+    Texte du panneau de conseils, sous le plateau, dans sa propre couche
+    (une bande distincte de celle du score).
+    """
+    game_state['conseils_text'] = game_state['ax'].text(
+        0.5, -0.01, "",
+        transform=game_state['ax'].transAxes, ha="center", va="top", color="dimgray",
+        fontsize=9
+    )
+    game_state['hud_conseils'] = CoucheHud(game_state['fig'], [game_state['conseils_text']])
 
 
 def connect_events(game_state):
@@ -219,107 +268,311 @@ def connect_events(game_state):
     fig = game_state['fig']
     cid = fig.canvas.mpl_connect('button_press_event', 
                                  lambda event: on_click(event, game_state))
+    # Probabilité de la carte survolée : seulement si le panneau de conseils est affiché
+    if game_state['conseils'] is not None:
+        fig.canvas.mpl_connect('motion_notify_event',
+                               lambda event: on_motion(event, game_state))
+
+    # Le jeu n'utilise pas les "pick events" : on évite à Matplotlib de parcourir
+    # tous les artistes de la figure à chaque clic
+    pick_id = getattr(fig, '_button_pick_id', None)
+    if pick_id is not None:
+        fig.canvas.mpl_disconnect(pick_id)
 
     # Configuration du timer pour mettre à jour le temps chaque seconde
     game_state['timer'] = fig.canvas.new_timer(interval=1000)
     game_state['timer'].add_callback(lambda: update_score_and_timer(game_state))
     game_state['timer'].start()
 
+    # Fenêtre fermée en cours de partie : arrêter les timers (le processus peut
+    # enchaîner sur une autre partie, voir main.py)
+    fig.canvas.mpl_connect('close_event', lambda event: stop_timers(game_state))
+
+    # Si le joueur 1 est une IA, elle commence
+    schedule_ai_move(game_state)
+
+
+def stop_timers(game_state):
+    """
+    Arrête le timer du score et un éventuel masquage programmé.
+    """
+    if game_state['timer'] is not None:
+        game_state['timer'].stop()
+    if game_state['timer_masquage'] is not None:
+        game_state['timer_masquage'].stop()
+        game_state['timer_masquage'] = None
+    if game_state['timer_ia'] is not None:
+        game_state['timer_ia'].stop()
+        game_state['timer_ia'] = None
+    if game_state['timer_rejeu'] is not None:
+        game_state['timer_rejeu'].stop()
+        game_state['timer_rejeu'] = None
+    if game_state['timer_rendu'] is not None:
+        game_state['timer_rendu'].stop()
+        game_state['timer_rendu'] = None
+
 
 def on_click(event, game_state):
     """
-    Gère la logique lors d'un clic sur le canevas :
-    - Vérifie si on a cliqué sur une carte
-    - Retourne la carte si elle est cachée
-    - Compare la carte cliquée avec une autre si 2 cartes sont cliquées
-    - Met à jour le score et le joueur
+    Gère un clic sur le canevas : retrouve la carte cliquée et la joue.
+    Pendant l'affichage d'une non-correspondance, le clic est mis en file
+    ou ignoré selon game_state['politique_clics'].
+    Ne bloque jamais : le masquage est programmé par un timer.
+    Les clics sont ignorés pendant le tour d'un joueur automatique, et quand
+    l'outil zoom ou déplacement de la barre d'outils est actif.
     """
     if game_state['disable_clicks'] or event.xdata is None or event.ydata is None:
         return
+    if game_state['moteur'].joueur in game_state['adversaires']:
+        return
+    if getattr(event.canvas.toolbar, 'mode', None):
+        return
+
+    # Retrouver la carte sous le clic grâce à l'index spatial
+    indice = game_state['index'].trouver(event.xdata, event.ydata)
+    if indice is None:
+        return
+
+    if game_state['moteur'].etat == ETAT_ATTENTE_MASQUAGE:
+        if game_state['politique_clics'] == 'file':
+            game_state['file_clics'].append(indice)
+        return
+
+    play_card(game_state, indice)
+
+
+def on_motion(event, game_state):
+    """
+    Retrouve la carte sous le pointeur ; le panneau de conseils, qui affiche sa
+    probabilité de paire, n'est mis à jour que si elle change.
+    """
+    indice = None
+    if event.inaxes is game_state['ax'] and event.xdata is not None:
+        indice = game_state['index'].trouver(event.xdata, event.ydata)
+    if indice != game_state['survol']:
+        game_state['survol'] = indice
+        update_hints(game_state)
+
+
+def play_card(game_state, indice):
+    """
+    Joue la carte d'indice donné : le moteur applique les règles et
+    l'affichage est mis à jour par apply_events. La carte est notée au journal
+    (et dans la vidéo) seulement si le moteur la retourne.
+    """
+    if not game_state['moteur'].jouable(indice):
+        return
+    if game_state['journal'] is not None:
+        game_state['journal'].carte(indice)
+    if game_state['video'] is not None:
+        game_state['video'].carte(indice)
+    game_state['moteur'].flip(indice)
 
-    for card in game_state['cards']:
-        # Vérifier si (xdata, ydata) est à l'intérieur de la zone de la carte
-        if (card['x'] <= event.xdata <= card['x'] + card['width'] and
-            card['y'] <= event.ydata <= card['y'] + card['height']):
-            
-            # Si la carte est déjà retournée, on ne fait rien
-            if not card['is_revealed']:
-                reveal_card(card)
-                game_state['clicked_cards'].append(card)
-
-                # Si 2 cartes cliquées, vérifier la correspondance
-                if len(game_state['clicked_cards']) == 2:
-                    card1, card2 = game_state['clicked_cards']
-                    if card1['true_color'] == card2['true_color']:
-                        # Paire trouvée
-                        game_state['pairs_found'] += 1
-                        if game_state['current_player'] == 1:
-                            game_state['player1_score'] += 1
-                        else:
-                            game_state['player2_score'] += 1
-
-                        game_state['clicked_cards'].clear()
-                        print(f"Correspondance ! Paires trouvées : {game_state['pairs_found']}/{game_state['total_pairs']}")
-
-                        # Mettre à jour le score/temps
-                        update_score_and_timer(game_state)
-
-                        # Si toutes les paires sont trouvées -> fin du jeu
-                        if game_state['pairs_found'] == game_state['total_pairs']:
-                            print("Vous avez trouvé toutes les paires ! Fin du jeu !")
-                            end_game(game_state)
-                        else:
-                            # Le joueur courant rejoue, on ne change pas de joueur
-                            pass
-                    else:
-                        # Pas de correspondance, on attend 1.5s puis on cache à nouveau
-                        game_state['disable_clicks'] = True
-                        plt.pause(1.5)
-                        hide_card(card1)
-                        hide_card(card2)
-                        game_state['clicked_cards'].clear()
-                        game_state['disable_clicks'] = False
-
-                        # Passer au joueur suivant
-                        next_player(game_state)
-                        update_score_and_timer(game_state)
-
-            break  # On sort de la boucle une fois la carte trouvée
-
-    game_state['fig'].canvas.draw()
+
+def schedule_ai_move(game_state):
+    """
+    Si c'est au tour d'un joueur automatique, programme (timer) sa prochaine carte.
+    """
+    moteur = game_state['moteur']
+    if (game_state['timer_ia'] is not None or moteur.fini
+            or moteur.etat == ETAT_ATTENTE_MASQUAGE
+            or moteur.joueur not in game_state['adversaires']):
+        return
+    timer = game_state['fig'].canvas.new_timer(interval=DELAI_IA_MS)
+    timer.single_shot = True
+    timer.add_callback(ai_move, game_state)
+    timer.start()
+    game_state['timer_ia'] = timer
+
+
+def ai_move(game_state):
+    """
+    Appelée par le timer : l'agent du joueur courant choisit une carte (en O(1)) et la joue.
+    """
+    game_state['timer_ia'] = None
+    agent = game_state['adversaires'].get(game_state['moteur'].joueur)
+    if agent is not None and not game_state['moteur'].fini:
+        play_card(game_state, agent.choisir())
+
+
+def schedule_replay(game_state):
+    """
+    Rejeu d'une partie du journal : programme la prochaine carte à son instant enregistré.
+    """
+    partie = game_state['rejeu']
+    k = game_state['rejeu_position']
+    if k >= len(partie.indices):
+        return
+    attente = partie.instants[k] - (time.time() - game_state['start_time'])
+    timer = game_state['fig'].canvas.new_timer(interval=max(int(attente * 1000), 1))
+    timer.single_shot = True
+    timer.add_callback(replay_move, game_state)
+    timer.start()
+    game_state['timer_rejeu'] = timer
+
+
+def replay_move(game_state):
+    """
+    Joue la carte suivante du rejeu ; une non-paire encore affichée est masquée d'abord.
+    """
+    game_state['timer_rejeu'] = None
+    if game_state['moteur'].etat == ETAT_ATTENTE_MASQUAGE:
+        game_state['timer_masquage'].stop()
+        end_mismatch(game_state)
+    k = game_state['rejeu_position']
+    game_state['rejeu_position'] = k + 1
+    play_card(game_state, game_state['rejeu'].indices[k])
+    schedule_replay(game_state)
+
+
+def apply_events(game_state, evenements):
+    """
+    Traduit les événements du moteur en mises à jour de l'affichage.
+    """
+    moteur = game_state['moteur']
+    cartes_modifiees = []
+
+    for evenement in evenements:
+        cartes = [game_state['cards'][i] for i in evenement.cartes]
+        if evenement.type == REVELEE:
+            reveal_card(cartes[0])
+            cartes_modifiees.extend(cartes)
+        elif evenement.type == PAIRE:
+            # Paire trouvée : le joueur courant rejoue
+            for card in cartes:
+                card.trouvee = True
+            print(f"Correspondance ! Paires trouvées : {moteur.paires_trouvees}/{moteur.total_paires}")
+            update_score_and_timer(game_state, peindre=False)
+            if moteur.total_paires - moteur.paires_trouvees <= PAIRES_AVANT_GIF:
+                prepare_gif(game_state)
+        elif evenement.type == NON_PAIRE:
+            # Pas de correspondance : les cartes restent visibles 1.5s,
+            # le masquage est programmé sans bloquer la boucle d'événements
+            timer = game_state['fig'].canvas.new_timer(interval=DELAI_MASQUAGE_MS)
+            timer.single_shot = True
+            timer.add_callback(end_mismatch, game_state)
+            timer.start()
+            game_state['timer_masquage'] = timer
+        elif evenement.type == MASQUEES:
+            for card in cartes:
+                hide_card(card)
+            cartes_modifiees.extend(cartes)
+        elif evenement.type == JOUEUR_SUIVANT:
+            update_score_and_timer(game_state, peindre=False)
+        elif evenement.type == FIN:
+            print("Vous avez trouvé toutes les paires ! Fin du jeu !")
+            end_game(game_state)
+
+    # Artistes à jour ; l'affichage est peint plus tard, en un seul rafraîchissement
+    update_hints(game_state, peindre=False)
+    schedule_refresh(game_state, cartes_modifiees)
+    schedule_ai_move(game_state)
+
+
+def end_mismatch(game_state):
+    """
+    Appelée par le timer après une non-correspondance : cache les deux cartes,
+    passe au joueur suivant puis rejoue les clics mis en file pendant l'attente.
+    """
+    game_state['timer_masquage'] = None
+    game_state['moteur'].masquer()
+
+    file_clics = game_state['file_clics']
+    if game_state['moteur'].joueur in game_state['adversaires']:
+        file_clics.clear()
+    while file_clics and game_state['moteur'].etat != ETAT_ATTENTE_MASQUAGE:
+        play_card(game_state, file_clics.popleft())
 
 
 def reveal_card(card):
     """
-    Retourne la carte (on affiche sa 'true_color').
+    Retourne la carte (on affiche sa couleur).
     """
-    card['is_revealed'] = True
-    card['face_color'] = card['true_color']
-    card['patch'].set_facecolor(card['true_color'])
+    card.revelee = True
+    if card.collection is not None:
+        card.collection.reveler(card.indice)
+    else:
+        poly, contour = card.artistes
+        poly.set_facecolor(card.couleur)
 
 
 def hide_card(card):
     """
     Retourne la carte face cachée (noire).
     """
-    card['is_revealed'] = False
-    card['face_color'] = 'black'
-    card['patch'].set_facecolor('black')
+    card.revelee = False
+    if card.collection is not None:
+        card.collection.cacher(card.indice)
+    else:
+        poly, contour = card.artistes
+        poly.set_facecolor('black')
 
 
-def next_player(game_state):
+def card_artists(card):
     """
-    Passe au joueur suivant (1 -> 2 ou 2 -> 1).
+    Renvoie les artistes Matplotlib d'une carte, dans leur ordre de dessin.
+    En mode collection, ce sont les collections de tout le plateau.
     """
-    if game_state['current_player'] == 1:
-        game_state['current_player'] = 2
-    else:
-        game_state['current_player'] = 1
+    if card.collection is not None:
+        return card.collection.artistes()
+    return card.artistes
 
 
-def update_score_and_timer(game_state):
+def refresh_display(game_state, cards=()):
     """
-    Met à jour l'affichage du score et du temps écoulé.
+    Met à jour l'affichage : en mode blit, seules les cartes données sont
+    redessinées (le score l'est par update_score_and_timer) ; sinon toute
+    la figure est redessinée.
+    """
+    if game_state['rendu'] is None:
+        game_state['fig'].canvas.draw_idle()
+        return
+    # dict.fromkeys : les collections partagées ne sont redessinées qu'une fois
+    artistes = dict.fromkeys(a for card in cards for a in card_artists(card))
+    game_state['rendu'].rafraichir(list(artistes))
+
+
+def schedule_refresh(game_state, cards=()):
+    """
+    Note les cartes à redessiner et programme un seul rafraîchissement (timer
+    de 0 ms, dès que la boucle d'événements est libre) : un clic ne fait que
+    mettre à jour le moteur et les artistes, et tout ce qui a changé d'ici au
+    rafraîchissement est peint en une fois.
+    """
+    game_state['a_rafraichir'].update(dict.fromkeys(card.indice for card in cards))
+    if game_state['timer_rendu'] is not None:
+        return
+    timer = game_state['fig'].canvas.new_timer(interval=0)
+    timer.single_shot = True
+    timer.add_callback(flush_refresh, game_state)
+    timer.start()
+    game_state['timer_rendu'] = timer
+
+
+def flush_refresh(game_state):
+    """
+    Appelée par le timer : redessine les cartes notées par schedule_refresh,
+    puis le score et le panneau de conseils s'ils ont changé.
+    """
+    if game_state['timer_rendu'] is not None:
+        game_state['timer_rendu'].stop()
+        game_state['timer_rendu'] = None
+    cards = game_state['cards']
+    indices = list(game_state['a_rafraichir'])
+    game_state['a_rafraichir'].clear()
+    if game_state['moteur'].fini:
+        # end_game a demandé un rendu complet, qui dessine aussi ces cartes
+        return
+    refresh_display(game_state, [cards[i] for i in indices])
+    game_state['hud'].rafraichir()
+    if game_state['hud_conseils'] is not None:
+        game_state['hud_conseils'].rafraichir()
+
+
+def update_score_and_timer(game_state, peindre=True):
+    """
+    Met à jour l'affichage du score et du temps écoulé (sans le redessiner si
+    peindre est faux : flush_refresh s'en charge).
     """
     elapsed_time = int(time.time() - game_state['start_time'])
     minutes = elapsed_time // 60
@@ -327,23 +580,49 @@ def update_score_and_timer(game_state):
     time_str = f"{minutes:02d}:{seconds:02d}"
 
     # Déterminer le nom du joueur courant
-    if game_state['current_player'] == 1:
+    moteur = game_state['moteur']
+    if moteur.joueur == 1:
         name_current = game_state['namep1']
     else:
         name_current = game_state['namep2']
 
-    score_str = (f"{game_state['namep1']} : {game_state['player1_score']}   "
-                 f"{game_state['namep2']} : {game_state['player2_score']}   "
+    score_str = (f"{game_state['namep1']} : {moteur.scores[0]}   "
+                 f"{game_state['namep2']} : {moteur.scores[1]}   "
                  f"(Tour de {name_current})   "
                  f"Temps : {time_str}")
     
     game_state['score_timer_text'].set_text(score_str)
-    game_state['fig'].canvas.draw_idle()
+    # Rien n'est redessiné si le texte n'a pas changé
+    if peindre:
+        game_state['hud'].rafraichir()
+
+
+def update_hints(game_state, peindre=True):
+    """
+    Met à jour le panneau de conseils (probabilités de paire, dont celle de la
+    carte survolée, paires connues, meilleur coup) : l'analyse répond en O(1),
+    sans parcourir les cartes. Comme pour le score, peindre=False laisse le
+    dessin à flush_refresh.
+    """
+    analyste = game_state['conseils']
+    if analyste is None:
+        return
+    cards = game_state['cards']
+    survol = game_state['survol']
+    if survol is not None:
+        survol = (survol, analyste.probabilite(survol))
+    game_state['conseils_text'].set_text(decrire(analyste.conseil(), lambda i: cards[i].id, survol))
+    if peindre:
+        game_state['hud_conseils'].rafraichir()
 
 
 def end_game(game_state):
+    # 0) Fin de partie et scores notés au journal
+    if game_state['journal'] is not None:
+        game_state['journal'].fin(game_state['moteur'].scores)
+
     # 1) Déterminer winner et loser
-    if game_state['player1_score'] >= game_state['player2_score']:
+    if game_state['moteur'].gagnant() == 1:
         winner = game_state['namep1']
         loser = game_state['namep2']
     else:
@@ -365,14 +644,14 @@ def end_game(game_state):
     )
 
     # 4) Ajouter l'axe du GIF
-    gif_ax = game_state['fig'].add_axes([0.25, 0.1, 0.5, 0.5])
+    gif_ax = game_state['fig'].add_axes(GIF_RECT)
     gif_ax.axis('off')
 
-    gif_path = "gif/i-win-you-lose.gif"
-    if not os.path.exists(gif_path):
-        print(f"Le fichier GIF n'a pas été trouvé à {gif_path}")
+    images = prepare_gif(game_state, prefetch=False)
+    if images is None:
+        print(f"Le fichier GIF n'a pas été trouvé à {GIF_PATH}")
     else:
-        ani = display_gif(gif_ax, gif_path)
+        ani = display_gif(gif_ax, images)
         if ani is not None:
             game_state['fig']._gif_animation = ani
 
@@ -404,25 +683,69 @@ def end_game(game_state):
 # ---------------------------------------
 # Exécution du script principal
 # ---------------------------------------
-if __name__ == "__main__":
-    # 1) Lecture de la configuration
-    fichier_config = "config.txt"
-    formes_initiales = lire_fichier_config(fichier_config)
+def main(noms=None, debut=None, ia=None, rejeu=None, reprendre=None):
+    """
+    Joue une partie du mode classique ; rend la main quand la fenêtre est fermée.
+    `noms` : (joueur 1, joueur 2), demandés au clavier s'ils ne sont pas donnés.
+    `ia` : {joueur: nom de l'agent} pour les places tenues par l'ordinateur
+    (par défaut, options --ia1 / --ia2 de la ligne de commande).
+    `debut` : instant (time.perf_counter()) à partir duquel le délai jusqu'au
+    premier affichage est mesuré (lancement depuis main.py).
+    `rejeu` : partie du journal (jeu/journal.py) à rejouer en temps réel, avec
+    son plateau et ses noms, au lieu de jouer une partie.
+    `reprendre` : True pour reprendre la partie sauvegardée, False pour la
+    remplacer par une nouvelle partie, None pour le demander s'il y en a une
+    (voir jeu/sauvegarde.py, choisir ; l'option --reprendre vaut True).
+    """
+    # Instrumentation optionnelle : --mesures / --profil, ou JEU_MESURES / JEU_PROFIL
+    fichier_mesures, fichier_profil = instrumentation.options()
+    # Sauvegarde automatique après chaque tour : --sauvegarde FICHIER / --sans-sauvegarde,
+    # ou JEU_SAUVEGARDE ; --reprendre reprend la partie sauvegardée dans ce fichier,
+    # et une partie non finie n'est remplacée qu'après confirmation
+    fichier_sauvegarde, option_reprendre = sauvegarde.options('classique')
+    reprise = None
+    if rejeu is not None:
+        fichier_sauvegarde = None
+    elif fichier_sauvegarde or option_reprendre:
+        reprise, fichier_sauvegarde = sauvegarde.choisir(
+            fichier_sauvegarde, 'classique', True if option_reprendre else reprendre)
+    # Journal des parties (parties entières) : --journal FICHIER / --sans-journal, ou JEU_JOURNAL
+    fichier_journal = journal.options() if rejeu is None and reprise is None else None
+    # Vidéo de la partie, écrite à la fermeture de la fenêtre : --video FICHIER, ou JEU_VIDEO
+    fichier_video = video.options() if reprise is None else None
+
+    # 1) Lecture de la configuration (ou plateau de la partie rejouée, ou reprise)
+    if rejeu is not None:
+        formes_initiales = journal.formes_de_partie(rejeu)
+        noms, ia = rejeu.noms, {}
+    elif reprise is not None:
+        formes_initiales = journal.formes_de_partie(reprise)
+        noms, ia = reprise.noms, reprise.ia
+    else:
+        fichier_config = "config.txt"
+        formes_initiales = lire_fichier_config(fichier_config)
 
-    # 2) Création des fichiers CSV et mise à jour du dictionnaire pour les formes
-    formes_for_files = formes_initiales.copy()
-    create_shape_files(formes_for_files)
+    # 2) Écriture des géométries des cartes (fichier unique, ignorée si rien n'a changé)
+    create_shape_files(formes_initiales)
 
     # 3) Initialisation de l'état du jeu
     game_state = init_game_state()
-
-    # Récupération du nom des joueurs
-    namep1 = str(input("Quel est le nom du joueur 1 ? "))
-    namep2 = str(input("Quel est le nom du joueur 2 ? "))
+    game_state['reprise'] = reprise
+    if conseils_demandes():
+        game_state['conseils'] = Analyste()
+
+    # Joueurs automatiques éventuels, puis nom des joueurs humains
+    if ia is None:
+        ia = adversaires_demandes()
+    game_state['ia'] = dict(ia)
+    if noms is None:
+        noms = tuple("" if joueur in ia else str(input(f"Quel est le nom du joueur {joueur} ? "))
+                     for joueur in (1, 2))
+    noms = [f"IA ({ia[joueur]})" if joueur in ia else nom
+            for joueur, nom in zip((1, 2), noms)]
 
     # Stockage dans le game_state
-    game_state['namep1'] = namep1
-    game_state['namep2'] = namep2
+    game_state['namep1'], game_state['namep2'] = noms
 
     # 4) Stocker les formes dans le state
     game_state['formes'] = formes_initiales
@@ -431,11 +754,32 @@ if __name__ == "__main__":
     fig, ax = plt.subplots()
     game_state['fig'] = fig
     game_state['ax'] = ax
-    game_state['start_time'] = time.time()
+    game_state['start_time'] = time.time() - (reprise.temps if reprise is not None else 0)
 
     # 6) Configuration du plateau de jeu et connexion des événements
     setup_board(game_state)
+    if fichier_journal:
+        game_state['journal'] = journal.Enregistreur(
+            fichier_journal, 'classique', game_state['cards'],
+            (game_state['namep1'], game_state['namep2']), game_state['ia'])
+    if fichier_sauvegarde:
+        game_state['sauvegarde'] = sauvegarde.Sauvegarde(
+            fichier_sauvegarde, 'classique', game_state['cards'], game_state['moteur'],
+            lambda: time.time() - game_state['start_time'],
+            (game_state['namep1'], game_state['namep2']), game_state['ia'])
+    if fichier_video:
+        game_state['video'] = video.Capture(
+            fichier_video, 'classique', game_state['cards'],
+            (game_state['namep1'], game_state['namep2']))
+    if fichier_mesures:
+        instrumentation.instrumenter(globals(), game_state, fichier_mesures)
     connect_events(game_state)
+    if rejeu is not None:
+        game_state['rejeu'] = rejeu
+        game_state['disable_clicks'] = True
+        schedule_replay(game_state)
+    if debut is not None:
+        instrumentation.premier_affichage(fig, debut)
 
     # 7) Afficher le plot Matplotlib (en maximisant la fenêtre)
     manager = plt.get_current_fig_manager()
@@ -443,4 +787,18 @@ if __name__ == "__main__":
         manager.window.state('zoomed')
     except AttributeError:
         manager.window.showMaximized()
-    plt.show()
\ No newline at end of file
+    with instrumentation.profil(fichier_profil):
+        plt.show()
+    if game_state['mesures'] is not None:
+        game_state['mesures'].ecrire()
+    if game_state['journal'] is not None:
+        game_state['journal'].fermer()
+    if game_state['sauvegarde'] is not None:
+        game_state['sauvegarde'].fermer()
+    if game_state['video'] is not None and game_state['video'].exporter():
+        print(f"Vidéo de la partie écrite dans {fichier_video}")
+    return game_state
+
+
+if __name__ == "__main__":
+    main()
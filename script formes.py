@@ -1,75 +1,43 @@
 import os
 import time
 import random
+from collections import deque
 import matplotlib.pyplot as plt
 from matplotlib.patheffects import withStroke
 
-plt.close('all')
-
-# ===============================
-# Génération du fichier config "formes"
-# ===============================
+from jeu.agents import AGENTS, adversaires_demandes
+from jeu.index_spatial import construire_index
+from jeu import instrumentation, journal, sauvegarde, video
+from jeu.hud import CoucheHud
+from jeu.rendu_blit import RenduBlit
+from jeu.rendu_collection import PlateauCollection
+from jeu.rendu_fenetre import PlateauFenetre, activer_zoom
+from jeu.rendu_atlas import PlateauAtlas, atlas_demande
+from jeu.cartes import Cartes
+from jeu.conseils import Analyste, conseils_demandes, decrire
+from jeu.configuration import generate_shapes_config, lire_config_formes as lire_fichier_config
+from jeu.fichier_geometrie import ecrire_geometries
+from jeu.moteur import (Moteur, cle_formes, REVELEE, PAIRE, NON_PAIRE,
+                        MASQUEES, JOUEUR_SUIVANT, FIN, ETAT_ATTENTE_MASQUAGE)
 
-def generate_shapes_config(filename="config_shapes.txt"):
-    """
-    Génère un fichier config pour le mode formes :
-    36 cartes = (3 formes × 6 couleurs) × 2 exemplaires.
-    Positionnement aléatoire dans une grille 6×6.
-    """
-    shapes = ["circle", "triangle", "rectangle"]
-    colors = ["red", "green", "blue", "yellow", "purple", "orange"]
+plt.close('all')
 
-    combos = [(s, c) for s in shapes for c in colors]  # 18 combos
-    all_cards = combos * 2  # double => 36
-    random.shuffle(all_cards)
+# Au-delà de ce nombre de cartes, le plateau est dessiné avec des collections
+# (dos + une collection par forme) plutôt qu'avec trois patches par carte.
+SEUIL_COLLECTION = 500
 
-    coords = []
-    for row in range(6):
-        for col in range(6):
-            x = col * 3
-            y = row * 3
-            coords.append((x, y))
-    random.shuffle(coords)
+# Au-delà de ce nombre de cartes, seules les cartes dans la vue sont dessinées
+# (zoom à la molette, déplacement avec l'outil « pan »), en image si la vue est éloignée
+SEUIL_FENETRE = 20_000
 
-    with open(filename, "w") as f:
-        for i, (shape, color) in enumerate(all_cards):
-            idx = f"shape_{i+1}"
-            (x, y) = coords[i]
-            L, H = 3, 3
-            line = f"{idx};[{x},{y}];{L};{H};{color};{shape}\n"
-            f.write(line)
+# Durée d'affichage de deux cartes qui ne correspondent pas
+DELAI_MASQUAGE_MS = 1500
 
-    return filename
-
-
-# ===============================
-# Lecture du fichier config
-# ===============================
-
-def lire_fichier_config(fichier):
-    """
-    Lit chaque ligne du fichier (ex: ID;[x,y];L;H;couleur;shape)
-    et renvoie un dict { 'ID': [(x,y), L, H, couleur, shape], ... }.
-    """
-    d = {}
-    with open(fichier, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split(";")
-            if len(parts) < 5:
-                continue
-            idx = parts[0]
-            xy = eval(parts[1])  # "[x,y]" -> tuple(x,y)
-            L = int(parts[2])
-            H = int(parts[3])
-            color = parts[4]
-            shape = parts[5].strip() if len(parts) >= 6 else "rectangle"
-
-            d[idx] = [xy, L, H, color, shape]
-    return d
+# Délai avant chaque carte retournée par un joueur automatique (IA)
+DELAI_IA_MS = 700
 
+# Géométries (couleur + sommets des cercles, triangles, rectangles) de toutes les cartes
+FICHIER_GEOMETRIES = os.path.join("figures", "geometries_formes.bin")
 
 # ===============================
 # Fonctions pour tracer (back & front)
@@ -129,19 +97,39 @@ def create_card_patches(ax, x, y, L, H, shape, color):
 def init_game_state():
     return {
         'formes': None,       # dict {ID: [ (x,y), L, H, color, shape ]}
-        'cards': [],
+        'cards': None,        # Cartes (jeu/cartes.py) : une colonne par attribut
+        'index': None,        # index spatial des cartes (clic -> carte)
         'fig': None,
         'ax': None,
-        'clicked_cards': [],
-        'pairs_found': 0,
-        'total_pairs': 0,
-        'player1_score': 0,
-        'player2_score': 0,
-        'current_player': 1,
+        'moteur': None,       # règles du jeu : paires, scores, joueur courant
         'start_time': 0,
         'disable_clicks': False,
+        'politique_clics': 'ignorer',  # clics pendant le masquage : 'ignorer' ou 'file'
+        'file_clics': deque(),
+        'timer_masquage': None,
+        'ia': {},             # joueur (1 ou 2) -> nom de l'agent qui tient sa place
+        'adversaires': {},    # joueur -> agent (jeu/agents.py), créés par setup_board
+        'timer_ia': None,
+        'journal': None,      # enregistrement de la partie (jeu/journal.py)
+        'video': None,        # cartes jouées, pour la vidéo de la partie (jeu/video.py)
+        'sauvegarde': None,   # sauvegarde automatique après chaque tour (jeu/sauvegarde.py)
+        'reprise': None,      # partie sauvegardée reprise (Instantane), restaurée par setup_board
+        'rejeu': None,        # partie du journal rejouée (Partie), au lieu d'une partie jouée
+        'rejeu_position': 0,
+        'timer_rejeu': None,
         'score_timer_text': None,
         'timer': None,
+        'blit': True,         # rendu partiel (seules les cartes modifiées sont redessinées)
+        'rendu': None,
+        'a_rafraichir': {},   # indices des cartes à redessiner au prochain rafraîchissement
+        'timer_rendu': None,
+        'hud': None,          # couche du score et du temps (jeu/hud.py)
+        'mesures': None,      # histogrammes des étapes, si l'instrumentation est activée
+        'conseils': None,     # analyse de la partie (jeu/conseils.py), si le panneau est affiché
+        'conseils_text': None,
+        'hud_conseils': None,
+        'survol': None,       # carte sous le pointeur (panneau de conseils)
+        'mode_collection': None,  # True/False, 'fenetre', 'atlas', ou None : choix selon la taille du plateau
         'namep1': "Joueur1",
         'namep2': "Joueur2"
     }
@@ -150,30 +138,57 @@ def setup_board(game_state):
     ax = game_state['ax']
     ax.set_axis_off()
 
-    for key, data in game_state['formes'].items():
-        (x, y), L, H, color, shape = data
-        back_patch, front_bg, front_shape = create_card_patches(ax, x, y, L, H, shape, color)
-
-        card_info = {
-            'id': key,
-            'x': x,
-            'y': y,
-            'L': L,
-            'H': H,
-            'color': color,
-            'shape': shape,
-            'is_revealed': False,
-            'back_patch': back_patch,
-            'front_bg': front_bg,
-            'front_shape': front_shape
-        }
-        game_state['cards'].append(card_info)
+    # Cartes stockées en colonnes (couleur et forme internées), vues légères par carte
+    cards = Cartes.depuis_formes(game_state['formes'])
+    game_state['cards'] = cards
+
+    # Règles du jeu (paire = même couleur et même forme). Partie reprise : plateau
+    # et moteur remis dans l'état sauvegardé avant la création des artistes
+    game_state['moteur'] = Moteur.depuis_formes(game_state['formes'], cle_formes)
+    if game_state['reprise'] is not None:
+        sauvegarde.restaurer(game_state['reprise'], cards, game_state['moteur'])
+
+    mode_collection = game_state['mode_collection']
+    if mode_collection is None:
+        mode_collection = 'fenetre' if len(cards) > SEUIL_FENETRE else len(cards) > SEUIL_COLLECTION
+    if mode_collection == 'fenetre':
+        # Seules les cartes dans la vue sont dessinées (jeu/rendu_fenetre.py)
+        cards.collection = PlateauFenetre(ax, cards)
+        activer_zoom(ax)
+    elif mode_collection == 'atlas':
+        # Plateau en une seule image, sprites des faces rastérisés une fois (jeu/rendu_atlas.py)
+        cards.collection = PlateauAtlas(ax, cards)
+    elif mode_collection:
+        cards.collection = PlateauCollection(ax, cards.rects(), cards.couleurs(), cards.formes(),
+                                             cards.revelee)
+    else:
+        cards.artistes = [
+            create_card_patches(ax, x, y, L, H, shape, color)
+            for (x, y, L, H), color, shape in zip(cards.rects(), cards.couleurs(), cards.formes())
+        ]
+        for i in cards.revelees():
+            reveal_card(cards[i])
+
+    # Index spatial sur le rectangle englobant (zone cliquable, quelle que soit la forme)
+    if mode_collection in ('fenetre', 'atlas'):
+        game_state['index'] = cards.collection.index
+    else:
+        game_state['index'] = construire_index(cards.rects())
 
     ax.set_aspect('equal', 'box')
     ax.autoscale_view()
 
-    # total de paires = nb_cartes / 2
-    game_state['total_pairs'] = len(game_state['cards']) // 2
+    # Panneau de conseils : l'analyse s'abonne avant l'affichage, qui la lit
+    if game_state['conseils'] is not None:
+        game_state['conseils'].debut_partie(game_state['moteur'])
+    # L'affichage s'abonne aux événements du moteur
+    game_state['moteur'].abonner(lambda evenements: apply_events(game_state, evenements))
+
+    # Joueurs automatiques : ils suivent la partie par les événements du moteur
+    for joueur, nom in game_state['ia'].items():
+        agent = AGENTS[nom](random.Random())
+        agent.debut_partie(game_state['moteur'])
+        game_state['adversaires'][joueur] = agent
 
     txt = ax.text(
         0.5, 1.02, "",
@@ -182,95 +197,313 @@ def setup_board(game_state):
     )
     game_state['score_timer_text'] = txt
 
+    # Score et temps dans leur propre couche : le timer ne redessine pas le plateau
+    game_state['hud'] = CoucheHud(game_state['fig'], [txt])
+    if game_state['conseils'] is not None:
+        create_hints_panel(game_state)
+    if game_state['blit']:
+        game_state['rendu'] = RenduBlit(game_state['fig'])
+
     update_score_and_timer(game_state)
+    update_hints(game_state)
+
+def create_hints_panel(game_state):
+    # Sous le plateau, dans sa propre couche (bande distincte de celle du score)
+    txt = game_state['ax'].text(
+        0.5, -0.01, "",
+        transform=game_state['ax'].transAxes, ha="center", va="top",
+        fontsize=9, color="dimgray"
+    )
+    game_state['conseils_text'] = txt
+    game_state['hud_conseils'] = CoucheHud(game_state['fig'], [txt])
 
 def connect_events(game_state):
     fig = game_state['fig']
     fig.canvas.mpl_connect('button_press_event', lambda e: on_click(e, game_state))
+    # Probabilité de la carte survolée : seulement si le panneau de conseils est affiché
+    if game_state['conseils'] is not None:
+        fig.canvas.mpl_connect('motion_notify_event', lambda e: on_motion(e, game_state))
+
+    # Le jeu n'utilise pas les "pick events" : on évite à Matplotlib de parcourir
+    # tous les artistes de la figure à chaque clic
+    pick_id = getattr(fig, '_button_pick_id', None)
+    if pick_id is not None:
+        fig.canvas.mpl_disconnect(pick_id)
 
     timer = fig.canvas.new_timer(interval=1000)
     timer.add_callback(lambda: update_score_and_timer(game_state))
     timer.start()
     game_state['timer'] = timer
 
+    # Fenêtre fermée en cours de partie : arrêter les timers (main.py peut
+    # enchaîner sur une autre partie dans le même processus)
+    fig.canvas.mpl_connect('close_event', lambda e: stop_timers(game_state))
+
+    # Si le joueur 1 est une IA, elle commence
+    schedule_ai_move(game_state)
+
+def stop_timers(game_state):
+    if game_state['timer'] is not None:
+        game_state['timer'].stop()
+    if game_state['timer_masquage'] is not None:
+        game_state['timer_masquage'].stop()
+        game_state['timer_masquage'] = None
+    if game_state['timer_ia'] is not None:
+        game_state['timer_ia'].stop()
+        game_state['timer_ia'] = None
+    if game_state['timer_rejeu'] is not None:
+        game_state['timer_rejeu'].stop()
+        game_state['timer_rejeu'] = None
+    if game_state['timer_rendu'] is not None:
+        game_state['timer_rendu'].stop()
+        game_state['timer_rendu'] = None
+
 def on_click(event, game_state):
     if game_state['disable_clicks'] or event.xdata is None or event.ydata is None:
         return
+    # Tour d'un joueur automatique, ou outil zoom / déplacement de la barre d'outils actif
+    if game_state['moteur'].joueur in game_state['adversaires']:
+        return
+    if getattr(event.canvas.toolbar, 'mode', None):
+        return
+
+    indice = game_state['index'].trouver(event.xdata, event.ydata)
+    if indice is None:
+        return
+
+    # Non-correspondance encore affichée : clic mis en file ou ignoré
+    if game_state['moteur'].etat == ETAT_ATTENTE_MASQUAGE:
+        if game_state['politique_clics'] == 'file':
+            game_state['file_clics'].append(indice)
+        return
+
+    play_card(game_state, indice)
+
+def on_motion(event, game_state):
+    # Carte sous le pointeur (index spatial) ; le panneau n'est mis à jour que si elle change
+    indice = None
+    if event.inaxes is game_state['ax'] and event.xdata is not None:
+        indice = game_state['index'].trouver(event.xdata, event.ydata)
+    if indice != game_state['survol']:
+        game_state['survol'] = indice
+        update_hints(game_state)
+
+def play_card(game_state, indice):
+    # Coup ignoré par le moteur (carte déjà visible, non-paire affichée...) : non noté
+    if not game_state['moteur'].jouable(indice):
+        return
+    # Carte notée au journal (tampon mémoire : rien n'est écrit sur le disque ici)
+    if game_state['journal'] is not None:
+        game_state['journal'].carte(indice)
+    if game_state['video'] is not None:
+        game_state['video'].carte(indice)
+    game_state['moteur'].flip(indice)
+
+def schedule_ai_move(game_state):
+    """
+    Programme (timer) la prochaine carte du joueur automatique dont c'est le tour.
+    """
+    moteur = game_state['moteur']
+    if (game_state['timer_ia'] is not None or moteur.fini
+            or moteur.etat == ETAT_ATTENTE_MASQUAGE
+            or moteur.joueur not in game_state['adversaires']):
+        return
+    timer = game_state['fig'].canvas.new_timer(interval=DELAI_IA_MS)
+    timer.single_shot = True
+    timer.add_callback(ai_move, game_state)
+    timer.start()
+    game_state['timer_ia'] = timer
+
+def ai_move(game_state):
+    game_state['timer_ia'] = None
+    agent = game_state['adversaires'].get(game_state['moteur'].joueur)
+    if agent is not None and not game_state['moteur'].fini:
+        play_card(game_state, agent.choisir())
+
+def schedule_replay(game_state):
+    """
+    Rejeu d'une partie du journal : programme la prochaine carte à son instant enregistré.
+    """
+    partie = game_state['rejeu']
+    k = game_state['rejeu_position']
+    if k >= len(partie.indices):
+        return
+    attente = partie.instants[k] - (time.time() - game_state['start_time'])
+    timer = game_state['fig'].canvas.new_timer(interval=max(int(attente * 1000), 1))
+    timer.single_shot = True
+    timer.add_callback(replay_move, game_state)
+    timer.start()
+    game_state['timer_rejeu'] = timer
+
+def replay_move(game_state):
+    # Une non-paire encore affichée est masquée avant la carte suivante
+    game_state['timer_rejeu'] = None
+    if game_state['moteur'].etat == ETAT_ATTENTE_MASQUAGE:
+        game_state['timer_masquage'].stop()
+        end_mismatch(game_state)
+    k = game_state['rejeu_position']
+    game_state['rejeu_position'] = k + 1
+    play_card(game_state, game_state['rejeu'].indices[k])
+    schedule_replay(game_state)
+
+def apply_events(game_state, evenements):
+    """
+    Vue : met à jour l'affichage à partir des événements du moteur.
+    """
+    cartes_modifiees = []
+    for ev in evenements:
+        cartes = [game_state['cards'][i] for i in ev.cartes]
+        if ev.type == REVELEE:
+            reveal_card(cartes[0])
+            cartes_modifiees.extend(cartes)
+        elif ev.type == PAIRE:
+            for card in cartes:
+                card.trouvee = True
+            update_score_and_timer(game_state, peindre=False)
+        elif ev.type == JOUEUR_SUIVANT:
+            update_score_and_timer(game_state, peindre=False)
+        elif ev.type == NON_PAIRE:
+            # Pas de match : masquage programmé, sans bloquer la boucle d'événements
+            timer = game_state['fig'].canvas.new_timer(interval=DELAI_MASQUAGE_MS)
+            timer.single_shot = True
+            timer.add_callback(end_mismatch, game_state)
+            timer.start()
+            game_state['timer_masquage'] = timer
+        elif ev.type == MASQUEES:
+            for card in cartes:
+                hide_card(card)
+            cartes_modifiees.extend(cartes)
+        elif ev.type == FIN:
+            end_game(game_state)
+
+    # Artistes à jour ; l'affichage est peint plus tard, en un seul rafraîchissement
+    update_hints(game_state, peindre=False)
+    schedule_refresh(game_state, cartes_modifiees)
+    schedule_ai_move(game_state)
+
+def end_mismatch(game_state):
+    """
+    Fin de l'attente après une non-correspondance (appelée par le timer).
+    """
+    game_state['timer_masquage'] = None
+    game_state['moteur'].masquer()
 
-    for card in game_state['cards']:
-        x, y, L, H = card['x'], card['y'], card['L'], card['H']
-        if x <= event.xdata <= x+L and y <= event.ydata <= y+H:
-            if not card['is_revealed']:
-                reveal_card(card)
-                game_state['clicked_cards'].append(card)
-                if len(game_state['clicked_cards']) == 2:
-                    c1, c2 = game_state['clicked_cards']
-                    # Condition pour une paire: même couleur ET même forme
-                    if (c1['color'] == c2['color']) and (c1['shape'] == c2['shape']):
-                        game_state['pairs_found'] += 1
-                        if game_state['current_player'] == 1:
-                            game_state['player1_score'] += 1
-                        else:
-                            game_state['player2_score'] += 1
-
-                        game_state['clicked_cards'].clear()
-                        update_score_and_timer(game_state)
-
-                        if game_state['pairs_found'] == game_state['total_pairs']:
-                            end_game(game_state)
-                        # Sinon, le même joueur rejoue
-                    else:
-                        # Pas de match
-                        game_state['disable_clicks'] = True
-                        plt.pause(1.5)
-                        hide_card(c1)
-                        hide_card(c2)
-                        game_state['clicked_cards'].clear()
-                        game_state['disable_clicks'] = False
-                        next_player(game_state)
-                        update_score_and_timer(game_state)
-            break
-
-    game_state['fig'].canvas.draw()
+    # Rejouer les clics reçus pendant l'attente
+    file_clics = game_state['file_clics']
+    if game_state['moteur'].joueur in game_state['adversaires']:
+        file_clics.clear()
+    while file_clics and game_state['moteur'].etat != ETAT_ATTENTE_MASQUAGE:
+        play_card(game_state, file_clics.popleft())
 
 def reveal_card(card):
-    card['is_revealed'] = True
-    card['back_patch'].set_visible(False)
-    card['front_bg'].set_visible(True)
-    card['front_shape'].set_visible(True)
+    card.revelee = True
+    if card.collection is not None:
+        card.collection.reveler(card.indice)
+        return
+    back_patch, front_bg, front_shape = card.artistes
+    back_patch.set_visible(False)
+    front_bg.set_visible(True)
+    front_shape.set_visible(True)
 
 def hide_card(card):
-    card['is_revealed'] = False
-    card['back_patch'].set_visible(True)
-    card['front_bg'].set_visible(False)
-    card['front_shape'].set_visible(False)
-
-def next_player(game_state):
-    if game_state['current_player'] == 1:
-        game_state['current_player'] = 2
-    else:
-        game_state['current_player'] = 1
+    card.revelee = False
+    if card.collection is not None:
+        card.collection.cacher(card.indice)
+        return
+    back_patch, front_bg, front_shape = card.artistes
+    back_patch.set_visible(True)
+    front_bg.set_visible(False)
+    front_shape.set_visible(False)
+
+def card_artists(card):
+    # Ordre de dessin : dos, fond de la face, forme (ou collections du plateau)
+    if card.collection is not None:
+        return card.collection.artistes()
+    return card.artistes
+
+def refresh_display(game_state, cards=()):
+    """
+    En mode blit, ne redessine que les cartes données (le score est
+    redessiné par update_score_and_timer) ; sinon redessine toute la figure.
+    """
+    if game_state['rendu'] is None:
+        game_state['fig'].canvas.draw_idle()
+        return
+    # dict.fromkeys : les collections partagées ne sont redessinées qu'une fois
+    artistes = dict.fromkeys(a for card in cards for a in card_artists(card))
+    game_state['rendu'].rafraichir(list(artistes))
 
-def update_score_and_timer(game_state):
+def schedule_refresh(game_state, cards=()):
+    """
+    Note les cartes à redessiner ; un seul rafraîchissement est programmé (timer
+    de 0 ms) pour tout ce qui change d'ici là : le clic ne peint rien.
+    """
+    game_state['a_rafraichir'].update(dict.fromkeys(card.indice for card in cards))
+    if game_state['timer_rendu'] is not None:
+        return
+    timer = game_state['fig'].canvas.new_timer(interval=0)
+    timer.single_shot = True
+    timer.add_callback(flush_refresh, game_state)
+    timer.start()
+    game_state['timer_rendu'] = timer
+
+def flush_refresh(game_state):
+    """
+    Rafraîchissement programmé : cartes notées, puis score et conseils s'ils ont changé.
+    """
+    if game_state['timer_rendu'] is not None:
+        game_state['timer_rendu'].stop()
+        game_state['timer_rendu'] = None
+    cards = game_state['cards']
+    indices = list(game_state['a_rafraichir'])
+    game_state['a_rafraichir'].clear()
+    # Partie finie : end_game a demandé un rendu complet, qui dessine aussi ces cartes
+    if game_state['moteur'].fini:
+        return
+    refresh_display(game_state, [cards[i] for i in indices])
+    game_state['hud'].rafraichir()
+    if game_state['hud_conseils'] is not None:
+        game_state['hud_conseils'].rafraichir()
+
+def update_score_and_timer(game_state, peindre=True):
     elapsed = int(time.time() - game_state['start_time'])
     mins = elapsed // 60
     secs = elapsed % 60
     t_str = f"{mins:02d}:{secs:02d}"
 
-    current_name = game_state['namep1'] if game_state['current_player'] == 1 else game_state['namep2']
-    score_txt = (f"{game_state['namep1']} : {game_state['player1_score']}   "
-                 f"{game_state['namep2']} : {game_state['player2_score']}   "
+    moteur = game_state['moteur']
+    current_name = game_state['namep1'] if moteur.joueur == 1 else game_state['namep2']
+    score_txt = (f"{game_state['namep1']} : {moteur.scores[0]}   "
+                 f"{game_state['namep2']} : {moteur.scores[1]}   "
                  f"(Tour de {current_name})   Temps : {t_str}")
     game_state['score_timer_text'].set_text(score_txt)
-    game_state['fig'].canvas.draw_idle()
+    # Rien n'est redessiné si le texte n'a pas changé (ni pendant un clic : flush_refresh)
+    if peindre:
+        game_state['hud'].rafraichir()
+
+def update_hints(game_state, peindre=True):
+    """
+    Panneau de conseils : probabilités de paire, paires connues, meilleur coup (en O(1)).
+    """
+    analyste = game_state['conseils']
+    if analyste is None:
+        return
+    cards = game_state['cards']
+    survol = game_state['survol']
+    if survol is not None:
+        survol = (survol, analyste.probabilite(survol))
+    game_state['conseils_text'].set_text(decrire(analyste.conseil(), lambda i: cards[i].id, survol))
+    if peindre:
+        game_state['hud_conseils'].rafraichir()
 
 def end_game(game_state):
     print("Fin du jeu !")
+    if game_state['journal'] is not None:
+        game_state['journal'].fin(game_state['moteur'].scores)
     if game_state['timer']:
         game_state['timer'].stop()
 
-    p1, p2 = game_state['player1_score'], game_state['player2_score']
-    if p1 >= p2:
+    if game_state['moteur'].gagnant() == 1:
         winner, loser = game_state['namep1'], game_state['namep2']
     else:
         winner, loser = game_state['namep2'], game_state['namep1']
@@ -289,34 +522,105 @@ def end_game(game_state):
 # ===============================
 # MAIN (uniquement mode "formes")
 # ===============================
-if __name__ == "__main__":
-    # Pour s'assurer d'un vrai random différent à chaque lancement :
-    random.seed(None)
+def main(noms=None, debut=None, ia=None, rejeu=None, reprendre=None):
+    """
+    Joue une partie du mode formes sur un plateau tiré au hasard ; rend la main
+    quand la fenêtre est fermée. `noms` : (joueur 1, joueur 2), demandés s'ils ne
+    sont pas donnés ; `debut` : instant (time.perf_counter()) à partir duquel le
+    délai jusqu'au premier affichage est mesuré (lancement depuis main.py) ;
+    `ia` : {joueur: nom de l'agent} pour les places tenues par l'ordinateur
+    (par défaut, options --ia1 / --ia2) ; `rejeu` : partie du journal
+    (jeu/journal.py) à rejouer en temps réel, au lieu de jouer une partie ;
+    `reprendre` : True / False pour reprendre ou remplacer la partie sauvegardée,
+    None pour le demander s'il y en a une (jeu/sauvegarde.py, choisir).
+    """
+    # Instrumentation optionnelle : --mesures / --profil, ou JEU_MESURES / JEU_PROFIL
+    fichier_mesures, fichier_profil = instrumentation.options()
+    # Sauvegarde automatique après chaque tour : --sauvegarde FICHIER / --sans-sauvegarde,
+    # ou JEU_SAUVEGARDE ; --reprendre reprend la partie sauvegardée dans ce fichier,
+    # et une partie non finie n'est remplacée qu'après confirmation
+    fichier_sauvegarde, option_reprendre = sauvegarde.options('formes')
+    reprise = None
+    if rejeu is not None:
+        fichier_sauvegarde = None
+    elif fichier_sauvegarde or option_reprendre:
+        reprise, fichier_sauvegarde = sauvegarde.choisir(
+            fichier_sauvegarde, 'formes', True if option_reprendre else reprendre)
+    # Journal des parties (parties entières) : --journal FICHIER / --sans-journal, ou JEU_JOURNAL
+    fichier_journal = journal.options() if rejeu is None and reprise is None else None
+    # Vidéo de la partie, écrite à la fermeture de la fenêtre : --video FICHIER, ou JEU_VIDEO
+    fichier_video = video.options() if reprise is None else None
+
+    if rejeu is not None:
+        # Plateau et noms de la partie rejouée
+        d_formes = journal.formes_de_partie(rejeu)
+        noms, ia = rejeu.noms, {}
+    elif reprise is not None:
+        # Plateau, noms et joueurs automatiques de la partie reprise
+        d_formes = journal.formes_de_partie(reprise)
+        noms, ia = reprise.noms, reprise.ia
+    else:
+        # Pour s'assurer d'un vrai random différent à chaque lancement :
+        random.seed(None)
+
+        # On génère/écrit un fichier de config "config_shapes.txt"
+        config_file = generate_shapes_config("config_shapes.txt")
 
-    # On génère/écrit un fichier de config "config_shapes.txt"
-    config_file = generate_shapes_config("config_shapes.txt")
-    
-    # On lit ce fichier et on stocke en mémoire
-    d_formes = lire_fichier_config(config_file)
+        # On lit ce fichier et on stocke en mémoire
+        d_formes = lire_fichier_config(config_file)
+
+    # Géométries de toutes les cartes, écrites en une fois dans un seul fichier
+    os.makedirs(os.path.dirname(FICHIER_GEOMETRIES), exist_ok=True)
+    ecrire_geometries(FICHIER_GEOMETRIES, Cartes.depuis_formes(d_formes))
 
     # Prépare l'état du jeu
     game_state = init_game_state()
     game_state['formes'] = d_formes
-
-    # Noms des joueurs
-    p1 = input("Nom du joueur 1 : ")
-    p2 = input("Nom du joueur 2 : ")
+    game_state['reprise'] = reprise
+    if atlas_demande():
+        game_state['mode_collection'] = 'atlas'
+    if conseils_demandes():
+        game_state['conseils'] = Analyste()
+
+    # Joueurs automatiques éventuels, puis noms des joueurs humains
+    if ia is None:
+        ia = adversaires_demandes()
+    game_state['ia'] = dict(ia)
+    if noms is None:
+        noms = tuple("" if j in ia else input(f"Nom du joueur {j} : ") for j in (1, 2))
+    p1, p2 = (f"IA ({ia[j]})" if j in ia else nom for j, nom in zip((1, 2), noms))
     game_state['namep1'] = p1 if p1 else "Joueur1"
     game_state['namep2'] = p2 if p2 else "Joueur2"
 
     fig, ax = plt.subplots()
     game_state['fig'] = fig
     game_state['ax'] = ax
-    game_state['start_time'] = time.time()
+    game_state['start_time'] = time.time() - (reprise.temps if reprise is not None else 0)
 
     # Configuration du plateau et connexion des événements
     setup_board(game_state)
+    if fichier_journal:
+        game_state['journal'] = journal.Enregistreur(
+            fichier_journal, 'formes', game_state['cards'],
+            (game_state['namep1'], game_state['namep2']), game_state['ia'])
+    if fichier_sauvegarde:
+        game_state['sauvegarde'] = sauvegarde.Sauvegarde(
+            fichier_sauvegarde, 'formes', game_state['cards'], game_state['moteur'],
+            lambda: time.time() - game_state['start_time'],
+            (game_state['namep1'], game_state['namep2']), game_state['ia'])
+    if fichier_video:
+        game_state['video'] = video.Capture(
+            fichier_video, 'formes', game_state['cards'],
+            (game_state['namep1'], game_state['namep2']))
+    if fichier_mesures:
+        instrumentation.instrumenter(globals(), game_state, fichier_mesures)
     connect_events(game_state)
+    if rejeu is not None:
+        game_state['rejeu'] = rejeu
+        game_state['disable_clicks'] = True
+        schedule_replay(game_state)
+    if debut is not None:
+        instrumentation.premier_affichage(fig, debut)
 
     # Affichage + frenêtre maximisée
     manager = plt.get_current_fig_manager()
@@ -324,4 +628,18 @@ if __name__ == "__main__":
         manager.window.state('zoomed')
     except AttributeError:
         manager.window.showMaximized()
-    plt.show()
+    with instrumentation.profil(fichier_profil):
+        plt.show()
+    if game_state['mesures'] is not None:
+        game_state['mesures'].ecrire()
+    if game_state['journal'] is not None:
+        game_state['journal'].fermer()
+    if game_state['sauvegarde'] is not None:
+        game_state['sauvegarde'].fermer()
+    if game_state['video'] is not None and game_state['video'].exporter():
+        print(f"Vidéo de la partie écrite dans {fichier_video}")
+    return game_state
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Tests du jeu (pytest), sans affichage : python -m pytest
+"""
@@ -0,0 +1,88 @@
+"""
+Lecture des fichiers de configuration : erreurs signalées avec leur ligne, et
+cache binaire (.plateau) invalidé quand le fichier source change.
+"""
+import os
+
+import pytest
+
+from jeu import configuration
+from jeu.configuration import (EXTENSION_CACHE, ErreurConfig, lire_config_classique,
+                               lire_config_formes)
+
+CLASSIQUE = (
+    "1;[0,0];2;3;red\n"
+    "2;[3,0];2;3;red\n"
+    "3;[0,4];2;3;blue\n"
+    "4;[3,4];2;3;blue\n"
+)
+
+
+def ecrire(chemin, texte):
+    with open(chemin, "w") as f:
+        f.write(texte)
+    return str(chemin)
+
+
+def test_lecture_classique(tmp_path):
+    fichier = ecrire(tmp_path / "config.txt", CLASSIQUE)
+    formes = lire_config_classique(fichier)
+    assert list(formes) == ["1", "2", "3", "4"]
+    assert formes["3"] == [(0, 4), 2, 3, "blue"]
+
+
+def test_lecture_formes(tmp_path):
+    fichier = ecrire(tmp_path / "config.txt", "a;[0,0];3;3;red;circle\nb;[4,0];3;3;red;circle\n")
+    assert lire_config_formes(fichier)["b"] == [(4, 0), 3, 3, "red", "circle"]
+
+
+def test_erreurs_signalees_avec_leur_ligne(tmp_path):
+    fichier = ecrire(tmp_path / "config.txt", (
+        "1;[0,0];2;3;red\n"
+        "2;[0,0];2;red\n"             # champ manquant
+        "3;[x,0];2;3;red\n"           # nombre invalide
+        "\n"
+        "4;[0,0];-2;3;red\n"          # dimension négative
+        "1;[0,0];2;3;blue\n"          # identifiant en double
+        "6;[0,0];2;3;red;hexagone\n"  # forme inconnue
+    ))
+    with pytest.raises(ErreurConfig) as erreur:
+        lire_config_formes(fichier)
+    lignes = [numero for numero, message in erreur.value.erreurs]
+    assert lignes == [2, 3, 5, 6, 7]
+    messages = dict(erreur.value.erreurs)
+    assert "champs" in messages[2]
+    assert "x invalide" in messages[3]
+    assert "positives" in messages[5]
+    assert "en double" in messages[6]
+    assert "forme inconnue" in messages[7]
+    assert f"{fichier}:3:" in str(erreur.value)
+    # Aucun cache n'est écrit pour un fichier invalide
+    assert not os.path.exists(fichier + EXTENSION_CACHE)
+
+
+def test_cache_relu_sans_analyse(tmp_path, monkeypatch):
+    fichier = ecrire(tmp_path / "config.txt", CLASSIQUE)
+    premiere = lire_config_classique(fichier)
+    assert os.path.exists(fichier + EXTENSION_CACHE)
+
+    def analyse_interdite(fichier):
+        raise AssertionError("le fichier a été réanalysé malgré le cache")
+    monkeypatch.setattr(configuration, "analyser_blocs", analyse_interdite)
+    assert lire_config_classique(fichier) == premiere
+
+
+def test_cache_invalide_apres_reecriture(tmp_path):
+    fichier = ecrire(tmp_path / "config.txt", CLASSIQUE)
+    assert lire_config_classique(fichier)["1"][3] == "red"
+    etat = os.stat(fichier)
+
+    # Même taille et même date de modification : seul le contenu diffère
+    ecrire(fichier, CLASSIQUE.replace("red", "tan"))
+    os.utime(fichier, ns=(etat.st_atime_ns, etat.st_mtime_ns))
+    formes = lire_config_classique(fichier)
+    assert formes["1"][3] == "tan" and formes["2"][3] == "tan"
+
+    # Le cache a été réécrit : une carte ajoutée est vue à la lecture suivante
+    ecrire(fichier, CLASSIQUE + "5;[6,0];2;3;green\n6;[6,4];2;3;green\n")
+    assert len(lire_config_classique(fichier)) == 6
@@ -0,0 +1,78 @@
+"""
+Journal des parties : une partie écrite par l'Enregistreur est relue et rejouée
+à l'identique par le moteur.
+"""
+from jeu.cartes import Cartes
+from jeu.journal import Enregistreur, cles_paires, lire_journal, rejouer, verifier
+from jeu.moteur import Moteur, ETAT_ATTENTE_MASQUAGE
+
+COULEURS = ["red", "blue", "red", "green", "blue", "green"]
+
+
+def plateau():
+    n = len(COULEURS)
+    return Cartes([f"c{i}" for i in range(n)], [3 * i for i in range(n)], [0] * n,
+                  [2] * n, [3] * n, COULEURS)
+
+
+def jouer(chemin, cartes, coups, finir=True):
+    """
+    Joue `coups` comme play_card (seules les cartes retournées sont notées),
+    une non-paire étant masquée avant la carte suivante. Renvoie le moteur.
+    """
+    journal = Enregistreur(chemin, "classique", cartes, noms=("Ada", "Bob"), ia={2: "memoire"})
+    moteur = Moteur(cartes.couleur.tolist())
+    for i in coups:
+        if moteur.etat == ETAT_ATTENTE_MASQUAGE:
+            moteur.masquer()
+        if moteur.jouable(i):
+            journal.carte(i)
+            moteur.flip(i)
+    if finir:
+        journal.fin(moteur.scores)
+    journal.fermer()
+    return moteur
+
+
+def test_aller_retour(tmp_path):
+    chemin = str(tmp_path / "parties.journal")
+    cartes = plateau()
+    # Non-paire (0, 1), puis le joueur 2 trouve les trois paires ; le 2 rejoué est ignoré
+    coups = [0, 1, 0, 2, 2, 1, 4, 3, 5]
+    moteur = jouer(chemin, cartes, coups)
+    assert moteur.fini and moteur.scores == [0, 3]
+
+    (partie,) = lire_journal(chemin)
+    assert partie.mode == "classique" and partie.noms == ("Ada", "Bob")
+    assert partie.ia == {2: "memoire"}
+    assert partie.indices == [0, 1, 0, 2, 1, 4, 3, 5]
+    assert partie.scores == (0, 3)
+    assert partie.cartes.couleurs() == COULEURS
+    assert cles_paires(partie) == cartes.couleur.tolist()
+
+    verification = rejouer(partie)
+    assert verification.erreurs == []
+    assert verification.scores == (0, 3)
+    assert verification.tours == 4
+
+
+def test_parties_successives_et_partie_inachevee(tmp_path):
+    chemin = str(tmp_path / "parties.journal")
+    jouer(chemin, plateau(), [0, 2, 1, 4, 3, 5])
+    jouer(chemin, plateau(), [0, 2, 1], finir=False)
+
+    resultats = verifier(chemin)
+    assert [numero for numero, partie, verification in resultats] == [1, 2]
+    (_, premiere, v1), (_, seconde, v2) = resultats
+    assert premiere.scores == (3, 0) and v1.erreurs == []
+    # Fenêtre fermée avant la fin : pas de scores, rien à comparer
+    assert seconde.scores is None and seconde.indices == [0, 2, 1]
+    assert v2.erreurs == [] and v2.scores == (1, 0)
+
+
+def test_ecart_detecte_au_rejeu(tmp_path):
+    chemin = str(tmp_path / "parties.journal")
+    jouer(chemin, plateau(), [0, 2, 1, 4, 3, 5])
+    (partie,) = lire_journal(chemin)
+    erreurs = rejouer(partie._replace(scores=(2, 1))).erreurs
+    assert erreurs == ["scores (3, 0) au lieu de (2, 1)"]
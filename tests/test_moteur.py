@@ -0,0 +1,89 @@
+"""
+Règles du jeu : transitions d'état du moteur et événements publiés.
+"""
+from jeu.moteur import (Moteur, REVELEE, PAIRE, NON_PAIRE, MASQUEES, JOUEUR_SUIVANT, FIN,
+                        ETAT_LIBRE, ETAT_UNE_CARTE, ETAT_ATTENTE_MASQUAGE)
+
+
+def types(evenements):
+    return [ev.type for ev in evenements]
+
+
+def test_paire_le_joueur_marque_et_rejoue():
+    moteur = Moteur("abab")
+    assert types(moteur.flip(0)) == [REVELEE]
+    assert moteur.etat == ETAT_UNE_CARTE and moteur.selection == [0]
+
+    evenements = moteur.flip(2)
+    assert types(evenements) == [REVELEE, PAIRE]
+    assert evenements[1].cartes == (0, 2) and evenements[1].joueur == 1
+    assert moteur.scores == [1, 0] and moteur.joueur == 1
+    assert moteur.etat == ETAT_LIBRE and moteur.selection == []
+    assert moteur.revelee == bytearray([1, 0, 1, 0])
+
+
+def test_non_paire_attend_le_masquage_puis_change_de_joueur():
+    moteur = Moteur("abab")
+    moteur.flip(0)
+    assert types(moteur.flip(1)) == [REVELEE, NON_PAIRE]
+    assert moteur.etat == ETAT_ATTENTE_MASQUAGE
+
+    # Aucune carte n'est jouable tant que la non-paire est visible
+    assert not moteur.jouable(3)
+    assert moteur.flip(3) == []
+
+    evenements = moteur.masquer()
+    assert types(evenements) == [MASQUEES, JOUEUR_SUIVANT]
+    assert evenements[0].cartes == (0, 1)
+    assert moteur.joueur == 2 and moteur.scores == [0, 0]
+    assert moteur.etat == ETAT_LIBRE and moteur.revelee == bytearray(4)
+    # Masquer hors d'une non-paire ne fait rien
+    assert moteur.masquer() == []
+
+
+def test_carte_deja_visible_ignoree():
+    moteur = Moteur("abab")
+    moteur.flip(0)
+    assert moteur.flip(0) == []
+    assert moteur.selection == [0]
+
+
+def test_fin_de_partie():
+    moteur = Moteur("abab")
+    moteur.flip(0)
+    moteur.flip(2)
+    moteur.flip(1)
+    evenements = moteur.flip(3)
+    assert types(evenements) == [REVELEE, PAIRE, FIN]
+    assert evenements[-1].joueur == 1
+    assert moteur.fini and moteur.scores == [2, 0]
+    # Plus rien n'est jouable après la fin
+    assert moteur.flip(0) == []
+
+
+def test_egalite_gagnee_par_le_joueur_1():
+    # a et b pour le joueur 1, puis non-paire : c et d pour le joueur 2
+    moteur = Moteur("aabbcdcd")
+    for i in (0, 1, 2, 3, 4, 5):
+        moteur.flip(i)
+    moteur.masquer()
+    assert moteur.joueur == 2
+    moteur.flip(4)
+    moteur.flip(6)
+    moteur.flip(5)
+    evenements = moteur.flip(7)
+    assert moteur.scores == [2, 2]
+    assert evenements[-1].type == FIN and evenements[-1].joueur == 1
+    assert moteur.gagnant() == 1
+
+
+def test_abonnes_recoivent_les_evenements():
+    moteur = Moteur("abab")
+    recus = []
+    moteur.abonner(recus.append)
+    moteur.flip(0)
+    moteur.flip(0)  # coup ignoré : rien n'est publié
+    moteur.flip(1)
+    moteur.masquer()
+    assert [types(evenements) for evenements in recus] == [
+        [REVELEE], [REVELEE, NON_PAIRE], [MASQUEES, JOUEUR_SUIVANT]]
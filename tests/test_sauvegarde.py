@@ -0,0 +1,83 @@
+"""
+Sauvegarde automatique : une partie sauvegardée au milieu d'un tour est
+rechargée et restaurée dans le même état.
+"""
+import os
+
+from jeu.cartes import Cartes
+from jeu.moteur import Moteur, PAIRE, FIN, ETAT_UNE_CARTE
+from jeu.sauvegarde import Sauvegarde, charger, en_cours, restaurer
+
+COULEURS = ["red", "blue", "red", "green", "blue", "green"]
+
+
+def plateau():
+    n = len(COULEURS)
+    return Cartes([f"c{i}" for i in range(n)], [3 * i for i in range(n)], [0] * n,
+                  [2] * n, [3] * n, COULEURS)
+
+
+def partie(chemin):
+    cartes = plateau()
+    moteur = Moteur(cartes.couleur.tolist())
+    sauvegarde = Sauvegarde(chemin, "classique", cartes, moteur, horloge=lambda: 42.5,
+                            noms=("Ada", "Bob"), ia={2: "difficile"})
+    return cartes, moteur, sauvegarde
+
+
+def test_carte_retournee_en_cours_de_tour(tmp_path):
+    chemin = str(tmp_path / "partie.sauvegarde")
+    cartes, moteur, sauvegarde = partie(chemin)
+    moteur.flip(0)
+    moteur.flip(1)
+    moteur.masquer()  # non-paire : au joueur 2
+    moteur.flip(0)
+    moteur.flip(2)    # paire rouge pour le joueur 2
+    moteur.flip(1)    # carte du tour en cours, sauvegardée à la fermeture
+    sauvegarde.fermer()
+
+    instantane = charger(chemin)
+    assert instantane.mode == "classique" and instantane.noms == ("Ada", "Bob")
+    assert instantane.ia == {2: "difficile"}
+    assert instantane.scores == (0, 1) and instantane.joueur == 2
+    assert instantane.selection == (1,)
+    assert instantane.revelee.tolist() == [1, 1, 1, 0, 0, 0]
+    assert instantane.temps == 42.5
+    assert instantane.cartes.couleurs() == COULEURS
+    assert en_cours(chemin) is not None
+
+    # Reprise : plateau et moteur neufs remis dans l'état sauvegardé
+    cartes = plateau()
+    moteur = Moteur(cartes.couleur.tolist())
+    restaurer(instantane, cartes, moteur)
+    assert moteur.etat == ETAT_UNE_CARTE and moteur.selection == [1]
+    assert moteur.scores == [0, 1] and moteur.joueur == 2 and moteur.paires_trouvees == 1
+    assert cartes.revelee.tolist() == [True, True, True, False, False, False]
+    assert cartes.trouvee.tolist() == [True, False, True, False, False, False]
+
+    # Le tour reprend là où il s'était arrêté : la carte 4 complète la paire bleue
+    assert [ev.type for ev in moteur.flip(4)][1] == PAIRE
+    assert moteur.scores == [0, 2]
+
+
+def test_non_paire_visible_masquee_au_chargement(tmp_path):
+    chemin = str(tmp_path / "partie.sauvegarde")
+    cartes, moteur, sauvegarde = partie(chemin)
+    moteur.flip(0)
+    moteur.flip(1)    # fenêtre fermée pendant l'affichage de la non-paire
+    sauvegarde.fermer()
+
+    instantane = charger(chemin)
+    assert instantane.selection == () and instantane.joueur == 2
+    assert instantane.revelee.tolist() == [0] * len(COULEURS)
+
+
+def test_partie_finie_supprimee(tmp_path):
+    chemin = str(tmp_path / "partie.sauvegarde")
+    cartes, moteur, sauvegarde = partie(chemin)
+    for i in (0, 2, 1, 4, 3):
+        moteur.flip(i)
+    assert [ev.type for ev in moteur.flip(5)][-1] == FIN
+    sauvegarde.fermer()
+    assert not os.path.exists(chemin)
+    assert en_cours(chemin) is None
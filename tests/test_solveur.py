@@ -0,0 +1,41 @@
+"""
+Analyse exacte (programmation dynamique) comparée à une simulation Monte Carlo
+de parties entre deux joueurs à mémoire parfaite, à graine fixée.
+"""
+import numpy as np
+import pytest
+
+from jeu import simulation, solveur
+
+PAIRES = 12
+PARTIES = 100_000
+
+
+@pytest.fixture(scope="module")
+def simulees():
+    cles = list(range(PAIRES)) * 2
+    return simulation.simuler(cles, PARTIES, (simulation.PARFAITE, simulation.PARFAITE), graine=0)
+
+
+def test_analyse_conforme_a_la_simulation(simulees):
+    analyse = solveur.analyser(PAIRES)
+    tours, scores = simulees
+    assert np.all(scores.sum(axis=1) == PAIRES)
+    ecarts = scores[:, 0] - scores[:, 1]
+
+    # Écarts tolérés : 4 erreurs types de la moyenne simulée
+    assert analyse.tours_moyen == pytest.approx(tours.mean(), abs=4 * tours.std() / np.sqrt(PARTIES))
+    assert analyse.ecart_moyen == pytest.approx(ecarts.mean(), abs=4 * ecarts.std() / np.sqrt(PARTIES))
+    for exacte, frequence in ((analyse.victoires_j1, np.mean(ecarts > 0)),
+                              (analyse.egalites, np.mean(ecarts == 0)),
+                              (analyse.victoires_j2, np.mean(ecarts < 0))):
+        assert exacte == pytest.approx(frequence, abs=4 * np.sqrt(exacte * (1 - exacte) / PARTIES))
+
+
+def test_probabilites_completes():
+    analyse = solveur.analyser(PAIRES)
+    total = analyse.victoires_j1 + analyse.egalites + analyse.victoires_j2
+    assert total == pytest.approx(1.0)
+    # Sans distribution, seules les espérances sont calculées
+    sans = solveur.analyser(PAIRES, distribution=False)
+    assert sans.victoires_j1 is None and sans.tours_moyen == analyse.tours_moyen